@@ -0,0 +1,79 @@
+"""Attack patterns as (time, power) schedules for in-process simulation.
+
+Each generator mirrors one of the HTTP attacker scripts in this folder and
+returns two float arrays: request times in seconds from the start of the
+attack, and the requested heater power of each request. NaN power marks a
+request the frontend rejects (malformed payload) so it never reaches the plant.
+
+`sample(name, rng)` draws a randomised variant: the script's defaults scaled
+by log-uniform factors, plus the timing jitter a real client would have.
+All randomness comes from the numpy Generator passed in, so a seed
+reproduces a variant exactly.
+"""
+import numpy as np
+
+
+def _jitter(rng, t, scale=0.02):
+    # network/client latency on top of the scripted sleeps
+    return np.sort(t + rng.uniform(0.0, scale, len(t)))
+
+
+def flood(rng, rate=10.0, duration=10.0):
+    t = np.arange(0.0, duration, 1.0 / max(1.0, rate))
+    return _jitter(rng, t), np.ones(len(t))
+
+
+def burst(rng, bursts=3, burst_size=50, inter_burst=10.0):
+    # back-to-back requests inside a burst, only bounded by request latency
+    gaps = rng.uniform(0.005, 0.03, (int(bursts), int(burst_size)))
+    gaps[1:, 0] += inter_burst
+    t = np.cumsum(gaps.ravel())
+    return t - t[0], np.ones(len(t))
+
+
+def cooling_spoof(rng, rate=4.0, duration=20.0):
+    t = np.arange(0.0, duration, 1.0 / max(1.0, rate))
+    return _jitter(rng, t), np.zeros(len(t))
+
+
+def slow_and_low(rng, rate=0.2, duration=300.0):
+    t = np.arange(0.0, duration, 1.0 / max(0.001, rate))
+    return _jitter(rng, t), 0.6 + rng.uniform(-0.1, 0.2, len(t))
+
+
+def randomized(rng, interactions=200, min_wait=0.05, max_wait=1.0):
+    n = int(interactions)
+    t = np.concatenate([[0.0], np.cumsum(rng.uniform(min_wait, max_wait, n - 1))]) if n else np.zeros(0)
+    return t, rng.choice([0.0, 0.2, 0.5, 1.0], n)
+
+
+def malformed(rng, count=50, pause=0.2):
+    t = np.arange(int(count)) * pause
+    # malformed_payload.py cycles {"role"}, {"power": "high"}, {"power": None}; the frontend
+    # applies a missing power as 0.0 and rejects the other two
+    power = np.full(len(t), np.nan)
+    power[::3] = 0.0
+    return _jitter(rng, t), power
+
+
+SCENARIOS = {
+    'flood': (flood, {'rate': 10.0, 'duration': 10.0}),
+    'burst': (burst, {'bursts': 3, 'burst_size': 50, 'inter_burst': 10.0}),
+    'cooling_spoof': (cooling_spoof, {'rate': 4.0, 'duration': 20.0}),
+    'slow_and_low': (slow_and_low, {'rate': 0.2, 'duration': 300.0}),
+    'randomized': (randomized, {'interactions': 200, 'min_wait': 0.05, 'max_wait': 1.0}),
+    'malformed': (malformed, {'count': 50, 'pause': 0.2}),
+}
+
+
+def sample(name, rng, spread=2.0):
+    """A random variant of scenario `name`: each default parameter scaled by a factor in [1/spread, spread]."""
+    gen, defaults = SCENARIOS[name]
+    params = {}
+    for k, v in defaults.items():
+        x = v * spread ** rng.uniform(-1.0, 1.0)
+        params[k] = max(1, int(round(x))) if isinstance(v, int) else float(x)
+    if 'max_wait' in params:
+        params['max_wait'] = max(params['max_wait'], params['min_wait'])
+    t, power = gen(rng, **params)
+    return t, power, params
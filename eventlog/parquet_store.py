@@ -0,0 +1,219 @@
+# eventlog/parquet_store.py
+"""Rolling, hour-partitioned Parquet segments for the events log.
+
+Layout under the store directory (e.g. logs/events/):
+
+    date=2026-10-17/hour=13/part-1792242000-000001.parquet
+
+`ParquetSegmentSink` plugs into `BatchedEventWriter`. Each writer batch is
+appended to the open segment of its hour as one row group. A segment is
+closed when its hour ends, when it reaches `max_segment_rows` rows, or when
+it is older than `max_segment_age` seconds. While a segment is open it is
+written under a `.inprogress` name and renamed when closed, so readers only
+ever see complete files.
+
+`read_events_parquet` first skips hour partitions that lie outside
+[start_ts, end_ts], then reads only the requested columns and applies the
+filters to each remaining file (row groups are skipped using Parquet column
+statistics).
+"""
+import glob
+import os
+import time
+from datetime import datetime, timezone
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+from eventlog.writer import EVENT_COLUMNS
+
+SEGMENT_SECONDS = 3600
+_INPROGRESS = ".inprogress"
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for the parquet event store. Install with: pip install pyarrow")
+
+
+def event_schema(columns=EVENT_COLUMNS):
+    _require_pyarrow()
+    types = {
+        "ts": pa.int64(),
+        "requested_power": pa.float64(),
+        "applied_power": pa.float64(),
+        "temperature": pa.float64(),
+        "override": pa.bool_(),
+        "count": pa.int64(),
+        "ml_score": pa.float64(),
+        "plant_seq": pa.int64(),
+    }
+    return pa.schema([(c, types.get(c, pa.string())) for c in columns])
+
+
+def partition_dir(root, hour_start):
+    t = datetime.fromtimestamp(hour_start, tz=timezone.utc)
+    return os.path.join(root, f"date={t:%Y-%m-%d}", f"hour={t:%H}")
+
+
+def _partition_start(path):
+    """Hour start (unix seconds) for a `.../date=YYYY-MM-DD/hour=HH` directory."""
+    hour_dir = os.path.basename(path)
+    date_dir = os.path.basename(os.path.dirname(path))
+    t = datetime.strptime(f"{date_dir[5:]} {hour_dir[5:]}", "%Y-%m-%d %H")
+    return int(t.replace(tzinfo=timezone.utc).timestamp())
+
+
+def _coerce(col, value):
+    # CSV cannot tell '' from None, so store both as null
+    if value is None or value == "":
+        return None
+    if col == "override":
+        return value if isinstance(value, bool) else str(value) == "True"
+    if col in ("ts", "count", "plant_seq"):
+        return int(value)
+    if col in ("requested_power", "applied_power", "temperature", "ml_score"):
+        return float(value)
+    return str(value)
+
+
+class ParquetSegmentSink:
+    """Writer sink that rotates compressed Parquet segments per hour."""
+
+    def __init__(self, root, columns=EVENT_COLUMNS, max_segment_rows=500000,
+                 max_segment_age=300, compression="zstd"):
+        _require_pyarrow()
+        self.root = root
+        self.columns = list(columns)
+        self.schema = event_schema(self.columns)
+        self.max_segment_rows = int(max_segment_rows)
+        self.max_segment_age = float(max_segment_age)
+        self.compression = compression
+        self._ts_idx = self.columns.index("ts")
+        self._writer = None
+        self._hour = None
+        self._path = None
+        self._rows = 0
+        self._opened = 0.0
+        self._seq = 0
+
+    def open(self):
+        os.makedirs(self.root, exist_ok=True)
+        # segments left open by a crashed process have no footer and cannot be read;
+        # set them aside instead of appending to them
+        for stale in glob.glob(os.path.join(self.root, "date=*", "hour=*", "*" + _INPROGRESS)):
+            os.replace(stale, stale[:-len(_INPROGRESS)] + ".incomplete")
+
+    def write_rows(self, rows):
+        # rows are nearly always in ts order; group consecutive rows of the same hour
+        start = 0
+        while start < len(rows):
+            hour = int(rows[start][self._ts_idx]) // SEGMENT_SECONDS * SEGMENT_SECONDS
+            end = start + 1
+            while end < len(rows) and int(rows[end][self._ts_idx]) // SEGMENT_SECONDS * SEGMENT_SECONDS == hour:
+                end += 1
+            self._append(hour, rows[start:end])
+            start = end
+        if self._writer is not None and time.monotonic() - self._opened >= self.max_segment_age:
+            self._rotate()
+
+    def _append(self, hour, rows):
+        if self._writer is not None and (hour != self._hour or self._rows >= self.max_segment_rows):
+            self._rotate()
+        if self._writer is None:
+            d = partition_dir(self.root, hour)
+            os.makedirs(d, exist_ok=True)
+            while True:
+                self._seq += 1
+                self._path = os.path.join(d, f"part-{int(rows[0][self._ts_idx])}-{self._seq:06d}.parquet")
+                if not os.path.exists(self._path) and not os.path.exists(self._path + _INPROGRESS):
+                    break
+            self._writer = pq.ParquetWriter(self._path + _INPROGRESS, self.schema, compression=self.compression)
+            self._hour = hour
+            self._rows = 0
+            self._opened = time.monotonic()
+        arrays = [
+            pa.array([_coerce(col, r[i]) for r in rows], type=self.schema.field(i).type)
+            for i, col in enumerate(self.columns)
+        ]
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        self._rows += len(rows)
+
+    def _rotate(self):
+        self._writer.close()
+        os.replace(self._path + _INPROGRESS, self._path)
+        self._writer = None
+        self._hour = None
+        self._path = None
+
+    def close(self):
+        if self._writer is not None:
+            self._rotate()
+
+
+def list_segments(root, start_ts=None, end_ts=None):
+    """Closed segment files whose hour partition can overlap [start_ts, end_ts], in time order."""
+    files = []
+    for d in sorted(glob.glob(os.path.join(root, "date=*", "hour=*"))):
+        hour_start = _partition_start(d)
+        if start_ts is not None and hour_start + SEGMENT_SECONDS <= start_ts:
+            continue
+        if end_ts is not None and hour_start > end_ts:
+            continue
+        parts = glob.glob(os.path.join(d, "part-*.parquet"))
+        # part-<first_ts>-<seq>.parquet: order by first ts, then write sequence
+        parts.sort(key=lambda p: tuple(int(x) for x in os.path.basename(p)[5:-8].split("-")))
+        files.extend(parts)
+    return files
+
+
+def read_events_parquet(root, columns=None, start_ts=None, end_ts=None, clients=None, event_types=None):
+    """Read events into a DataFrame shaped like `pd.read_csv('events.csv')`."""
+    _require_pyarrow()
+    filters = []
+    if start_ts is not None:
+        filters.append(("ts", ">=", int(start_ts)))
+    if end_ts is not None:
+        filters.append(("ts", "<=", int(end_ts)))
+    if clients:
+        filters.append(("client_ip", "in", list(clients)))
+    if event_types:
+        filters.append(("event_type", "in", list(event_types)))
+    schema = event_schema()
+    proj = None if columns is None else [c for c in columns if c in schema.names]
+    tables = [
+        pq.read_table(f, columns=proj, filters=filters or None, schema=schema)
+        for f in list_segments(root, start_ts, end_ts)
+    ]
+    if tables:
+        df = pa.concat_tables(tables).to_pandas()
+    else:
+        df = schema.empty_table().select(proj if proj is not None else schema.names).to_pandas()
+    if "override" in df.columns:
+        # True/False/NaN like the CSV log
+        df["override"] = df["override"].astype(object).where(df["override"].notna(), float("nan"))
+    return df
+
+
+def iter_events_parquet(root, columns=None, chunksize=500000):
+    """Yield events segment by segment (in time order) as DataFrames of at most `chunksize` rows."""
+    _require_pyarrow()
+    schema = event_schema()
+    proj = None if columns is None else [c for c in columns if c in schema.names]
+    for f in list_segments(root):
+        pf = pq.ParquetFile(f)
+        names = proj if proj is not None else schema.names
+        for batch in pf.iter_batches(batch_size=chunksize, columns=[c for c in names if c in pf.schema_arrow.names]):
+            table = pa.Table.from_batches([batch])
+            # segments written before a column existed read back with it null
+            for c in names:
+                if c not in table.column_names:
+                    table = table.append_column(c, pa.nulls(len(table), type=schema.field(c).type))
+            df = table.select(names).to_pandas()
+            if "override" in df.columns:
+                df["override"] = df["override"].astype(object).where(df["override"].notna(), float("nan"))
+            yield df
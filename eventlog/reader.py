@@ -0,0 +1,104 @@
+# eventlog/reader.py
+"""Shared reader for the events log, whatever backend wrote it.
+
+    load_events(path, columns=None, start_ts=None, end_ts=None, clients=None, event_types=None)
+
+`path` may be an events CSV, a SQLite event store (.db/.sqlite/.sqlite3) or a
+directory of hour-partitioned Parquet segments. For SQLite, the time, client
+and event-type filters and the column list are pushed down into the query, so
+only matching rows are read. For Parquet, partitions outside the time range
+are skipped and only the requested columns are decoded. For CSV, the columns
+are still projected at parse time (`usecols`), but the filters are applied
+after the file has been parsed.
+
+`iter_events(path, columns=None, chunksize=...)` yields the same frames in
+chunks of rows, in log order, without loading the whole log.
+"""
+import os
+
+import pandas as pd
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+
+def store_kind(path):
+    if os.path.isdir(path):
+        return "parquet"
+    if str(path).lower().endswith(SQLITE_SUFFIXES):
+        return "sqlite"
+    return "csv"
+
+
+def _filter_frame(df, start_ts=None, end_ts=None, clients=None, event_types=None):
+    mask = pd.Series(True, index=df.index)
+    if start_ts is not None or end_ts is not None:
+        ts = pd.to_numeric(df["ts"], errors="coerce")
+        if start_ts is not None:
+            mask &= ts >= start_ts
+        if end_ts is not None:
+            mask &= ts <= end_ts
+    if clients:
+        mask &= df["client_ip"].isin(list(clients))
+    if event_types:
+        mask &= df["event_type"].isin(list(event_types))
+    return df[mask].reset_index(drop=True)
+
+
+def event_weights(df):
+    """Number of requests each row stands for: `count` on aggregated rows, 1 otherwise."""
+    if "count" not in df.columns:
+        return pd.Series(1, index=df.index, dtype="int64")
+    return pd.to_numeric(df["count"], errors="coerce").fillna(1).astype("int64")
+
+
+def load_events(path, columns=None, start_ts=None, end_ts=None, clients=None, event_types=None):
+    """Load events as a DataFrame with the same columns/dtypes as `pd.read_csv(events.csv)`."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Log file not found: {path}")
+    kind = store_kind(path)
+    if kind == "sqlite":
+        from eventlog.sqlite_store import read_events_sqlite
+        return read_events_sqlite(path, columns=columns, start_ts=start_ts, end_ts=end_ts,
+                                  clients=clients, event_types=event_types)
+    if kind == "parquet":
+        from eventlog.parquet_store import read_events_parquet
+        return read_events_parquet(path, columns=columns, start_ts=start_ts, end_ts=end_ts,
+                                   clients=clients, event_types=event_types)
+
+    needed = None
+    if columns is not None:
+        needed = list(columns)
+        for col, used in (("ts", start_ts is not None or end_ts is not None),
+                          ("client_ip", bool(clients)), ("event_type", bool(event_types))):
+            if used and col not in needed:
+                needed.append(col)
+        header = pd.read_csv(path, nrows=0).columns
+        needed = [c for c in needed if c in header]
+    df = pd.read_csv(path, usecols=needed)
+    if start_ts is not None or end_ts is not None or clients or event_types:
+        df = _filter_frame(df, start_ts, end_ts, clients, event_types)
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return df
+
+
+def iter_events(path, columns=None, chunksize=500000):
+    """Yield the events log as DataFrames of at most `chunksize` rows, in write order."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Log file not found: {path}")
+    kind = store_kind(path)
+    if kind == "sqlite":
+        from eventlog.sqlite_store import iter_events_sqlite
+        yield from iter_events_sqlite(path, columns=columns, chunksize=chunksize)
+        return
+    if kind == "parquet":
+        from eventlog.parquet_store import iter_events_parquet
+        yield from iter_events_parquet(path, columns=columns, chunksize=chunksize)
+        return
+    usecols = None
+    if columns is not None:
+        header = pd.read_csv(path, nrows=0).columns
+        usecols = [c for c in columns if c in header]
+    # round_trip: floats come back exactly as written, so replays can compare bit for bit
+    for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunksize, float_precision="round_trip"):
+        yield chunk[usecols] if usecols is not None else chunk
@@ -0,0 +1,199 @@
+# eventlog/sqlite_store.py
+"""SQLite backend for the events log.
+
+`SqliteSink` plugs into `BatchedEventWriter`: the database runs in WAL mode so
+analysis scripts can read while the honeypot writes, and each writer batch is
+committed as one transaction. `read_events_sqlite` pushes time, client and
+event-type filters down into SQL, where they are served by the
+`(client_ip, ts)`, `(event_type, ts)` and `ts` indexes.
+
+One-off import of an existing CSV log:
+  python -m eventlog.sqlite_store logs/events.csv logs/events.db
+"""
+import csv
+import os
+import sqlite3
+
+from eventlog.writer import EVENT_COLUMNS
+
+TABLE = "events"
+_COLUMN_TYPES = {
+    "ts": "INTEGER",
+    "requested_power": "REAL",
+    "applied_power": "REAL",
+    "temperature": "REAL",
+    "override": "INTEGER",
+    "count": "INTEGER",
+    "ml_score": "REAL",
+    "plant_seq": "INTEGER",
+}
+_INDEXES = {
+    "idx_events_client_ts": "(client_ip, ts)",
+    "idx_events_type_ts": "(event_type, ts)",
+    "idx_events_ts": "(ts)",
+}
+
+
+def connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def ensure_schema(conn, columns=EVENT_COLUMNS):
+    cols = ", ".join(f"{c} {_COLUMN_TYPES.get(c, 'TEXT')}" for c in columns)
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {TABLE} ({cols})")
+    # stores created before a column was added to EVENT_COLUMNS get it as NULLs
+    present = {r[1] for r in conn.execute(f"PRAGMA table_info({TABLE})")}
+    for c in columns:
+        if c not in present:
+            conn.execute(f"ALTER TABLE {TABLE} ADD COLUMN {c} {_COLUMN_TYPES.get(c, 'TEXT')}")
+    for name, spec in _INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {TABLE} {spec}")
+
+
+def _to_db(value):
+    # CSV cannot tell '' from None, so store both as NULL
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        return int(value)
+    if value in ("True", "False"):
+        return int(value == "True")
+    return value
+
+
+class SqliteSink:
+    """Writer sink that commits each batch as a single transaction."""
+
+    def __init__(self, path, columns=EVENT_COLUMNS):
+        self.path = path
+        self.columns = list(columns)
+        self._conn = None
+        self._insert = None
+
+    def open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = connect(self.path)
+        ensure_schema(self._conn, self.columns)
+        placeholders = ", ".join("?" for _ in self.columns)
+        self._insert = f"INSERT INTO {TABLE} ({', '.join(self.columns)}) VALUES ({placeholders})"
+
+    def write_rows(self, rows):
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany(self._insert, ([_to_db(v) for v in row] for row in rows))
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def build_query(columns=None, start_ts=None, end_ts=None, clients=None, event_types=None):
+    """SQL + params for a filtered, ts-ordered read of the events table."""
+    select = ", ".join(columns) if columns else "*"
+    where = []
+    params = []
+    if start_ts is not None:
+        where.append("ts >= ?")
+        params.append(int(start_ts))
+    if end_ts is not None:
+        where.append("ts <= ?")
+        params.append(int(end_ts))
+    if clients:
+        clients = list(clients)
+        where.append(f"client_ip IN ({', '.join('?' for _ in clients)})")
+        params.extend(clients)
+    if event_types:
+        event_types = list(event_types)
+        where.append(f"event_type IN ({', '.join('?' for _ in event_types)})")
+        params.extend(event_types)
+    sql = f"SELECT {select} FROM {TABLE}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    # rowid order is write order, matching the row order of events.csv
+    sql += " ORDER BY rowid"
+    return sql, params
+
+
+def read_events_sqlite(path, columns=None, start_ts=None, end_ts=None, clients=None, event_types=None):
+    """Read events into a DataFrame shaped like `pd.read_csv('events.csv')`."""
+    import pandas as pd
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        if columns is not None:
+            present = {r[1] for r in conn.execute(f"PRAGMA table_info({TABLE})")}
+            columns = [c for c in columns if c in present]
+        sql, params = build_query(columns, start_ts, end_ts, clients, event_types)
+        df = pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+    if "override" in df.columns:
+        # back to True/False/NaN like the CSV log
+        df["override"] = df["override"].map({1: True, 0: False})
+    return df
+
+
+def iter_events_sqlite(path, columns=None, chunksize=500000):
+    """Yield the events table in rowid order as DataFrames of at most `chunksize` rows."""
+    import pandas as pd
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        if columns is not None:
+            present = {r[1] for r in conn.execute(f"PRAGMA table_info({TABLE})")}
+            columns = [c for c in columns if c in present]
+        sql, params = build_query(columns)
+        for df in pd.read_sql_query(sql, conn, params=params, chunksize=chunksize):
+            # a chunk where a numeric column is all NULL comes back as object; keep it float
+            for c in ("requested_power", "applied_power", "temperature", "count", "ml_score", "plant_seq"):
+                if c in df.columns and df[c].dtype == object:
+                    df[c] = pd.to_numeric(df[c])
+            if "override" in df.columns:
+                df["override"] = df["override"].map({1: True, 0: False})
+            yield df
+    finally:
+        conn.close()
+
+
+def csv_to_sqlite(csv_path, db_path, batch_size=5000):
+    """Import an events.csv file into a (new or existing) SQLite event store."""
+    sink = SqliteSink(db_path)
+    sink.open()
+    n = 0
+    try:
+        with open(csv_path, newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return 0
+            pos = [header.index(c) if c in header else None for c in EVENT_COLUMNS]
+            batch = []
+            for row in reader:
+                # skip malformed/interleaved lines (see scripts/clean_events.py)
+                if not row or not row[0].isdigit():
+                    continue
+                batch.append([row[i] if i is not None and i < len(row) else None for i in pos])
+                if len(batch) >= batch_size:
+                    sink.write_rows(batch)
+                    n += len(batch)
+                    batch = []
+            if batch:
+                sink.write_rows(batch)
+                n += len(batch)
+    finally:
+        sink.close()
+    return n
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) != 3:
+        raise SystemExit("usage: python -m eventlog.sqlite_store EVENTS_CSV EVENTS_DB")
+    count = csv_to_sqlite(sys.argv[1], sys.argv[2])
+    print(f"Imported {count} rows into {sys.argv[2]}")
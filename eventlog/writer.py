@@ -0,0 +1,205 @@
+# eventlog/writer.py
+"""Background, batched writer for the honeypot events log.
+
+Request threads hand rows to `BatchedEventWriter.write`, which only touches a
+bounded in-memory queue. One writer thread drains the queue and group-commits
+rows to a sink when `batch_size` rows are waiting or `flush_interval` seconds
+have passed since the first row of the pending batch arrived. Because every
+producer (request handlers, the engagement monitor) goes through the same
+writer, rows can no longer interleave inside the file.
+
+Columns are only ever appended to EVENT_COLUMNS. When a sink opens a log
+written with an older column list it brings it up to date (CSV header
+rewrite, SQLite ALTER TABLE) and old rows read back with the new columns
+empty. `count` is the number of requests a row stands for; it is blank for
+ordinary rows (one request each) and set on aggregated `throttled` rows.
+`ml_score` / `ml_label` are the frontend's inline detector output for an
+`event` row; ml_label is 'unscored' when the score missed its latency budget
+and both are blank when no detector is loaded. `plant_seq` is the plant's
+step counter (PlantSnapshot.seq) for an `event` row: rows are written when
+their request finishes, so log order can differ from the order the plant
+applied them, and (ts, plant_seq) restores it.
+"""
+import csv
+import os
+import queue
+import sys
+import threading
+import time
+
+EVENT_COLUMNS = [
+    "ts", "role", "requested_power", "applied_power", "temperature", "override",
+    "client_ip", "user_agent", "request_path", "request_method", "client_id", "event_type",
+    "count", "ml_score", "ml_label", "plant_seq",
+]
+
+_STOP = object()
+
+
+class CsvSink:
+    """Append rows to a CSV file that stays open for the writer's lifetime."""
+
+    def __init__(self, path, columns=EVENT_COLUMNS):
+        self.path = path
+        self.columns = list(columns)
+        self._f = None
+        self._writer = None
+
+    def open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        write_header = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        if not write_header:
+            migrate_csv(self.path, self.columns)
+        self._f = open(self.path, "a", newline="")
+        self._writer = csv.writer(self._f)
+        if write_header:
+            self._writer.writerow(self.columns)
+            self._f.flush()
+
+    def write_rows(self, rows):
+        self._writer.writerows(rows)
+        self._f.flush()
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+
+def migrate_csv(path, columns=EVENT_COLUMNS):
+    """Rewrite an events CSV whose header differs from `columns`. Returns True if it was rewritten.
+
+    Rows are mapped by column name; columns the old file lacks are left empty.
+    """
+    with open(path, newline="") as f:
+        header = next(csv.reader(f), [])
+    if header == list(columns):
+        return False
+    pos = [header.index(c) if c in header else None for c in columns]
+    tmp = path + ".migrating"
+    with open(path, newline="") as src, open(tmp, "w", newline="") as dst:
+        reader = csv.reader(src)
+        next(reader, None)
+        writer = csv.writer(dst)
+        writer.writerow(columns)
+        for row in reader:
+            writer.writerow([row[i] if i is not None and i < len(row) else "" for i in pos])
+    os.replace(tmp, path)
+    print(f"[eventlog] migrated {path} to columns {list(columns)}", file=sys.stderr)
+    return True
+
+
+def make_sink(store, path, columns=EVENT_COLUMNS):
+    """Sink for an event store kind: 'csv' (default), 'sqlite' or 'parquet'."""
+    if store == "parquet":
+        from eventlog.parquet_store import ParquetSegmentSink
+        return ParquetSegmentSink(path, columns)
+    if store == "sqlite":
+        from eventlog.sqlite_store import SqliteSink
+        return SqliteSink(path, columns)
+    if store == "csv":
+        return CsvSink(path, columns)
+    raise ValueError(f"unknown event store: {store!r}")
+
+
+class BatchedEventWriter:
+    """Single consumer thread that group-commits queued rows to `sink`.
+
+    When the queue is full, `write` waits at most `put_timeout` seconds for the
+    writer to catch up (backpressure) and then drops the row, counting it in
+    `dropped`, so a request thread is never stuck behind disk I/O. With
+    block=False (callers on an asyncio event loop) it drops at once instead.
+    """
+
+    def __init__(self, sink, max_queue=10000, batch_size=256, flush_interval=0.5, put_timeout=0.05):
+        self.sink = sink
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self.put_timeout = float(put_timeout)
+        self.dropped = 0
+        self.written = 0
+        self.errors = 0
+        self._queue = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        self.sink.open()
+        self._thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def write(self, rec, block=True):
+        """Queue one row. Returns False if it had to be dropped."""
+        try:
+            self._queue.put_nowait(rec)
+            return True
+        except queue.Full:
+            pass
+        try:
+            if not block:
+                raise queue.Full
+            self._queue.put(rec, timeout=self.put_timeout)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def qsize(self):
+        return self._queue.qsize()
+
+    def flush(self, timeout=5.0):
+        """Block until every row queued before this call has been written."""
+        if self._thread is None or not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """Drain the queue, flush the last batch and close the sink."""
+        if self._thread is None:
+            return
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if not batch else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                self._commit(batch)
+                self.sink.close()
+                return
+            if isinstance(item, threading.Event):
+                self._commit(batch)
+                batch = []
+                item.set()
+                continue
+            if item is not None:
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+            if len(batch) >= self.batch_size or (batch and time.monotonic() >= deadline):
+                self._commit(batch)
+                batch = []
+
+    def _commit(self, batch):
+        if not batch:
+            return
+        try:
+            self.sink.write_rows(batch)
+            self.written += len(batch)
+        except Exception as e:
+            self.errors += 1
+            print(f"[eventlog] failed to write {len(batch)} row(s): {e}", file=sys.stderr)
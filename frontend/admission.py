@@ -0,0 +1,90 @@
+# frontend/admission.py
+"""Per-client admission control for actuator commands.
+
+`TokenBucketLimiter` gives every client key (client IP or client_id) a bucket
+of `burst` tokens that refills at `rate` tokens per second. Each admitted
+request takes one token. A client whose bucket is empty is throttled, so a
+flooding client only slows down itself: every other client keeps its own
+tokens and its own latency. Buckets live in an LRU table capped at
+`max_clients`. A client evicted from the table is simply given a fresh bucket
+when it returns.
+
+`ThrottleEpisodes` folds a client's throttled requests into one pending
+record. The record is handed back (to be logged as one row with a count)
+when the client is admitted again, after `window` seconds, or when it is
+popped explicitly at engagement end or shutdown.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    def __init__(self, rate, burst, max_clients=100000, exempt=(), clock=time.monotonic):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.max_clients = max(1, int(max_clients))
+        self.exempt = frozenset(exempt)
+        self.clock = clock
+        self._buckets = OrderedDict()  # key -> [tokens, last refill time]
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.rate > 0
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def allow(self, key):
+        """Take a token for `key`. Returns False if the client is over its rate."""
+        if not self.enabled or key in self.exempt:
+            return True
+        now = self.clock()
+        with self._lock:
+            b = self._buckets.get(key)
+            if b is None:
+                b = self._buckets[key] = [self.burst, now]
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                b[0] = min(self.burst, b[0] + (now - b[1]) * self.rate)
+                b[1] = now
+            if b[0] >= 1.0:
+                b[0] -= 1.0
+                return True
+            return False
+
+
+class ThrottleEpisodes:
+    def __init__(self, window=5):
+        self.window = window
+        self._pending = {}  # key -> [first_ts, last_ts, count, info]
+        self._lock = threading.Lock()
+
+    def add(self, key, ts, info):
+        """Count one throttled request. Returns a finished episode once it spans `window` seconds."""
+        with self._lock:
+            ep = self._pending.get(key)
+            if ep is None:
+                self._pending[key] = [ts, ts, 1, info]
+                return None
+            ep[1] = ts
+            ep[2] += 1
+            ep[3] = info
+            if ts - ep[0] >= self.window:
+                return self._pending.pop(key)
+            return None
+
+    def pop(self, key):
+        """The pending episode for `key` as [first_ts, last_ts, count, info], or None."""
+        if key not in self._pending:
+            return None
+        with self._lock:
+            return self._pending.pop(key, None)
+
+    def drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return list(pending.items())
@@ -1,5 +1,6 @@
-from flask import Flask, request, jsonify, send_from_directory
-import csv, os, time, threading
+from flask import Flask, Response, request, jsonify, send_from_directory
+import atexit, contextvars, json, math, mimetypes, os, time
+from urllib.parse import parse_qs
 import sys
 ROOT = os.path.normpath(os.path.join(os.path.dirname(__file__), '..'))
 # ensure simulator and scc packages are importable regardless of cwd
@@ -7,134 +8,381 @@ ROOT = os.path.normpath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, ROOT)
 
 from simulator.room import RoomSimulator
-from scc.safety_filter import SafetyFilter, load_config
+from simulator.room_array import RoomArraySimulator
+from scc.safety_filter import load_config
+from scc.interval import load_filter
+from eventlog.writer import BatchedEventWriter, make_sink
+from frontend.plant import PlantState, ZonePlantState
+from frontend.engagement import EngagementTracker
+from frontend.checkpoint import StateCheckpoint
+from frontend.scorer import MicroBatchScorer
+from frontend.sessions import SessionAggregator
+from frontend.admission import TokenBucketLimiter, ThrottleEpisodes
+from frontend.http_cache import ResponseCache, is_not_modified, validator_headers
+from frontend.metrics import MetricsRegistry, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from frontend.asgi import AsgiApp, json_response, html_response, bytes_response
 
 app = Flask(__name__)
 DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "logs")
 os.makedirs(DATA_DIR, exist_ok=True)
-LOGFILE = os.path.join(DATA_DIR, "events.csv")
+# EVENT_STORE=csv (default), sqlite or parquet (hourly segments under logs/events/);
+# EVENT_LOG_PATH overrides the file/directory location
+EVENT_STORE = os.environ.get('EVENT_STORE', 'csv')
+_DEFAULT_LOG_NAMES = {'csv': "events.csv", 'sqlite': "events.db", 'parquet': "events"}
+LOGFILE = os.environ.get('EVENT_LOG_PATH') or os.path.join(DATA_DIR, _DEFAULT_LOG_NAMES.get(EVENT_STORE, "events.csv"))
 
-# Engagement tracking state
-_last_seen = {}  # client_ip -> last_ts
-_active = set()  # client_ip currently in an active session
-ENGAGEMENT_GAP = int(os.environ.get('ENGAGEMENT_GAP', '120'))  # seconds
+# Single background writer for the events log: request handlers and the
+# engagement monitor only enqueue rows, the writer thread batches them to disk.
+EVENT_LOG_QUEUE_SIZE = int(os.environ.get('EVENT_LOG_QUEUE_SIZE', '10000'))
+EVENT_LOG_BATCH_SIZE = int(os.environ.get('EVENT_LOG_BATCH_SIZE', '256'))
+EVENT_LOG_FLUSH_MS = int(os.environ.get('EVENT_LOG_FLUSH_MS', '500'))
+_event_writer = BatchedEventWriter(
+    make_sink(EVENT_STORE, LOGFILE),
+    max_queue=EVENT_LOG_QUEUE_SIZE,
+    batch_size=EVENT_LOG_BATCH_SIZE,
+    flush_interval=EVENT_LOG_FLUSH_MS / 1000.0,
+).start()
+atexit.register(_event_writer.close)
 
+ENGAGEMENT_GAP = int(os.environ.get('ENGAGEMENT_GAP', '120'))  # seconds
+# cap on tracked clients; beyond it the least recently seen client's engagement is ended
+ENGAGEMENT_MAX_CLIENTS = int(os.environ.get('ENGAGEMENT_MAX_CLIENTS', '100000'))
 
-def _engagement_monitor():
-    """Background thread: closes sessions when inactivity > ENGAGEMENT_GAP"""
-    while True:
-        now = int(time.time())
-        to_close = []
-        for client in list(_active):
-            last = _last_seen.get(client, 0)
-            if now - last > ENGAGEMENT_GAP:
-                to_close.append(client)
-        for c in to_close:
-            # write an engagement_end marker
-            ts = int(time.time())
-            try:
-                    # fill new columns: request_path, request_method, client_id
-                    log_event([ts, 'system', None, None, None, None, c, '', '', '', f'{c}', 'engagement_end'])
-            except Exception:
-                pass
-            _active.discard(c)
-        time.sleep(max(5, ENGAGEMENT_GAP // 4))
-
-
-# start background thread
-_monitor_thread = threading.Thread(target=_engagement_monitor, daemon=True)
-_monitor_thread.start()
+# Metrics served on /metrics. Per-phase latency of /actuator/heater goes into
+# one histogram family labelled by phase.
+metrics = MetricsRegistry()
+HEATER_PHASES = ('json_parse', 'plant_lock', 'scc_filter', 'sim_step', 'log_event', 'engagement', 'ml_score')
+heater_phase = {
+    phase: metrics.histogram('honeypot_heater_phase_seconds', 'Time spent in each phase of /actuator/heater',
+                             labels={'phase': phase})
+    for phase in HEATER_PHASES
+}
+heater_latency = metrics.histogram('honeypot_heater_request_seconds', 'Total /actuator/heater handler time')
+heater_requests = metrics.counter('honeypot_heater_requests_total', 'Heater commands applied')
+heater_overrides = metrics.counter('honeypot_heater_overrides_total', 'Heater commands modified by the SCC')
+heater_malformed = metrics.counter('honeypot_heater_malformed_total', 'Heater requests rejected as malformed')
+heater_throttled = metrics.counter('honeypot_heater_throttled_total', 'Heater requests answered by the throttled fast path')
+metrics.gauge('honeypot_event_log_queue_depth', 'Rows waiting in the event log queue', _event_writer.qsize)
+metrics.counter('honeypot_event_log_written_total', 'Rows written by the event log writer', fn=lambda: _event_writer.written)
+metrics.counter('honeypot_event_log_dropped_total', 'Rows dropped because the event log queue was full',
+                fn=lambda: _event_writer.dropped)
+metrics.counter('honeypot_event_log_errors_total', 'Failed event log batch writes', fn=lambda: _event_writer.errors)
 
 # global simple instances (for prototype/demo)
 sim = RoomSimulator()
-config = load_config(os.path.join(os.path.dirname(__file__), "..", "scc", "config.yaml"))
-sfilter = SafetyFilter(config)
+SCC_CONFIG = os.path.join(os.path.dirname(__file__), "..", "scc", "config.yaml")
+config = load_config(SCC_CONFIG)
+# smoothed or interval SCC per config.yaml `mode`; rebuilt when the file changes.
+# Zones use the same filter: their default parameters match `sim`.
+sfilter = load_filter(SCC_CONFIG, sim)
+# all reads/mutations of sim + sfilter go through plant (see frontend/plant.py)
+plant = PlantState(sim, sfilter, timings=heater_phase)
+# extra virtual rooms served under /zone/<id>/... (HVAC_ZONES=<n> gives ids 0..n-1);
+# all zones live in one array-backed simulator and share the SCC config
+HVAC_ZONES = int(os.environ.get('HVAC_ZONES', '0'))
+zones = ZonePlantState(RoomArraySimulator(HVAC_ZONES), sfilter, timings=heater_phase)
+
+# False inside ASGI handlers: a full log queue drops the row at once rather than
+# waiting put_timeout on the event loop (which would stall every connection)
+_log_blocking = contextvars.ContextVar('log_blocking', default=True)
+
 
 def log_event(rec):
-    # Support optional event_type column as last element in rec
-    header = ["ts", "role", "requested_power", "applied_power", "temperature", "override", "client_ip", "user_agent", "request_path", "request_method", "client_id", "event_type"]
-    write_header = not os.path.exists(LOGFILE)
-    with open(LOGFILE, "a", newline="") as f:
-        writer = csv.writer(f)
-        if write_header:
-            writer.writerow(header)
-        writer.writerow(rec)
+    # rec follows eventlog.writer.EVENT_COLUMNS.
+    # Only enqueues; the row reaches disk with the writer's next batch.
+    _event_writer.write(rec, block=_log_blocking.get())
 
-@app.route("/sensor/temperature", methods=["GET"])
-def get_temp():
-    return jsonify({"temperature": sim.T})
 
-@app.route("/actuator/heater", methods=["POST"])
-def set_heater():
+def _drop_client_state(client, last_seen):
+    # runs under the tracker's lock as the client's entry is removed, so these dicts
+    # are bounded by ENGAGEMENT_MAX_CLIENTS; the throttle row is logged by _log_engagement_end
+    last_response.pop(client, None)
+    episode = throttled.pop(client)
+    if episode is not None:
+        _ended_episodes[(client, last_seen)] = episode
+
+
+def _forget_if_dropped(client):
+    # the tracker dropped the client between this request's touch and its write above
+    if engagements.last_seen(client) is None:
+        last_response.pop(client, None)
+        _log_throttled(client, throttled.pop(client))
+
+
+def _log_engagement_end(client, ts, last_seen=None):
+    # runs outside the tracker's lock, after _drop_client_state for the same engagement
+    _log_throttled(client, _ended_episodes.pop((client, last_seen), None))
+    # fill new columns: request_path, request_method, client_id
+    log_event([ts, 'system', None, None, None, None, client, '', '', '', f'{client}', 'engagement_end', None, None, None, None])
+    live_sessions.close(client, last_seen)
+
+
+# Admission control: a token bucket per client (ADMISSION_KEY=ip or client_id).
+# Requests over the rate skip the SCC, the simulator step and per-request
+# logging; see handle_throttled. ADMISSION_RATE=0 disables throttling and
+# ADMISSION_EXEMPT lists operator IPs that are never throttled.
+ADMISSION_RATE = float(os.environ.get('ADMISSION_RATE', '5'))      # tokens/s
+ADMISSION_BURST = float(os.environ.get('ADMISSION_BURST', '20'))
+ADMISSION_KEY = os.environ.get('ADMISSION_KEY', 'ip')
+admission = TokenBucketLimiter(
+    ADMISSION_RATE, ADMISSION_BURST, max_clients=ENGAGEMENT_MAX_CLIENTS,
+    exempt=[ip.strip() for ip in os.environ.get('ADMISSION_EXEMPT', '').split(',') if ip.strip()],
+)
+# throttled requests of one client are logged as one 'throttled' row with a count,
+# at most THROTTLE_LOG_WINDOW seconds apart
+throttled = ThrottleEpisodes(window=int(os.environ.get('THROTTLE_LOG_WINDOW', '5')))
+# last response sent to each client with an open engagement; replayed to throttled requests
+last_response = {}
+# throttle episodes of ended engagements, keyed (client, last_seen), until their end row is logged
+_ended_episodes = {}
+metrics.gauge('honeypot_admission_clients', 'Clients with a token bucket', lambda: len(admission))
+
+
+def _log_throttled(client, episode):
+    if episode is None:
+        return
+    first_ts, last_ts, count, (user_agent, request_path, request_method) = episode
+    log_event([last_ts, None, None, None, None, False, client, user_agent, request_path, request_method,
+               f"{client}|{user_agent}", 'throttled', count, None, None, None])
+
+
+def _flush_throttled():
+    for client, episode in throttled.drain():
+        _log_throttled(client, episode)
+    for (client, _), episode in list(_ended_episodes.items()):
+        _log_throttled(client, episode)
+    _ended_episodes.clear()
+
+
+atexit.register(_flush_throttled)  # atexit runs this before _event_writer.close
+
+
+# per-client session aggregates maintained as events arrive (served by /api/sessions)
+live_sessions = SessionAggregator(ENGAGEMENT_GAP, max_closed=int(os.environ.get('SESSIONS_MAX_CLOSED', '10000')))
+
+
+# Engagement tracking: bounded per-client last-seen table whose expiry thread
+# writes engagement_end markers when a client's inactivity gap runs out
+engagements = EngagementTracker(ENGAGEMENT_GAP, max_clients=ENGAGEMENT_MAX_CLIENTS, on_end=_log_engagement_end,
+                                on_drop=_drop_client_state).start()
+metrics.gauge('honeypot_engagements_active', 'Clients with an open engagement', lambda: len(engagements))
+metrics.counter('honeypot_engagements_evicted_total', 'Engagements ended early by the client cap',
+                fn=lambda: engagements.evicted)
+
+
+# State checkpoint (frontend/checkpoint.py): room/zone temperatures, the last
+# heater command, engagements and open sessions survive a restart, with the
+# room advanced over the downtime. STATE_CHECKPOINT_PATH='' disables it.
+STATE_CHECKPOINT_PATH = os.environ.get('STATE_CHECKPOINT_PATH', os.path.join(DATA_DIR, 'state.ckpt'))
+STATE_CHECKPOINT_INTERVAL = float(os.environ.get('STATE_CHECKPOINT_INTERVAL', '5'))  # seconds
+state_checkpoint = None
+if STATE_CHECKPOINT_PATH:
+    state_checkpoint = StateCheckpoint(STATE_CHECKPOINT_PATH, plant, zones, engagements, live_sessions,
+                                       capacity=ENGAGEMENT_MAX_CLIENTS)
+    state_checkpoint.restore()
+    state_checkpoint.start(STATE_CHECKPOINT_INTERVAL)
+    atexit.register(state_checkpoint.close)
+    metrics.counter('honeypot_state_checkpoints_total', 'State checkpoints written',
+                    fn=lambda: state_checkpoint.writes)
+    metrics.gauge('honeypot_state_checkpoint_torn', 'Whether the restored checkpoint was interrupted mid-write',
+                  lambda: int(state_checkpoint.torn))
+
+
+# Inline detection (frontend/scorer.py): every heater event is scored by the
+# ml.predictor model, micro-batched across requests (up to ML_BATCH_MAX events
+# or ML_BATCH_WAIT_MS per predict_proba call). A request waits at most
+# ML_LATENCY_BUDGET_MS for its score, after which its row is logged with
+# ml_label='unscored'. While no model can be loaded (or with ML_SCORER=0) the
+# columns stay empty; a model that appears later is picked up by the registry.
+ML_SCORER = os.environ.get('ML_SCORER', '1') != '0'
+ML_MODEL_PATH = os.environ.get('ML_MODEL_PATH', os.path.join(ROOT, 'models', 'attack_detector_rf.pkl'))
+ML_SCALER_PATH = os.environ.get('ML_SCALER_PATH', os.path.join(ROOT, 'models', 'scaler.pkl'))
+ML_THRESHOLD = float(os.environ.get('ML_THRESHOLD', '0.5'))
+ml_scorer = None
+if ML_SCORER:
     try:
-        data = request.get_json(force=True)
-    except Exception:
-        return jsonify({"error": "invalid json"}), 400
-    power = float(data.get("power", 0.0))
-    role = data.get("role", "user")
-    # define simulate_step_fn that uses the simulator's current state (preview)
-    def simulate_step_fn(p):
-        # create a temporary copy of sim state for prediction
-        temp = sim.T
-        # use same dynamics calculation as step but don't mutate sim
-        dT_dt = (1.0/sim.C) * (-(temp - sim.T_out)/sim.R + sim.eta * float(p))
-        pred = temp + dT_dt * (sim.dt / 60.0)
-        return pred
-    applied, override = sfilter.filter(sim.T, power, simulate_step_fn)
-    # apply to simulator
-    newT = sim.step(P_heater=applied)
+        # sklearn/xgboost are optional; the registry loads the model on first use
+        # and reloads it when its files change
+        from ml import predictor
+        from ml.model_registry import registry as model_registry
+        model_registry.register(predictor.MODEL_NAME, ML_MODEL_PATH, ML_SCALER_PATH)
+    except ImportError:
+        predictor = None
+    if predictor is not None:
+        def _ml_ready():
+            return model_registry.try_get(predictor.MODEL_NAME) is not None
+
+        def _ml_score_batch(X):
+            r = predictor.predict_batch(X, threshold=ML_THRESHOLD)
+            return r['score'], r['label']
+        ml_scorer = MicroBatchScorer(
+            _ml_score_batch,
+            max_batch=int(os.environ.get('ML_BATCH_MAX', '64')),
+            max_wait=float(os.environ.get('ML_BATCH_WAIT_MS', '2')) / 1000.0,
+            budget=float(os.environ.get('ML_LATENCY_BUDGET_MS', '20')) / 1000.0,
+        ).start()
+        atexit.register(ml_scorer.close)  # before _event_writer.close
+        metrics.gauge('honeypot_ml_queue_depth', 'Events waiting to be scored', ml_scorer.qsize)
+        metrics.counter('honeypot_ml_scored_total', 'Events scored by the inline detector', fn=lambda: ml_scorer.scored)
+        metrics.counter('honeypot_ml_unscored_total', 'Events logged unscored (latency budget exceeded)',
+                        fn=lambda: ml_scorer.unscored)
+        metrics.counter('honeypot_ml_batches_total', 'predict_proba calls made by the inline detector',
+                        fn=lambda: ml_scorer.batches)
+        metrics.counter('honeypot_ml_errors_total', 'Failed inline detector batches', fn=lambda: ml_scorer.errors)
+
+
+# --- request handling shared by the Flask and ASGI servers ---
+
+PLOTS_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'scripts', 'plots'))
+SESSIONS_ARGS_ERROR = {'error': 'since, offset and limit must be integers'}
+response_cache = ResponseCache()
+
+
+def client_ip_from(xff, remote_addr):
+    # prefer X-Forwarded-For when present (useful behind proxies); take first ip in list
+    if xff:
+        return xff.split(',')[0].strip()
+    return remote_addr
+
+
+def parse_heater(data):
+    """(power, role) from a decoded heater payload. Raises ValueError if it is malformed."""
+    try:
+        power = float(data.get("power", 0.0))
+    except (AttributeError, TypeError, ValueError):
+        raise ValueError("invalid payload")
+    # json accepts NaN/Infinity; one such command would poison the room temperature for good
+    if not math.isfinite(power):
+        raise ValueError("invalid payload")
+    return power, data.get("role", "user")
+
+
+def admission_key(client_ip, user_agent):
+    return f"{client_ip}|{user_agent}" if ADMISSION_KEY == 'client_id' else client_ip
+
+
+def handle_throttled(client_ip, user_agent, request_path, request_method):
+    """Fast path for a client over its rate: no SCC or simulator step, no per-request log row.
+
+    The engagement and the live session still see every request, and the
+    request is counted in the client's pending 'throttled' log row. Returns the
+    client's previous response.
+    """
     ts = int(time.time())
+    if engagements.touch(client_ip, ts):
+        log_event([ts, 'system', None, None, None, None, client_ip, user_agent, request_path, request_method,
+                   f"{client_ip}|{user_agent}", 'engagement_start', None, None, None, None])
+    live_sessions.observe(client_ip, ts)
+    _log_throttled(client_ip, throttled.add(client_ip, ts, (user_agent, request_path, request_method)))
+    _forget_if_dropped(client_ip)
+    heater_throttled.inc()
+    payload = last_response.get(client_ip)
+    if payload is None:
+        snap = plant.snapshot
+        payload = {"requested_power": snap.requested_power, "applied_power": snap.applied_power,
+                   "temperature": snap.temperature, "override": snap.override}
+    return payload
+
+
+def _heater_begin(power, role, client_ip, user_agent, request_path, request_method, zone):
+    # SCC preview + filter + simulator step as one atomic update
+    snap = plant.apply(power) if zone is None else zones.apply(zone, power)
+    applied, override, newT = snap.applied_power, snap.override, snap.temperature
+    # taken under the plant lock: (ts, plant_seq) orders rows the way the plant applied them,
+    # even though rows reach the log in whatever order their requests finish
+    ts = int(snap.ts)
     # capture client identity info to allow session/engagement analysis
-    # prefer X-Forwarded-For when present (useful behind proxies)
-    xff = request.headers.get('X-Forwarded-For', '')
-    if xff:
-        # take first ip in list
-        client_ip = xff.split(',')[0].strip()
-    else:
-        client_ip = request.remote_addr
-    user_agent = request.headers.get("User-Agent", "")
-    request_path = request.path
-    request_method = request.method
     client_id = f"{client_ip}|{user_agent}"
+    # scored in the background while the engagement bookkeeping runs
+    pending = ml_scorer.submit([power, applied, newT, int(override)]) if ml_scorer is not None and _ml_ready() else None
 
+    t0 = time.perf_counter()
     # engagement start detection: if unseen or gap exceeded, emit a start marker
-    last = _last_seen.get(client_ip)
-    if last is None or (ts - last) > ENGAGEMENT_GAP:
+    started = engagements.touch(client_ip, ts)
+    heater_phase['engagement'].observe(time.perf_counter() - t0)
+    if started:
         try:
-            log_event([ts, 'system', None, None, None, None, client_ip, user_agent, request_path, request_method, client_id, 'engagement_start'])
+            log_event([ts, 'system', None, None, None, None, client_ip, user_agent, request_path, request_method, client_id, 'engagement_start', None, None, None, None])
         except Exception:
             pass
-        _active.add(client_ip)
+    # close the client's throttle episode, if any, so its row precedes this one
+    _log_throttled(client_ip, throttled.pop(client_ip))
+    return (ts, role, power, applied, newT, override, client_ip, user_agent, request_path, request_method, client_id), snap.seq, pending
 
-    # update last seen
-    _last_seen[client_ip] = ts
 
+def _heater_finish(row, seq, scored, wait_s):
+    ts, role, power, applied, newT, override, client_ip = row[:7]
+    ml_score, ml_label = scored
+    t1 = time.perf_counter()
+    live_sessions.observe(client_ip, ts, override, ml_score)
     # log the actual event
-    log_event([ts, role, power, applied, newT, override, client_ip, user_agent, request_path, request_method, client_id, 'event'])
-    return jsonify({"requested_power": power, "applied_power": applied, "temperature": newT, "override": override})
+    log_event(list(row) + ['event', None, ml_score, ml_label, seq])
+    heater_phase['log_event'].observe(time.perf_counter() - t1)
+    if wait_s is not None:
+        heater_phase['ml_score'].observe(wait_s)
+    heater_requests.inc()
+    if override:
+        heater_overrides.inc()
+    payload = last_response[client_ip] = {"requested_power": power, "applied_power": applied, "temperature": newT, "override": override}
+    _forget_if_dropped(client_ip)
+    return payload
 
-if __name__ == "__main__":
-    app.run(port=5000, host="0.0.0.0")
 
+def handle_heater(power, role, client_ip, user_agent, request_path, request_method, zone=None):
+    """Apply one heater command (to the main room, or to `zone`) and log it. Returns the JSON response payload."""
+    row, seq, pending = _heater_begin(power, role, client_ip, user_agent, request_path, request_method, zone)
+    if pending is None:
+        return _heater_finish(row, seq, (None, None), None)
+    t0 = time.perf_counter()
+    scored = ml_scorer.result(pending)
+    return _heater_finish(row, seq, scored, time.perf_counter() - t0)
 
-@app.route('/api/sessions', methods=['GET'])
-def api_sessions():
-    """Return sessions CSV as JSON list for the dashboard."""
-    sessions_path = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'engagement_sessions.csv')
-    if not os.path.exists(sessions_path):
-        return jsonify({'error': 'sessions not generated yet'}), 404
-    import pandas as pd
-    df = pd.read_csv(sessions_path)
-    return jsonify(df.to_dict(orient='records'))
 
+async def handle_heater_async(power, role, client_ip, user_agent, request_path, request_method, zone=None):
+    """handle_heater for the ASGI server: waits for the ML score without blocking the event loop."""
+    row, seq, pending = _heater_begin(power, role, client_ip, user_agent, request_path, request_method, zone)
+    if pending is None:
+        return _heater_finish(row, seq, (None, None), None)
+    t0 = time.perf_counter()
+    scored = await ml_scorer.result_async(pending)
+    return _heater_finish(row, seq, scored, time.perf_counter() - t0)
 
-@app.route('/dashboard', methods=['GET'])
-def dashboard_page():
+
+def _json_bytes(payload):
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def sessions_response(args):
+    """Cached /api/sessions response for the query args (?since, ?offset, ?limit); None if they are invalid."""
+    try:
+        since = int(args['since']) if args.get('since') else None
+        offset = max(0, int(args.get('offset') or 0))
+        limit = max(0, int(args['limit'])) if args.get('limit') else None
+    except ValueError:
+        return None
+
+    def render():
+        page, total = live_sessions.sessions(since=since, offset=offset, limit=limit)
+        return _json_bytes(page), [('X-Total-Count', str(total))]
+    # re-serialised only after the aggregator has changed
+    return response_cache.get(('sessions', since, offset, limit), live_sessions.version, render, 'application/json')
+
+
+def dashboard_response():
+    """Cached dashboard page, rebuilt only when the plots directory changes."""
+    try:
+        mtime_ns = os.stat(PLOTS_DIR).st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    return response_cache.get('dashboard', mtime_ns, lambda: dashboard_html().encode('utf-8'),
+                              'text/html; charset=utf-8', last_modified=mtime_ns / 1e9 if mtime_ns else None)
+
+
+def dashboard_html():
     """Simple dashboard page that shows generated plots and refreshes every 10s."""
-    plots_dir = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'plots')
     plots = []
-    if os.path.exists(plots_dir):
-        for fname in sorted(os.listdir(plots_dir)):
+    if os.path.exists(PLOTS_DIR):
+        for fname in sorted(os.listdir(PLOTS_DIR)):
             if fname.lower().endswith('.png'):
                 plots.append('/static/plots/' + fname)
     # create a tiny HTML that shows images
@@ -149,7 +397,206 @@ def dashboard_page():
     return '\n'.join(html_parts)
 
 
+# --- Flask (threaded WSGI) routes ---
+
+def _flask_cached(resp):
+    headers = validator_headers(resp) + resp.headers
+    if is_not_modified(resp, request.headers.get('If-None-Match'), request.headers.get('If-Modified-Since')):
+        return Response(status=304, headers=headers)
+    return Response(resp.body, status=200, headers=headers, content_type=resp.content_type)
+
+
+@app.route("/sensor/temperature", methods=["GET"])
+def get_temp():
+    return jsonify({"temperature": plant.snapshot.temperature})
+
+@app.route("/actuator/heater", methods=["POST"])
+def set_heater():
+    return _flask_heater()
+
+
+@app.route("/zone/<int:zone>/sensor/temperature", methods=["GET"])
+def get_zone_temp(zone):
+    if zone not in zones:
+        return jsonify({"error": "unknown zone"}), 404
+    return jsonify({"zone": zone, "temperature": zones.temperature(zone)})
+
+
+@app.route("/zone/<int:zone>/actuator/heater", methods=["POST"])
+def set_zone_heater(zone):
+    if zone not in zones:
+        return jsonify({"error": "unknown zone"}), 404
+    return _flask_heater(zone)
+
+
+def _flask_heater(zone=None):
+    t0 = time.perf_counter()
+    client_ip = client_ip_from(request.headers.get('X-Forwarded-For', ''), request.remote_addr)
+    user_agent = request.headers.get("User-Agent", "")
+    if not admission.allow(admission_key(client_ip, user_agent)):
+        return jsonify(handle_throttled(client_ip, user_agent, request.path, request.method))
+    try:
+        data = request.get_json(force=True)
+    except Exception:
+        heater_malformed.inc()
+        return jsonify({"error": "invalid json"}), 400
+    try:
+        power, role = parse_heater(data)
+    except ValueError as e:
+        heater_malformed.inc()
+        return jsonify({"error": str(e)}), 400
+    heater_phase['json_parse'].observe(time.perf_counter() - t0)
+    resp = jsonify(handle_heater(power, role, client_ip, user_agent, request.path, request.method, zone))
+    heater_latency.observe(time.perf_counter() - t0)
+    return resp
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_page():
+    return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
+
+@app.route('/api/sessions', methods=['GET'])
+def api_sessions():
+    """Return live sessions as a JSON list (?since=<ts>&offset=<n>&limit=<n>)."""
+    resp = sessions_response(request.args)
+    if resp is None:
+        return jsonify(SESSIONS_ARGS_ERROR), 400
+    return _flask_cached(resp)
+
+
+@app.route('/dashboard', methods=['GET'])
+def dashboard_page():
+    return _flask_cached(dashboard_response())
+
+
 @app.route('/static/plots/<path:filename>')
 def serve_plot(filename):
-    plots_dir = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'scripts', 'plots'))
-    return send_from_directory(plots_dir, filename)
\ No newline at end of file
+    return send_from_directory(PLOTS_DIR, filename)
+
+
+# --- ASGI (asyncio) routes: same contracts, one coroutine per connection ---
+# Run with `python frontend/app.py --server asgi` or `uvicorn frontend.app:asgi_app`.
+
+asgi_app = AsgiApp()
+asgi_app.on_shutdown(_flush_throttled)
+if state_checkpoint is not None:
+    asgi_app.on_shutdown(state_checkpoint.close)
+if ml_scorer is not None:
+    asgi_app.on_shutdown(ml_scorer.close)
+asgi_app.on_shutdown(_event_writer.close)
+
+
+def _asgi_cached(req, resp):
+    headers = validator_headers(resp) + resp.headers
+    if is_not_modified(resp, req.headers.get('if-none-match'), req.headers.get('if-modified-since')):
+        return bytes_response(b'', resp.content_type, status=304, headers=headers)
+    return bytes_response(resp.body, resp.content_type, headers=headers)
+
+
+@asgi_app.route("/sensor/temperature", methods=["GET"])
+async def asgi_get_temp(req):
+    return json_response({"temperature": plant.snapshot.temperature})
+
+
+@asgi_app.route("/actuator/heater", methods=["POST"])
+async def asgi_set_heater(req):
+    return await _asgi_heater(req)
+
+
+@asgi_app.route('/zone/', methods=['GET', 'POST'], prefix=True)
+async def asgi_zone(req, subpath):
+    # /zone/<id>/sensor/temperature (GET) and /zone/<id>/actuator/heater (POST)
+    zone, _, rest = subpath.partition('/')
+    if not zone.isdigit() or rest not in ('sensor/temperature', 'actuator/heater'):
+        return html_response('<h1>Not Found</h1>', status=404)
+    zone = int(zone)
+    if rest == 'sensor/temperature' and req.method != 'GET' or rest == 'actuator/heater' and req.method != 'POST':
+        return html_response('<h1>Method Not Allowed</h1>', status=405)
+    if zone not in zones:
+        return json_response({"error": "unknown zone"}, status=404)
+    if rest == 'sensor/temperature':
+        return json_response({"zone": zone, "temperature": zones.temperature(zone)})
+    return await _asgi_heater(req, zone)
+
+
+async def _asgi_heater(req, zone=None):
+    t0 = time.perf_counter()
+    _log_blocking.set(False)  # scoped to this request's task
+    client_ip = client_ip_from(req.headers.get('x-forwarded-for', ''), req.client_addr)
+    user_agent = req.headers.get('user-agent', '')
+    if not admission.allow(admission_key(client_ip, user_agent)):
+        return json_response(handle_throttled(client_ip, user_agent, req.path, req.method))
+    try:
+        data = json.loads(req.body)
+    except Exception:
+        heater_malformed.inc()
+        return json_response({"error": "invalid json"}, status=400)
+    try:
+        power, role = parse_heater(data)
+    except ValueError as e:
+        heater_malformed.inc()
+        return json_response({"error": str(e)}, status=400)
+    heater_phase['json_parse'].observe(time.perf_counter() - t0)
+    resp = json_response(await handle_heater_async(power, role, client_ip, user_agent, req.path, req.method, zone))
+    heater_latency.observe(time.perf_counter() - t0)
+    return resp
+
+
+@asgi_app.route('/metrics', methods=['GET'])
+async def asgi_metrics_page(req):
+    return bytes_response(metrics.render().encode('utf-8'), METRICS_CONTENT_TYPE)
+
+
+@asgi_app.route('/api/sessions', methods=['GET'])
+async def asgi_api_sessions(req):
+    args = {k: v[0] for k, v in parse_qs(req.query_string).items()}
+    resp = sessions_response(args)
+    if resp is None:
+        return json_response(SESSIONS_ARGS_ERROR, status=400)
+    return _asgi_cached(req, resp)
+
+
+@asgi_app.route('/dashboard', methods=['GET'])
+async def asgi_dashboard_page(req):
+    return _asgi_cached(req, dashboard_response())
+
+
+@asgi_app.route('/static/plots/', methods=['GET'], prefix=True)
+async def asgi_serve_plot(req, filename):
+    path = os.path.normpath(os.path.join(PLOTS_DIR, filename))
+    try:
+        if not path.startswith(PLOTS_DIR + os.sep):
+            raise FileNotFoundError(path)
+        st = os.stat(path)
+    except OSError:
+        return html_response('<h1>Not Found</h1>', status=404)
+
+    def render():
+        with open(path, 'rb') as f:
+            return f.read()
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    resp = response_cache.get(('plot', path), (st.st_mtime_ns, st.st_size), render, content_type, last_modified=st.st_mtime)
+    return _asgi_cached(req, resp)
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='HVAC honeypot API')
+    parser.add_argument('--server', choices=['flask', 'asgi'], default=os.environ.get('HONEYPOT_SERVER', 'flask'),
+                        help='flask: threaded WSGI server; asgi: asyncio event loop via uvicorn')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args()
+    if args.server == 'asgi':
+        try:
+            import uvicorn
+        except ImportError:
+            raise SystemExit("uvicorn is required for --server asgi. Install with: pip install uvicorn")
+        uvicorn.run(asgi_app, host=args.host, port=args.port, log_level='warning', backlog=4096)
+    else:
+        app.run(port=args.port, host=args.host)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# frontend/asgi.py
+"""Minimal ASGI adapter used by the async serving mode of frontend/app.py.
+
+Only what the honeypot routes need: exact-path and prefix routing, JSON and
+HTML responses, request bodies and lifespan shutdown hooks. Each connection
+is a coroutine on the event loop, so a flood of slow attacker connections does
+not pin one OS thread per connection the way the threaded Flask server does.
+"""
+import asyncio
+import json
+from collections import namedtuple
+
+AsgiRequest = namedtuple('AsgiRequest', ['method', 'path', 'query_string', 'headers', 'client_addr', 'body'])
+Response = namedtuple('Response', ['status', 'content_type', 'body', 'headers'])
+
+
+def json_response(payload, status=200, headers=None):
+    return Response(status, 'application/json', json.dumps(payload).encode('utf-8') + b'\n', headers or [])
+
+
+def html_response(html, status=200, headers=None):
+    return Response(status, 'text/html; charset=utf-8', html.encode('utf-8'), headers or [])
+
+
+def bytes_response(body, content_type, status=200, headers=None):
+    return Response(status, content_type, body, headers or [])
+
+
+_NOT_FOUND = html_response('<h1>Not Found</h1>', status=404)
+_NOT_ALLOWED = html_response('<h1>Method Not Allowed</h1>', status=405)
+_SERVER_ERROR = html_response('<h1>Internal Server Error</h1>', status=500)
+
+
+class AsgiApp:
+    def __init__(self):
+        self._routes = {}    # path -> (methods, handler)
+        self._prefixes = []  # (prefix, methods, handler)
+        self._shutdown = []
+
+    def route(self, path, methods=('GET',), prefix=False):
+        """Register `async def handler(request, [subpath])` for `path`."""
+        def deco(fn):
+            if prefix:
+                self._prefixes.append((path, tuple(methods), fn))
+            else:
+                self._routes[path] = (tuple(methods), fn)
+            return fn
+        return deco
+
+    def on_shutdown(self, fn):
+        self._shutdown.append(fn)
+        return fn
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        request = await self._read_request(scope, receive)
+        try:
+            response = await self._dispatch(request)
+        except Exception:
+            response = _SERVER_ERROR
+        headers = [(b'content-type', response.content_type.encode('latin-1')),
+                   (b'content-length', str(len(response.body)).encode('latin-1'))]
+        headers.extend((k.encode('latin-1'), str(v).encode('latin-1')) for k, v in response.headers)
+        await send({'type': 'http.response.start', 'status': response.status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': response.body})
+
+    async def _dispatch(self, request):
+        entry = self._routes.get(request.path)
+        if entry is not None:
+            methods, fn = entry
+            if request.method not in methods:
+                return _NOT_ALLOWED
+            return await fn(request)
+        for prefix, methods, fn in self._prefixes:
+            if request.path.startswith(prefix):
+                if request.method not in methods:
+                    return _NOT_ALLOWED
+                return await fn(request, request.path[len(prefix):])
+        return _NOT_FOUND
+
+    async def _read_request(self, scope, receive):
+        chunks = []
+        more = True
+        while more:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunks.append(message.get('body', b''))
+            more = message.get('more_body', False)
+        # header names are lower-cased by the ASGI spec
+        headers = {k.decode('latin-1'): v.decode('latin-1') for k, v in scope.get('headers', [])}
+        client = scope.get('client')
+        return AsgiRequest(
+            scope['method'], scope['path'], scope.get('query_string', b'').decode('latin-1'),
+            headers, client[0] if client else None, b''.join(chunks),
+        )
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                for fn in self._shutdown:
+                    result = fn()
+                    if asyncio.iscoroutine(result):
+                        await result
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
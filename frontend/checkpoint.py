@@ -0,0 +1,242 @@
+# frontend/checkpoint.py
+"""Memory-mapped checkpoint of the honeypot state, restored on startup.
+
+The state file has a fixed layout, so every part sits at a known offset and
+a checkpoint only rewrites what changed:
+
+    header   magic, layout, write sequence, wall-clock time of the write,
+             main plant (T, last requested/applied power, override, seq)
+    zones    n_zones x (T, applied)           - RoomArraySimulator zones
+    clients  capacity x client slot           - EngagementTracker last-seen time
+                                                and the client's open session
+
+A client keeps its slot while it is tracked. The tracker and the session
+aggregator record which clients changed (`track_changes`), so a checkpoint
+rewrites only those slots and clears the slots of clients that went away.
+The header carries `seq_begin` / `seq_end`: a checkpoint starts by bumping
+`seq_begin` and ends by setting `seq_end` to the same value. If the two
+differ on startup the last checkpoint was interrupted by a crash; `restore()`
+reports it on stderr and sets `torn`, and restores the file anyway (zone rows
+and client slots may then mix the interrupted and the previous checkpoint).
+The periodic thread flushes the mapping after every checkpoint, so a crash
+loses at most one interval.
+
+A non-finite temperature is never written or restored: it is replaced by
+`T0` (the simulators' default start temperature).
+
+On startup `restore()` reads the file with NumPy in a few milliseconds,
+advances the room and every zone over the downtime with the closed-form
+`advance` (the heater holds its last applied power), and reloads the
+engagement tracker and open sessions. Engagements whose gap ran out while
+the process was down are ended at last_seen + gap.
+
+A file written with a different number of zones or client capacity is
+replaced by a fresh one.
+"""
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+MAGIC = b'HVACCKP1'
+VERSION = 1
+KEY_BYTES = 64  # clients with longer keys are not checkpointed
+
+HEADER_DTYPE = np.dtype({
+    'names': ['magic', 'version', 'n_zones', 'capacity', 'seq_begin', 'seq_end', 'written_at',
+              'plant_seq', 'T', 'requested', 'applied', 'override', 'zone_seq'],
+    'formats': ['S8', '<u4', '<u4', '<u4', '<u8', '<u8', '<f8', '<u8', '<f8', '<f8', '<f8', 'u1', '<u8'],
+    'offsets': [0, 8, 12, 16, 24, 32, 40, 48, 56, 64, 72, 80, 88],
+    'itemsize': 128,
+})
+ZONE_DTYPE = np.dtype([('T', '<f8'), ('applied', '<f8')])
+# last_seen is NaN for a client without a tracked engagement, start_ts is -1 without an open session
+CLIENT_DTYPE = np.dtype([('key', f'S{KEY_BYTES}'), ('last_seen', '<f8'), ('start_ts', '<i8'), ('end_ts', '<i8'),
+                         ('events', '<i8'), ('overrides', '<i8'), ('score_n', '<i8'), ('score_mean', '<f8')])
+
+
+class StateCheckpoint:
+    def __init__(self, path, plant, zones, engagements, sessions, capacity=100000, clock=time.time, T0=22.0):
+        self.path = path
+        self.plant = plant
+        self.zones = zones
+        self.engagements = engagements
+        self.sessions = sessions
+        self.n_zones = len(zones)
+        self.capacity = max(1, int(capacity))
+        self.clock = clock
+        self.T0 = float(T0)
+        self.writes = 0
+        self.torn = False     # the restored checkpoint was interrupted mid-write
+        self._slots = {}      # client -> slot index
+        self._free = []       # free slot indexes, highest first
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._map()
+        engagements.track_changes()
+        sessions.track_changes()
+
+    def _map(self):
+        size = HEADER_DTYPE.itemsize + self.n_zones * ZONE_DTYPE.itemsize + self.capacity * CLIENT_DTYPE.itemsize
+        fresh = not self._layout_matches()
+        if fresh:
+            d = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(d, exist_ok=True)
+            with open(self.path, 'wb') as f:
+                f.truncate(size)  # sparse: untouched client slots cost no disk
+        self._header = np.memmap(self.path, dtype=HEADER_DTYPE, mode='r+', shape=(1,))
+        self._zone_rows = np.memmap(self.path, dtype=ZONE_DTYPE, mode='r+', offset=HEADER_DTYPE.itemsize,
+                                    shape=(self.n_zones,)) if self.n_zones else np.zeros(0, ZONE_DTYPE)
+        self._client_rows = np.memmap(self.path, dtype=CLIENT_DTYPE, mode='r+',
+                                      offset=HEADER_DTYPE.itemsize + self.n_zones * ZONE_DTYPE.itemsize,
+                                      shape=(self.capacity,))
+        self.fresh = fresh
+        self._saved = []
+        if fresh:
+            h = self._header[0]
+            h['magic'] = MAGIC
+            h['version'] = VERSION
+            h['n_zones'] = self.n_zones
+            h['capacity'] = self.capacity
+            self._free = list(range(self.capacity - 1, -1, -1))
+            return
+        rows = np.array(self._client_rows)  # one read of the whole table
+        used = np.flatnonzero(rows['key'] != b'')
+        rows = rows[used]
+        clients = [k.decode('utf-8') for k in rows['key'].tolist()]
+        self._slots = dict(zip(clients, used.tolist()))
+        fields = [rows[name].tolist() for name in CLIENT_DTYPE.names[1:]]
+        self._saved = list(zip(clients, zip(*fields)))
+        free = np.ones(self.capacity, dtype=bool)
+        free[used] = False
+        self._free = np.flatnonzero(free)[::-1].tolist()
+
+    def _layout_matches(self):
+        try:
+            with open(self.path, 'rb') as f:
+                raw = f.read(HEADER_DTYPE.itemsize)
+        except OSError:
+            return False
+        if len(raw) < HEADER_DTYPE.itemsize:
+            return False
+        h = np.frombuffer(raw, dtype=HEADER_DTYPE)[0]
+        return (h['magic'] == MAGIC and h['version'] == VERSION and h['n_zones'] == self.n_zones
+                and h['capacity'] == self.capacity and h['seq_end'] > 0)
+
+    def restore(self, now=None):
+        """Load the last checkpoint into plant, zones, sessions and engagements.
+
+        Returns the downtime in seconds, or None if there was nothing to restore.
+        """
+        if self.fresh:
+            return None
+        now = self.clock() if now is None else now
+        h = self._header[0]
+        elapsed = max(0.0, now - float(h['written_at']))
+        if h['seq_begin'] != h['seq_end']:
+            self.torn = True
+            print(f"[checkpoint] {self.path}: checkpoint {int(h['seq_begin'])} was interrupted, "
+                  f"restoring a mix of it and checkpoint {int(h['seq_end'])}", file=sys.stderr)
+
+        sim = self.plant.sim
+        requested = float(h['requested']) if np.isfinite(h['requested']) else None
+        applied = float(h['applied']) if np.isfinite(h['applied']) else None
+        sim.T = float(h['T']) if np.isfinite(h['T']) else self.T0
+        sim.advance(elapsed, P_heater=applied or 0.0)
+        self.plant.restore(sim.T, requested, applied, bool(h['override']), int(h['plant_seq']))
+        if self.n_zones:
+            rooms = self.zones.sim
+            zone_T = np.array(self._zone_rows['T'])
+            zone_applied = np.array(self._zone_rows['applied'])
+            rooms.T[:] = np.where(np.isfinite(zone_T), zone_T, self.T0)
+            zone_applied[~np.isfinite(zone_applied)] = 0.0
+            rooms.advance(elapsed, P_heater=zone_applied)
+            self.zones.restore(rooms.T.copy(), zone_applied, int(h['zone_seq']))
+
+        tracked = [(client, rec[0]) for client, rec in self._saved if rec[0] == rec[0]]  # NaN: not tracked
+        open_sessions = [(client,) + rec[1:] for client, rec in self._saved if rec[1] >= 0]
+        self._saved = []
+        # sessions first: ending an expired engagement closes its session
+        self.sessions.restore_open(open_sessions)
+        self.engagements.restore(tracked, now)
+        return elapsed
+
+    def checkpoint(self):
+        """Write the current state; only changed zone rows and client slots are touched."""
+        with self._lock:
+            h = self._header[0]
+            seq = int(h['seq_end']) + 1
+            h['seq_begin'] = seq
+
+            if self.n_zones:
+                T, applied, zone_seq = self.zones.state()
+                T = np.where(np.isfinite(T), T, self.T0)
+                applied = np.where(np.isfinite(applied), applied, 0.0)
+                changed = (self._zone_rows['T'] != T) | (self._zone_rows['applied'] != applied)
+                if changed.any():
+                    idx = np.flatnonzero(changed)
+                    self._zone_rows['T'][idx] = T[idx]
+                    self._zone_rows['applied'][idx] = applied[idx]
+                h['zone_seq'] = zone_seq
+            self._write_clients()
+
+            snap = self.plant.snapshot
+            h['plant_seq'] = snap.seq
+            h['T'] = snap.temperature if np.isfinite(snap.temperature) else self.T0
+            h['requested'] = np.nan if snap.requested_power is None else snap.requested_power
+            h['applied'] = np.nan if snap.applied_power is None else snap.applied_power
+            h['override'] = bool(snap.override)
+            h['written_at'] = self.clock()
+            h['seq_end'] = seq
+            self.writes += 1
+
+    def _write_clients(self):
+        changed = self.engagements.take_changed() | self.sessions.take_changed()
+        rows = self._client_rows
+        for client in changed:
+            last = self.engagements.last_seen(client)
+            session = self.sessions.open_session(client)
+            i = self._slots.get(client)
+            if last is None and session is None:
+                if i is not None:
+                    rows['key'][i] = b''
+                    self._free.append(self._slots.pop(client))
+                continue
+            rec = (np.nan if last is None else float(last),) + (session[1:] if session else (-1, -1, 0, 0, 0, 0.0))
+            if i is None:
+                key = client.encode('utf-8')
+                if not key or len(key) > KEY_BYTES or not self._free:
+                    continue
+                i = self._slots[client] = self._free.pop()
+                rows[i] = (key,) + rec
+            else:
+                rows[i] = (rows['key'][i],) + rec
+
+    def start(self, interval=5.0):
+        """Checkpoint every `interval` seconds on a daemon thread."""
+        if self._thread is None:
+            def run():
+                while not self._stop.wait(interval):
+                    try:
+                        self.checkpoint()
+                        self.flush()
+                    except Exception:
+                        pass
+            self._thread = threading.Thread(target=run, name='state-checkpoint', daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        """Stop the thread, write a final checkpoint and flush the mapping to disk."""
+        self._stop.set()
+        self.checkpoint()
+        self.flush()
+
+    def flush(self):
+        """Write the mapped pages to disk."""
+        for m in (self._header, self._zone_rows, self._client_rows):
+            if isinstance(m, np.memmap):
+                m.flush()
@@ -0,0 +1,208 @@
+# frontend/engagement.py
+"""Engagement tracking with deadline-ordered expiry and a bounded client table.
+
+A client's engagement ends once it has been silent for more than `gap`
+seconds. `EngagementTracker` keeps each client's last-seen time in an LRU
+ordered dict capped at `max_clients`, plus a min-heap holding one deadline
+per tracked client. The expiry thread sleeps until the earliest deadline, so
+`engagement_end` fires when the gap runs out rather than on the next periodic
+sweep. When the deadline at the top of the heap is stale because the client
+was seen again, the entry is re-armed with the new deadline at O(log n) cost.
+When the table is full, the least recently seen client is ended and evicted,
+so a spoofed X-Forwarded-For flood cannot grow memory without bound.
+
+`on_end(client, end_ts, last_seen)` runs after the lock is released, so the
+client may already have been seen again (a new engagement) by the time it
+runs; last_seen lets the callback tell the ended engagement from the new one.
+`on_drop(client, last_seen)` runs under the lock at the moment a client's
+entry is removed (ended or evicted), so per-client state kept next to the
+tracker is dropped with it and stays bounded by `max_clients`. It must be
+quick and must not call back into the tracker.
+"""
+import heapq
+import threading
+import time
+from collections import OrderedDict
+
+
+class EngagementTracker:
+    def __init__(self, gap, max_clients=100000, on_end=None, clock=time.time, on_drop=None):
+        self.gap = gap
+        self.max_clients = max(1, int(max_clients))
+        self.on_end = on_end      # on_end(client, end_ts, last_seen) for every engagement that ends
+        self.on_drop = on_drop    # on_drop(client, last_seen) under the lock when its entry is removed
+        self.clock = clock
+        self.evicted = 0
+        self._last_seen = OrderedDict()  # client -> last ts, least recently seen first
+        self._heap = []                  # (deadline, client); at most one live entry per client
+        self._armed = set()              # clients that have an entry in _heap
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self._changed = None             # clients whose entry changed, once track_changes() is on
+
+    def __len__(self):
+        return len(self._last_seen)
+
+    def active_clients(self):
+        with self._cond:
+            return list(self._last_seen)
+
+    def last_seen(self, client):
+        return self._last_seen.get(client)
+
+    def items(self):
+        """[(client, last_seen)], least recently seen first."""
+        with self._cond:
+            return list(self._last_seen.items())
+
+    def track_changes(self):
+        """Start recording which clients are touched, ended or evicted (see take_changed)."""
+        with self._cond:
+            if self._changed is None:
+                self._changed = set()
+
+    def take_changed(self):
+        """Clients whose last-seen entry changed since the previous call."""
+        with self._cond:
+            changed = self._changed
+            if changed is None:
+                return set()
+            self._changed = set()
+            return changed
+
+    def restore(self, items, now=None):
+        """Reload (client, last_seen) pairs saved before a restart.
+
+        Engagements whose gap ran out while the process was down are ended
+        (on_end at last_seen + gap) instead of being restored.
+        """
+        now = self.clock() if now is None else now
+        ended = []
+        with self._cond:
+            for client, last in sorted(items, key=lambda it: it[1]):
+                if now - last > self.gap:
+                    ended.append((client, int(last + self.gap), last))
+                    continue
+                self._last_seen[client] = last
+                self._last_seen.move_to_end(client)
+            while len(self._last_seen) > self.max_clients:
+                old, last = self._last_seen.popitem(last=False)
+                self._dropped(old, last)
+                ended.append((old, int(now), last))
+            # one heapify instead of a push per restored client
+            self._heap.extend((t + self.gap, c) for c, t in self._last_seen.items() if c not in self._armed)
+            heapq.heapify(self._heap)
+            self._armed.update(self._last_seen)
+            if self._changed is not None:
+                self._changed.update(c for c, _ in ended)
+            self._cond.notify()
+        self._emit(ended)
+        return len(ended)
+
+    def touch(self, client, ts):
+        """Record activity from `client` at `ts`. Returns True if this starts a new engagement."""
+        ended = []
+        with self._cond:
+            last = self._last_seen.get(client)
+            if last is not None and ts - last > self.gap:
+                # expired but not reaped yet: close the old engagement first
+                del self._last_seen[client]
+                self._dropped(client, last)
+                ended.append((client, last + self.gap, last))
+                last = None
+            started = last is None
+            self._last_seen[client] = ts
+            self._last_seen.move_to_end(client)
+            if client not in self._armed:
+                self._push(ts + self.gap, client)
+            while len(self._last_seen) > self.max_clients:
+                old, old_last = self._last_seen.popitem(last=False)
+                self._dropped(old, old_last)
+                self.evicted += 1
+                ended.append((old, ts, old_last))
+            if self._changed is not None:
+                self._changed.add(client)
+                self._changed.update(c for c, _ in ended)
+        self._emit(ended)
+        return started
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="engagement-expiry", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def expire(self, now=None):
+        """Close every engagement whose deadline has passed. Returns [(client, end_ts, last_seen)]."""
+        now = self.clock() if now is None else now
+        ended = []
+        with self._cond:
+            self._collect(now, ended)
+        self._emit(ended)
+        return ended
+
+    def _push(self, deadline, client):
+        was_first = not self._heap or deadline < self._heap[0][0]
+        heapq.heappush(self._heap, (deadline, client))
+        self._armed.add(client)
+        if len(self._heap) > 2 * self.max_clients:
+            # drop entries left behind by evicted clients
+            self._heap = [(t + self.gap, c) for c, t in self._last_seen.items()]
+            heapq.heapify(self._heap)
+            self._armed = set(self._last_seen)
+            was_first = True
+        if was_first:
+            self._cond.notify()
+
+    def _collect(self, now, ended):
+        # same boundary as touch(): ended once now - last_seen > gap
+        while self._heap and self._heap[0][0] < now:
+            _, client = heapq.heappop(self._heap)
+            self._armed.discard(client)
+            last = self._last_seen.get(client)
+            if last is None:
+                continue  # evicted or already closed
+            deadline = last + self.gap
+            if deadline >= now:
+                self._push(deadline, client)
+                continue
+            del self._last_seen[client]
+            self._dropped(client, last)
+            ended.append((client, int(deadline), last))
+            if self._changed is not None:
+                self._changed.add(client)
+
+    def _dropped(self, client, last):
+        if self.on_drop is not None:
+            try:
+                self.on_drop(client, last)
+            except Exception:
+                pass
+
+    def _emit(self, ended):
+        if self.on_end is None:
+            return
+        for client, ts, last in ended:
+            try:
+                self.on_end(client, ts, last)
+            except Exception:
+                pass
+
+    def _run(self):
+        while True:
+            ended = []
+            with self._cond:
+                if self._stopped:
+                    return
+                now = self.clock()
+                self._collect(now, ended)
+                if not ended:
+                    timeout = (self._heap[0][0] - now) if self._heap else None
+                    self._cond.wait(timeout)
+            self._emit(ended)
@@ -0,0 +1,76 @@
+# frontend/http_cache.py
+"""Rendered-response cache with ETag / Last-Modified validation.
+
+Each entry stores the response as ready-to-send bytes together with the
+validator it was rendered for: a directory mtime for /dashboard, or the
+session aggregator version and query for /api/sessions. A request whose
+validator matches the cached entry gets those bytes back without any
+rendering. If the client already holds the same representation (a matching
+If-None-Match, or else an If-Modified-Since no older than Last-Modified), the
+server answers 304 with no body at all.
+
+Last-Modified is only sent for entries with a real modification time (file
+or directory mtime). A version-keyed entry such as /api/sessions can change
+several times within one second, which HTTP dates cannot express, so it is
+validated by ETag alone.
+"""
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from email.utils import formatdate, parsedate_to_datetime
+
+CachedResponse = namedtuple('CachedResponse', ['body', 'content_type', 'etag', 'last_modified', 'headers'])
+
+
+class ResponseCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max(1, int(max_entries))
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # name -> (validator, CachedResponse)
+        self._lock = threading.Lock()
+
+    def get(self, name, validator, render, content_type, last_modified=None):
+        """Cached response for `name`, re-rendered only when `validator` changes.
+
+        `render()` returns the body bytes, or (body, extra_headers).
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == validator:
+                self._entries.move_to_end(name)
+                self.hits += 1
+                return entry[1]
+        rendered = render()
+        body, headers = rendered if isinstance(rendered, tuple) else (rendered, [])
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        lm = None if last_modified is None else formatdate(last_modified, usegmt=True)
+        resp = CachedResponse(body, content_type, etag, lm, list(headers))
+        with self._lock:
+            self.misses += 1
+            self._entries[name] = (validator, resp)
+            self._entries.move_to_end(name)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return resp
+
+
+def is_not_modified(resp, if_none_match=None, if_modified_since=None):
+    """True if the client's cached copy (per its conditional headers) is still current."""
+    if if_none_match:
+        tags = [t.strip() for t in if_none_match.split(',')]
+        return '*' in tags or resp.etag in tags or ('W/' + resp.etag) in tags
+    if if_modified_since and resp.last_modified:
+        try:
+            return parsedate_to_datetime(resp.last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def validator_headers(resp):
+    # no-cache: browsers may store the page but must revalidate (cheap 304) each refresh
+    headers = [('ETag', resp.etag), ('Cache-Control', 'no-cache')]
+    if resp.last_modified:
+        headers.insert(1, ('Last-Modified', resp.last_modified))
+    return headers
@@ -0,0 +1,118 @@
+# frontend/metrics.py
+"""In-process metrics, exposed in Prometheus text format on /metrics.
+
+Histograms have fixed, log-spaced bucket bounds, so an observation costs a
+bisect over ~20 floats and two increments under a per-metric lock. Values
+that already live elsewhere (writer queue depth, drop counts, tracked
+clients) are registered as callbacks and are only read when /metrics is
+scraped.
+"""
+import threading
+from bisect import bisect_left
+
+# 5us .. ~1.3s, x2 per bucket: covers a dict lookup up to a stalled disk write
+LATENCY_BUCKETS = tuple(5e-6 * 2 ** i for i in range(19))
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, n=1):
+        with self._lock:
+            self.value += n
+
+    def samples(self, name, labels):
+        yield name, labels, self.value
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def samples(self, name, labels):
+        with self._lock:
+            counts = list(self.counts)
+            total = self.sum
+        cum = 0
+        for bound, n in zip(self.bounds + (float('inf'),), counts):
+            cum += n
+            yield name + '_bucket', labels + (('le', _fmt(bound)),), cum
+        yield name + '_sum', labels, total
+        yield name + '_count', labels, cum
+
+
+class _Callback:
+    def __init__(self, fn):
+        self.fn = fn
+
+    def samples(self, name, labels):
+        yield name, labels, self.fn()
+
+
+def _fmt(v):
+    if v == float('inf'):
+        return '+Inf'
+    if isinstance(v, float):
+        return repr(v)
+    return str(v)
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join('%s="%s"' % (k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in labels) + '}'
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._families = {}  # name -> [type, help, [(labels, metric)]], in registration order
+        self._lock = threading.Lock()
+
+    def _add(self, name, kind, help, labels, metric):
+        labels = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            fam = self._families.setdefault(name, [kind, help, []])
+            if fam[0] != kind:
+                raise ValueError(f"metric {name} already registered as a {fam[0]}")
+            fam[2].append((labels, metric))
+        return metric
+
+    def counter(self, name, help, labels=None, fn=None):
+        """A counter, or a callback reporting an existing monotonic count if `fn` is given."""
+        return self._add(name, 'counter', help, labels, _Callback(fn) if fn else Counter())
+
+    def gauge(self, name, help, fn, labels=None):
+        return self._add(name, 'gauge', help, labels, _Callback(fn))
+
+    def histogram(self, name, help, labels=None, buckets=LATENCY_BUCKETS):
+        return self._add(name, 'histogram', help, labels, Histogram(buckets))
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            families = [(name, fam[0], fam[1], list(fam[2])) for name, fam in self._families.items()]
+        out = []
+        for name, kind, help, children in families:
+            out.append(f"# HELP {name} {help}")
+            out.append(f"# TYPE {name} {kind}")
+            for labels, metric in children:
+                try:
+                    for sample, lab, value in metric.samples(name, labels):
+                        out.append(f"{sample}{_labels(lab)} {_fmt(value)}")
+                except Exception:
+                    continue  # a failing callback must not break the scrape
+        return '\n'.join(out) + '\n'
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
@@ -0,0 +1,117 @@
+# frontend/plant.py
+"""Single-writer owner of the simulated plant (RoomSimulator + SafetyFilter).
+
+Every actuator command goes through `PlantState.apply`, which runs the SCC
+preview, the filter decision and the simulator step inside one short critical
+section, so concurrent requests can no longer interleave between the preview
+and the step. After each step an immutable `PlantSnapshot` is published by a
+single attribute assignment; readers such as `/sensor/temperature` just read
+`plant.snapshot` and never take the lock.
+
+If `timings` is given (a dict of histograms keyed 'plant_lock', 'scc_filter'
+and 'sim_step'), `apply` records how long it waited for the lock and how long
+the filter and the step took.
+
+frontend/checkpoint.py reads `snapshot` and calls `restore(...)` to carry
+the plant across restarts.
+"""
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+PlantSnapshot = namedtuple(
+    'PlantSnapshot',
+    ['seq', 'ts', 'temperature', 'requested_power', 'applied_power', 'override'],
+)
+
+
+class PlantState:
+    def __init__(self, sim, sfilter, timings=None):
+        self.sim = sim
+        self.sfilter = sfilter
+        self.timings = timings
+        self._lock = threading.Lock()
+        self.snapshot = PlantSnapshot(0, time.time(), sim.T, None, None, False)
+
+    def apply(self, power):
+        """Filter `power` through the SCC, step the simulator and return the new snapshot."""
+        t0 = time.perf_counter()
+        with self._lock:
+            t1 = time.perf_counter()
+            applied, override = self.sfilter.filter(self.sim.T, power, self.sim.predict)
+            t2 = time.perf_counter()
+            newT = self.sim.step(P_heater=applied)
+            t3 = time.perf_counter()
+            snap = PlantSnapshot(self.snapshot.seq + 1, time.time(), newT, power, applied, override)
+            self.snapshot = snap
+        # observe outside the lock so metrics never lengthen the critical section
+        if self.timings is not None:
+            self.timings['plant_lock'].observe(t1 - t0)
+            self.timings['scc_filter'].observe(t2 - t1)
+            self.timings['sim_step'].observe(t3 - t2)
+        return snap
+
+    def restore(self, T, requested_power, applied_power, override, seq):
+        """Reset the simulator temperature and the published snapshot (used after a restart)."""
+        with self._lock:
+            self.sim.T = float(T)
+            self.snapshot = PlantSnapshot(int(seq), time.time(), self.sim.T, requested_power, applied_power, bool(override))
+
+
+class ZonePlantState:
+    """PlantState for the zones of a RoomArraySimulator, addressed by zone index.
+
+    One lock covers all zones (a zone update is a few float operations), and
+    no per-zone Python objects are kept, so thousands of zones cost little
+    more than the simulator arrays themselves.
+    """
+
+    def __init__(self, sim, sfilter, timings=None):
+        self.sim = sim
+        self.sfilter = sfilter
+        self.timings = timings
+        self._lock = threading.Lock()
+        self._seq = 0
+        # last applied power per zone (the heater holds it between commands)
+        self.applied = np.zeros(len(sim))
+
+    def __len__(self):
+        return len(self.sim)
+
+    def __contains__(self, zone):
+        return 0 <= zone < len(self.sim)
+
+    def apply(self, zone, power):
+        """Filter `power` for `zone` through the SCC, step that zone and return its snapshot."""
+        t0 = time.perf_counter()
+        with self._lock:
+            t1 = time.perf_counter()
+            applied, override = self.sfilter.filter(float(self.sim.T[zone]), power,
+                                                    lambda p: self.sim.predict_zone(zone, p))
+            t2 = time.perf_counter()
+            newT = self.sim.step_zone(zone, applied)
+            t3 = time.perf_counter()
+            self.applied[zone] = applied
+            self._seq += 1
+            snap = PlantSnapshot(self._seq, time.time(), newT, power, applied, override)
+        if self.timings is not None:
+            self.timings['plant_lock'].observe(t1 - t0)
+            self.timings['scc_filter'].observe(t2 - t1)
+            self.timings['sim_step'].observe(t3 - t2)
+        return snap
+
+    def temperature(self, zone):
+        return float(self.sim.T[zone])
+
+    def state(self):
+        """(T, applied, seq) copies taken under the lock."""
+        with self._lock:
+            return self.sim.T.copy(), self.applied.copy(), self._seq
+
+    def restore(self, T, applied, seq):
+        with self._lock:
+            self.sim.T[:] = T
+            self.applied[:] = applied
+            self._seq = int(seq)
@@ -0,0 +1,134 @@
+# frontend/scorer.py
+"""Micro-batching scorer for inline attack detection.
+
+Request threads `submit` a feature row and get a Future back. One scorer
+thread collects pending rows until `max_batch` are waiting or `max_wait`
+seconds have passed since the first one arrived (the same group-commit rule
+as eventlog.writer.BatchedEventWriter), scores the whole batch with one
+`score_fn(X)` call and completes every Future with (score, label).
+
+A request waits for its result at most `budget` seconds after it was
+submitted. Past that, or when the queue is full, the scorer failed or is
+closed, the result is (None, UNSCORED) and the request goes on without it.
+A row whose waiter has already given up is dropped before its batch is
+scored.
+"""
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+UNSCORED = 'unscored'
+
+_STOP = object()
+
+
+class MicroBatchScorer:
+    def __init__(self, score_fn, max_batch=64, max_wait=0.002, budget=0.02, max_queue=10000):
+        """score_fn: (n, k) float array -> (scores, labels), both of length n."""
+        self.score_fn = score_fn
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max_wait
+        self.budget = budget
+        self._q = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._thread = None
+        self.batches = 0
+        # every result()/result_async() call counts exactly once in one of these
+        self.scored = 0      # results delivered to their waiter
+        self.unscored = 0    # results not delivered within the budget (or not at all)
+        self.errors = 0      # failed score_fn calls
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='ml-scorer', daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, features):
+        """Queue one feature row; returns a Future of (score, label)."""
+        fut = Future()
+        fut.deadline = time.monotonic() + self.budget
+        try:
+            self._q.put_nowait((np.asarray(features, dtype=np.float64), fut))
+        except queue.Full:
+            fut.cancel()
+        return fut
+
+    def result(self, fut):
+        """(score, label) of a submitted row, waiting until its deadline; (None, UNSCORED) past it."""
+        try:
+            out = fut.result(timeout=max(0.0, fut.deadline - time.monotonic()))
+        except Exception:
+            return self._give_up(fut)
+        self.scored += 1
+        return out
+
+    async def result_async(self, fut):
+        """result() for an asyncio handler: waits without blocking the event loop."""
+        try:
+            out = await asyncio.wait_for(asyncio.wrap_future(fut), max(0.0, fut.deadline - time.monotonic()))
+        except Exception:
+            return self._give_up(fut)
+        self.scored += 1
+        return out
+
+    def _give_up(self, fut):
+        # cancel() fails only if the batch already claimed the row; a result that landed meanwhile still counts
+        if not fut.cancel() and fut.done() and fut.exception() is None:
+            self.scored += 1
+            return fut.result()
+        self.unscored += 1
+        return None, UNSCORED
+
+    def qsize(self):
+        return self._q.qsize()
+
+    def _run(self):
+        while True:
+            item = self._q.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._q.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._score(batch)
+            if stop:
+                return
+
+    def _score(self, batch):
+        # claim the rows still waited for; cancelled ones were given up by their request
+        live = [(x, fut) for x, fut in batch if fut.set_running_or_notify_cancel()]
+        if not live:
+            return
+        try:
+            scores, labels = self.score_fn(np.vstack([x for x, _ in live]))
+        except Exception as e:
+            self.errors += 1
+            for _, fut in live:
+                fut.set_exception(e)
+            return
+        self.batches += 1
+        for (_, fut), score, label in zip(live, scores, labels):
+            fut.set_result((float(score), str(label)))
+
+    def close(self):
+        """Score what is queued, then stop the thread."""
+        if self._thread is not None:
+            self._q.put(_STOP)
+            self._thread.join(timeout=5)
+            self._thread = None
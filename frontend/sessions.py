@@ -0,0 +1,142 @@
+# frontend/sessions.py
+"""Online sessionization of honeypot events.
+
+`SessionAggregator` keeps the same per-session aggregates that
+scripts/engagement_analysis.py computes offline (start/end ts, event_count,
+override_count, average ML score), but updates them incrementally as events
+arrive. A client's session is split when the gap since its previous event
+exceeds `gap`, the same rule the offline analyzer uses, or when the
+engagement tracker reports that the engagement has ended. Closed sessions are
+kept in a bounded ring, newest last.
+"""
+import threading
+from collections import deque
+from datetime import datetime, timezone
+
+
+def ts_to_iso(ts):
+    return datetime.fromtimestamp(int(ts), tz=timezone.utc).replace(tzinfo=None).isoformat() + 'Z'
+
+
+class _Session:
+    __slots__ = ('client', 'start_ts', 'end_ts', 'event_count', 'override_count', 'score_n', 'score_mean')
+
+    def __init__(self, client, ts):
+        self.client = client
+        self.start_ts = ts
+        self.end_ts = ts
+        self.event_count = 0
+        self.override_count = 0
+        self.score_n = 0
+        self.score_mean = 0.0
+
+    def as_dict(self, active):
+        return {
+            'client': self.client,
+            'start_ts': self.start_ts,
+            'start_iso': ts_to_iso(self.start_ts),
+            'end_ts': self.end_ts,
+            'end_iso': ts_to_iso(self.end_ts),
+            'duration_s': self.end_ts - self.start_ts,
+            'event_count': self.event_count,
+            'override_count': self.override_count,
+            'avg_ml_score': self.score_mean if self.score_n else None,
+            'active': active,
+        }
+
+
+class SessionAggregator:
+    def __init__(self, gap, max_closed=10000):
+        self.gap = gap
+        self.version = 0          # bumped on every change; lets readers cache responses
+        self._open = {}           # client -> _Session
+        self._closed = deque(maxlen=max(1, int(max_closed)))
+        self._lock = threading.Lock()
+        self._changed = None      # clients whose open session changed, once track_changes() is on
+
+    def observe(self, client, ts, override=False, ml_score=None):
+        """Fold one event from `client` at `ts` into its session."""
+        with self._lock:
+            s = self._open.get(client)
+            if s is not None and ts - s.end_ts > self.gap:
+                self._closed.append(self._open.pop(client))
+                s = None
+            if s is None:
+                s = self._open[client] = _Session(client, ts)
+            s.end_ts = max(s.end_ts, ts)
+            s.event_count += 1
+            if override:
+                s.override_count += 1
+            if ml_score is not None:
+                # running mean, no per-event history kept
+                s.score_n += 1
+                s.score_mean += (float(ml_score) - s.score_mean) / s.score_n
+            self.version += 1
+            if self._changed is not None:
+                self._changed.add(client)
+
+    def open_sessions(self):
+        """[(client, start_ts, end_ts, event_count, override_count, score_n, score_mean)] of open sessions."""
+        with self._lock:
+            return [(s.client, s.start_ts, s.end_ts, s.event_count, s.override_count, s.score_n, s.score_mean)
+                    for s in self._open.values()]
+
+    def open_session(self, client):
+        """The open_sessions() tuple for `client`, or None."""
+        with self._lock:
+            s = self._open.get(client)
+            if s is None:
+                return None
+            return (s.client, s.start_ts, s.end_ts, s.event_count, s.override_count, s.score_n, s.score_mean)
+
+    def track_changes(self):
+        """Start recording which clients' open sessions change (see take_changed)."""
+        with self._lock:
+            if self._changed is None:
+                self._changed = set()
+
+    def take_changed(self):
+        with self._lock:
+            changed = self._changed
+            if changed is None:
+                return set()
+            self._changed = set()
+            return changed
+
+    def restore_open(self, rows):
+        """Re-open sessions saved with open_sessions() before a restart."""
+        with self._lock:
+            for client, start_ts, end_ts, events, overrides, score_n, score_mean in rows:
+                s = self._open[client] = _Session(client, int(start_ts))
+                s.end_ts = int(end_ts)
+                s.event_count = int(events)
+                s.override_count = int(overrides)
+                s.score_n = int(score_n)
+                s.score_mean = float(score_mean)
+            self.version += 1
+
+    def close(self, client, last_seen=None):
+        """Close the client's open session; with last_seen, only if it has no event after last_seen."""
+        with self._lock:
+            s = self._open.get(client)
+            if s is not None and last_seen is not None and s.end_ts > last_seen:
+                return  # the client came back: this is already its next session
+            s = self._open.pop(client, None)
+            if s is not None:
+                self._closed.append(s)
+                self.version += 1
+                if self._changed is not None:
+                    self._changed.add(client)
+
+    def sessions(self, since=None, offset=0, limit=None):
+        """Sessions ordered by start_ts, optionally only those with end_ts >= since.
+
+        Returns (page, total) where total counts all matching sessions.
+        """
+        with self._lock:
+            rows = [(s, False) for s in self._closed] + [(s, True) for s in self._open.values()]
+            if since is not None:
+                rows = [r for r in rows if r[0].end_ts >= since]
+            rows.sort(key=lambda r: (r[0].start_ts, r[0].client))
+            end = None if limit is None else offset + limit
+            return [s.as_dict(active) for s, active in rows[offset:end]], len(rows)
@@ -0,0 +1,107 @@
+# ml/check_feature_parity.py
+"""Check add_features' window features against the original per-row loops.
+
+Builds random event frames (unsorted and duplicate timestamps, bursts,
+several clients) and compares reqs_last_window / overrides_last_window from
+add_features with the O(n^2) reference below, globally and per client.
+Also times both on a larger frame.
+
+Then checks ml.streaming_features: every StreamingFeatures.update must equal
+the last row of add_features over the events seen so far (per client with
+by='client_ip'), exactly.
+
+Usage: python -m ml.check_feature_parity [--n 2000] [--bench 20000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from ml.feature_utils import add_features
+from ml.streaming_features import StreamingFeatures
+
+
+def reference_windows(df, window_seconds=10, by=None):
+    # the loops add_features used before the searchsorted rewrite (plus a per-group variant)
+    df = df.copy().reset_index(drop=True)
+    sec = pd.Series(df['ts']).astype('datetime64[ns]').astype('int64') // 10**9
+    same = (lambda i: df[by] == df.at[i, by]) if by else (lambda i: True)
+    df['reqs_last_window'] = 0
+    df['overrides_last_window'] = 0.0
+    for i, t in enumerate(sec):
+        mask = (sec >= t - window_seconds) & (sec <= t) & same(i)
+        df.at[i, 'reqs_last_window'] = int(mask.sum())
+        df.at[i, 'overrides_last_window'] = df.loc[mask, 'override'].sum() / max(1, mask.sum())
+    return df[['reqs_last_window', 'overrides_last_window']]
+
+
+def random_events(n, seed=0):
+    rng = np.random.default_rng(seed)
+    # bursts of same-second requests plus sparse traffic, shuffled so ts is not sorted
+    ts = 1_700_000_000 + np.sort(rng.integers(0, max(1, n // 3), n))
+    ts[rng.random(n) < 0.1] += rng.integers(-30, 30)
+    return pd.DataFrame({
+        'ts': pd.to_datetime(ts, unit='s'),
+        'requested_power': rng.uniform(-0.2, 1.2, n),
+        'applied_power': rng.uniform(0, 1, n),
+        'temperature': rng.uniform(15, 30, n),
+        'override': rng.integers(0, 2, n),
+        'client_ip': rng.choice([f'10.0.0.{i}' for i in range(7)], n),
+    })
+
+
+def check_streaming(n, seed=0, window=10, by=None):
+    df = random_events(n, seed).sort_values('ts', kind='stable').reset_index(drop=True)
+    rng = np.random.default_rng(seed)
+    # NaNs and repeated values exercise the rolling-mean corner cases
+    df.loc[rng.random(n) < 0.05, 'applied_power'] = np.nan
+    df.loc[rng.random(n) < 0.2, 'requested_power'] = 1.0
+    stream = StreamingFeatures(window_seconds=window, by=by)
+    sec = df['ts'].astype('datetime64[ns]').astype('int64') // 10**9
+    for i in range(n):
+        ev = df.iloc[i].to_dict()
+        ev['ts'] = int(sec[i])
+        got = stream.update(ev)
+        prefix = df.iloc[:i + 1]
+        if by:
+            prefix = prefix[prefix[by] == ev[by]]
+        feats, cols = add_features(prefix, window_seconds=window)
+        want = feats[cols].iloc[-1].tolist()
+        assert cols == stream.feature_cols
+        if got != want:
+            raise AssertionError(f'row {i}: {list(zip(cols, got, want))}')
+
+
+def main():
+    p = argparse.ArgumentParser(description='Parity check for the vectorised window features')
+    p.add_argument('--n', type=int, default=2000)
+    p.add_argument('--bench', type=int, default=20000)
+    args = p.parse_args()
+
+    cols = ['reqs_last_window', 'overrides_last_window']
+    for seed in range(3):
+        df = random_events(args.n, seed)
+        for window in (0, 1, 10, 60):
+            for by in (None, 'client_ip'):
+                got, _ = add_features(df, window_seconds=window, by=by)
+                ref = reference_windows(df, window_seconds=window, by=by)
+                pd.testing.assert_frame_equal(got[cols], ref[cols], check_dtype=False, check_exact=True)
+    print(f'parity ok: {args.n} events x 3 seeds x 4 windows, global and per client')
+
+    for by in (None, 'client_ip'):
+        check_streaming(min(args.n, 400), seed=5, by=by)
+    print('streaming parity ok: global and per client')
+
+    big = random_events(args.bench, 1)
+    t0 = time.perf_counter()
+    add_features(big, window_seconds=10)
+    t1 = time.perf_counter()
+    reference_windows(big.head(min(args.bench, 5000)), window_seconds=10)
+    t2 = time.perf_counter()
+    print(f'add_features: {(t1 - t0) * 1e3:.1f} ms for {args.bench} events; '
+          f'reference loops: {(t2 - t1) * 1e3:.0f} ms for {min(args.bench, 5000)} events')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,13 +2,19 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from eventlog.reader import load_events
+
+# src may also be a SQLite store or a Parquet segment directory (see eventlog/)
 src = 'dataset/events_combined.csv'
 out = 'dataset/events_features.csv'
 if not os.path.exists(src):
     raise SystemExit(f"Missing {src}")
 
-df = pd.read_csv(src)
+# read only the columns used below
+df = load_events(src, columns=['ts', 'role', 'requested_power', 'applied_power', 'temperature', 'override'])
 # ensure ts numeric and sorted
 df = df.sort_values('ts').reset_index(drop=True)
 df['ts'] = pd.to_numeric(df['ts'], errors='coerce').fillna(0).astype(int)
@@ -1,13 +1,15 @@
 # ml/feature_utils.py
 import pandas as pd
 import numpy as np
+from eventlog.reader import load_events
 
-def prepare_events_df(path="logs/events.csv"):
+def prepare_events_df(path="logs/events.csv", start_ts=None, end_ts=None, clients=None):
     """
-    Read CSV and normalise column types.
+    Read the events log (CSV or SQLite store) and normalise column types.
     Expects columns: ts,role,requested_power,applied_power,temperature,override
+    start_ts/end_ts (unix seconds) and clients (client_ip list) restrict the rows read.
     """
-    df = pd.read_csv(path)
+    df = load_events(path, start_ts=start_ts, end_ts=end_ts, clients=clients)
     # ensure types
     df['ts'] = pd.to_datetime(df['ts'], unit='s', errors='coerce')
     df['requested_power'] = df['requested_power'].astype(float)
@@ -20,9 +22,38 @@ def prepare_events_df(path="logs/events.csv"):
         df['ts'] = pd.date_range(start=pd.Timestamp.now(), periods=len(df), freq='S')
     return df
 
-def add_features(df, window_seconds=10):
+def window_counts(sec, override, window_seconds, groups=None):
+    """
+    For every event i: the number of events j with sec[j] in [sec[i]-window_seconds, sec[i]]
+    and the sum of their override values (NaN counts as 0). With `groups` (one key per
+    event, e.g. client_ip) only events of the same group are counted.
+    Sorted timestamps + searchsorted + cumulative sums: O(n log n).
+    """
+    sec = np.asarray(sec, dtype=np.int64)
+    ov = np.nan_to_num(np.asarray(override, dtype=np.float64))
+    n = len(sec)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    base = int(sec.min()) - int(window_seconds)
+    if groups is None:
+        key = sec - base
+    else:
+        # group code in the high bits, seconds offset in the low 32: one sort key per event
+        codes, _ = pd.factorize(np.asarray(groups, dtype=object), use_na_sentinel=False)
+        key = (codes.astype(np.int64) << 32) | (sec - base)
+    order = np.argsort(key, kind='stable')
+    sorted_key = key[order]
+    csum = np.concatenate([[0.0], np.cumsum(ov[order])])
+    hi = np.searchsorted(sorted_key, key, side='right')
+    lo = np.searchsorted(sorted_key, key - int(window_seconds), side='left')
+    return hi - lo, csum[hi] - csum[lo]
+
+
+def add_features(df, window_seconds=10, by=None):
     """
     Add features per event using recent history in [ts-window_seconds, ts].
+    With by='client_ip' the window features only count the same client's events
+    (global windows if the column is missing).
     Returns feature DataFrame aligned with original df index.
     """
     df = df.copy().reset_index(drop=True)
@@ -40,18 +71,13 @@ def add_features(df, window_seconds=10):
     df['app_roll_mean_3'] = df['applied_power'].rolling(3, min_periods=1).mean()
     # request rate: number of events within window_seconds
     times = pd.Series(df['ts'])
-    # convert to integer seconds
-    sec = times.astype('int64') // 10**9
-    df['reqs_last_window'] = 0
-    for i, t in enumerate(sec):
-        start = t - window_seconds
-        df.at[i, 'reqs_last_window'] = int(((sec >= start) & (sec <= t)).sum())
+    # convert to integer seconds (via ns: pandas >= 2 may hand back datetime64[s] or [us])
+    sec = times.astype('datetime64[ns]').astype('int64') // 10**9
+    groups = df[by].to_numpy() if by is not None and by in df.columns else None
+    counts, override_sums = window_counts(sec.to_numpy(), df['override'], window_seconds, groups)
+    df['reqs_last_window'] = counts
     # fraction of overrides in window
-    df['overrides_last_window'] = 0.0
-    for i, t in enumerate(sec):
-        start = t - window_seconds
-        mask = (sec >= start) & (sec <= t)
-        df.at[i, 'overrides_last_window'] = df.loc[mask, 'override'].sum() / max(1, mask.sum())
+    df['overrides_last_window'] = override_sums / np.maximum(1, counts)
     # indicator: requested_power is extreme
     df['req_is_extreme'] = ((df['requested_power'] <= 0.0) | (df['requested_power'] >= 0.95)).astype(int)
     # keep list of features
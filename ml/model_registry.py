@@ -0,0 +1,170 @@
+# ml/model_registry.py
+"""Process-wide cache of trained model artifacts, reloaded when they change on disk.
+
+Each named model is a set of joblib files (model, scaler, optional feature
+list). `get(name)` returns the set as one immutable `ModelSet`:
+
+- the first call loads it; later calls return the cached set, and at most
+  every `check_interval` seconds they stat the files (mtime, size);
+- when a file changed its content is hashed, and only a different hash is
+  reloaded. Artifacts are cached by (path, hash), so a scaler shared by
+  two models is loaded once;
+- the new set is built off to the side and swapped in with one assignment.
+  Predictions already holding the old set finish with it. Only the thread
+  that noticed the change does the loading; the others keep getting the
+  current set meanwhile;
+- a file that fails to load (e.g. half-written by a training run) leaves
+  the current set in place and is retried at the next check.
+
+Several models can be pinned at once; the defaults are the ones the
+training scripts write (rf, xgb, xgb_features, detector).
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import namedtuple
+
+import joblib
+
+ModelSet = namedtuple('ModelSet', ['name', 'model', 'scaler', 'feature_cols', 'version', 'loaded_at'])
+
+DEFAULT_MODELS = {
+    'rf': ('models/attack_detector_rf.pkl', 'models/scaler.pkl', None),
+    'xgb': ('models/attack_detector_xgb.pkl', 'models/scaler_xgb.pkl', None),
+    'xgb_features': ('models/attack_detector_xgb_features.pkl', 'models/scaler_xgb_features.pkl', None),
+    'detector': ('models/attack_detector.pkl', 'models/scaler.pkl', 'models/feature_cols.pkl'),
+}
+
+
+def file_hash(path, chunk=1 << 20):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ModelRegistry:
+    def __init__(self, models=None, check_interval=2.0, clock=time.monotonic):
+        self.check_interval = check_interval
+        self.clock = clock
+        self.reloads = 0
+        self._paths = {}      # name -> (model_path, scaler_path, feature_path)
+        self._sets = {}       # name -> ModelSet
+        self._stats = {}      # name -> file stats the current set was loaded from
+        self._checked = {}    # name -> clock() of the last stat
+        self._failed = {}     # name -> clock() of the last failed first load
+        self._artifacts = {}  # (abspath, hash) -> loaded object
+        self._locks = {}
+        self._lock = threading.Lock()
+        for name, paths in (DEFAULT_MODELS if models is None else models).items():
+            self.register(name, *paths)
+
+    def register(self, name, model_path, scaler_path, feature_path=None):
+        """Add (or repoint) a named model; it is loaded on first get()."""
+        paths = (model_path, scaler_path, feature_path)
+        with self._lock:
+            if self._paths.get(name) == paths:
+                return
+            self._paths[name] = paths
+            self._locks.setdefault(name, threading.Lock())
+            self._sets.pop(name, None)
+            self._stats.pop(name, None)
+            self._checked.pop(name, None)
+
+    def names(self):
+        return list(self._paths)
+
+    def get(self, name):
+        """Current ModelSet for `name`, reloading it first if its files changed."""
+        current = self._sets.get(name)
+        now = self.clock()
+        if current is not None and now - self._checked.get(name, float('-inf')) < self.check_interval:
+            return current
+        lock = self._locks.get(name)
+        if lock is None:
+            raise KeyError(f'unknown model {name!r}; registered: {self.names()}')
+        # one thread reloads; the rest keep serving the current set
+        if not lock.acquire(blocking=current is None):
+            return current
+        try:
+            current = self._sets.get(name)
+            self._checked[name] = self.clock()
+            paths = self._paths[name]
+            try:
+                stats = self._stat(paths)
+            except OSError:
+                if current is None:
+                    raise
+                return current  # files moved away: keep what is loaded
+            if current is not None and stats == self._stats.get(name):
+                return current
+            try:
+                loaded = self._load(name, paths)
+            except Exception:
+                if current is None:
+                    raise
+                return current
+            self._stats[name] = stats
+            if current is None or loaded.version != current.version:
+                self._sets[name] = loaded
+                if current is not None:
+                    self.reloads += 1
+            return self._sets[name]
+        finally:
+            lock.release()
+
+    def try_get(self, name):
+        """get(), or None while `name` cannot be loaded (a failed first load is retried every check_interval)."""
+        if self._sets.get(name) is None and self.clock() - self._failed.get(name, float('-inf')) < self.check_interval:
+            return None
+        try:
+            return self.get(name)
+        except Exception:
+            self._failed[name] = self.clock()
+            return None
+
+    def reload(self, name=None):
+        """Force the next get() of `name` (or every model) to check its files."""
+        for n in ([name] if name else self.names()):
+            self._checked.pop(n, None)
+            self._stats.pop(n, None)
+
+    def _stat(self, paths):
+        out = []
+        for p in paths:
+            if p is not None:
+                st = os.stat(p)
+                out.append((st.st_mtime_ns, st.st_size))
+        return tuple(out)
+
+    def _load(self, name, paths):
+        objs = []
+        hashes = []
+        for p in paths:
+            if p is None:
+                objs.append(None)
+                continue
+            digest = file_hash(p)
+            key = (os.path.abspath(p), digest)
+            obj = self._artifacts.get(key)
+            if obj is None:
+                obj = joblib.load(p)
+                with self._lock:
+                    # drop older versions of the same file
+                    for k in [k for k in self._artifacts if k[0] == key[0]]:
+                        del self._artifacts[k]
+                    self._artifacts[key] = obj
+            objs.append(obj)
+            hashes.append(digest)
+        version = hashlib.blake2b(''.join(hashes).encode(), digest_size=8).hexdigest()
+        return ModelSet(name, objs[0], objs[1], objs[2], version, time.time())
+
+
+registry = ModelRegistry()
+
+
+def get_model(name):
+    """ModelSet `name` from the process-wide registry."""
+    return registry.get(name)
@@ -1,18 +1,19 @@
 # ml/predict_detector.py
-import joblib
 import numpy as np
 import pandas as pd
 from ml.feature_utils import add_features
+from ml.model_registry import registry
 
 MODEL_PATH = "models/attack_detector.pkl"
 SCALER_PATH = "models/scaler.pkl"
 FEAT_PATH = "models/feature_cols.pkl"
 
+registry.register('detector', MODEL_PATH, SCALER_PATH, FEAT_PATH)
+
 def load_model():
-    model = joblib.load(MODEL_PATH)
-    scaler = joblib.load(SCALER_PATH)
-    feature_cols = joblib.load(FEAT_PATH)
-    return model, scaler, feature_cols
+    # cached by the registry (reloaded only when the files change), not read from disk per event
+    m = registry.get('detector')
+    return m.model, m.scaler, m.feature_cols
 
 def make_features_for_event(event_dict, recent_df):
     """
@@ -21,9 +22,8 @@ def make_features_for_event(event_dict, recent_df):
     Returns: 1D array of features aligned with feature_cols
     """
     # append event to recent_df and call add_features, then pull last row features
-    df = recent_df.copy().reset_index(drop=True)
-    # ensure event is last
-    df = df.append(event_dict, ignore_index=True)
+    # (DataFrame.append is gone in pandas 2; in the request path use predict_event_streaming)
+    df = pd.concat([recent_df, pd.DataFrame([event_dict])], ignore_index=True)
     df, feature_cols = add_features(df, window_seconds=10)
     last = df.iloc[-1]
     return last[feature_cols].values, feature_cols
@@ -31,6 +31,21 @@ def make_features_for_event(event_dict, recent_df):
 def predict_event(event_dict, recent_df, threshold=0.7):
     model, scaler, feature_cols = load_model()
     X_vec, feat_cols = make_features_for_event(event_dict, recent_df)
+    return _score(model, scaler, X_vec, threshold)
+
+def predict_event_streaming(event_dict, stream, loaded=None, threshold=0.7):
+    """
+    predict_event without recent_df: `stream` is an ml.streaming_features.StreamingFeatures
+    that sees every event in arrival order (O(1) per event, same features as add_features).
+    loaded: an optional (model, scaler, feature_cols) tuple to pin one model version; by default
+    load_model() returns the registry's cached set, which picks up retrained files on disk.
+    """
+    model, scaler, feature_cols = loaded or load_model()
+    feats = stream.features(event_dict)
+    X_vec = np.array([feats[c] for c in feature_cols], dtype=float)
+    return _score(model, scaler, X_vec, threshold)
+
+def _score(model, scaler, X_vec, threshold):
     X_scaled = scaler.transform(X_vec.reshape(1,-1))
     prob = model.predict_proba(X_scaled)[0][1] if hasattr(model, "predict_proba") else model.predict(X_scaled)[0]
     is_attack = prob >= threshold
@@ -1,38 +1,78 @@
 # ml/predictor.py
-import joblib
 import numpy as np
 import pandas as pd
 
-_model = None
-_scaler = None
+from ml.model_registry import registry
+
+MODEL_NAME = 'rf'
 FEATURES = ['requested_power','applied_power','temperature','override']
 
-def load(model_path='models/attack_detector_rf.pkl', scaler_path='models/scaler.pkl'):
-    global _model, _scaler
-    _model = joblib.load(model_path)
-    _scaler = joblib.load(scaler_path)
+def load(model_path='models/attack_detector_rf.pkl', scaler_path='models/scaler.pkl', name=None):
+    """Point the predictor at a model/scaler pair (loaded once, reloaded when the files change)."""
+    global MODEL_NAME
+    MODEL_NAME = name or MODEL_NAME
+    registry.register(MODEL_NAME, model_path, scaler_path)
+    return registry.get(MODEL_NAME)
 
 def predict_event(event: dict):
     """
     event: dict with keys requested_power, applied_power, temperature, override (bool or 'True'/'False')
     returns: dict { label: 'attacker'|'tester', score: float (prob for attacker) }
     """
-    if _model is None:
-        load()
+    m = registry.get(MODEL_NAME)
     x = [
         float(event.get('requested_power', 0)),
         float(event.get('applied_power', 0)),
         float(event.get('temperature', 0)),
         1 if str(event.get('override', False)) in ('True','true','1','1.0') else 0
     ]
-    Xs = _scaler.transform([x])
-    if hasattr(_model, "predict_proba"):
-        score = _model.predict_proba(Xs)[0,1]
+    Xs = m.scaler.transform([x])
+    if hasattr(m.model, "predict_proba"):
+        score = m.model.predict_proba(Xs)[0,1]
     else:
         # fallback to decision function or predict
         try:
-            score = _model.decision_function(Xs)[0]
+            score = m.model.decision_function(Xs)[0]
         except:
-            score = float(_model.predict(Xs)[0])
+            score = float(m.model.predict(Xs)[0])
     label = 'attacker' if score >= 0.5 else 'tester'
-    return {'label': label, 'score': float(score)}
\ No newline at end of file
+    return {'label': label, 'score': float(score)}
+
+def override_flags(values):
+    """Vectorised form of the override coercion in predict_event: 1 for True/'True'/'true'/1/'1'/'1.0', else 0."""
+    s = pd.Series(values)
+    if pd.api.types.is_bool_dtype(s) or pd.api.types.is_numeric_dtype(s):
+        return (s == 1).to_numpy(dtype=np.int64)
+    return s.astype(str).isin(('True', 'true', '1', '1.0')).to_numpy(dtype=np.int64)
+
+def _scores(model, Xs):
+    if hasattr(model, "predict_proba"):
+        return model.predict_proba(Xs)[:, 1]
+    try:
+        return model.decision_function(Xs)
+    except Exception:
+        return model.predict(Xs).astype(float)
+
+def predict_batch(X, chunk_size=100000, threshold=0.5):
+    """
+    predict_event for many events at once.
+    X: DataFrame with the FEATURES columns (missing ones count as 0, like predict_event),
+       or an (n, 4) array already in FEATURES order with override as 0/1
+    chunk_size: rows per scaler/model call
+    returns: dict { label: array of 'attacker'|'tester', score: float array }
+    """
+    m = registry.get(MODEL_NAME)
+    if isinstance(X, pd.DataFrame):
+        n = len(X)
+        cols = [pd.to_numeric(X[c], errors='coerce').to_numpy(dtype=float) if c in X.columns else np.zeros(n)
+                for c in FEATURES[:3]]
+        over = override_flags(X['override']) if 'override' in X.columns else np.zeros(n, dtype=np.int64)
+        X = np.column_stack(cols + [over])
+    else:
+        X = np.asarray(X, dtype=float).reshape(-1, len(FEATURES))
+    scores = np.empty(len(X))
+    chunk_size = max(1, int(chunk_size))
+    for i in range(0, len(X), chunk_size):
+        scores[i:i + chunk_size] = _scores(m.model, m.scaler.transform(X[i:i + chunk_size]))
+    labels = np.where(scores >= threshold, 'attacker', 'tester').astype(object)
+    return {'label': labels, 'score': scores}
@@ -0,0 +1,155 @@
+# ml/streaming_features.py
+"""Per-event feature extraction in O(1), for the request path.
+
+`StreamingFeatures.update(event)` returns the same feature vector that
+`add_features` computes for the last row of a frame holding every event
+seen so far, without keeping that frame:
+
+- lag-1 values are the previous event's fields;
+- the rolling-3 means reproduce pandas' running compensated (Kahan) sum
+  (add the new value, remove the one leaving the window), so they match
+  `rolling(3, min_periods=1).mean()` bit for bit;
+- the window count and override fraction come from a deque of
+  (second, override) pairs in [ts - window_seconds, ts] and a running sum.
+
+Timestamps must be non-decreasing within a stream (events in arrival order,
+as in the frontend). With by='client_ip' each client gets its own stream,
+equal to `add_features` over that client's events alone. The client table is
+LRU-bounded by `max_clients`.
+"""
+import math
+from collections import OrderedDict, deque
+
+FEATURE_COLS = [
+    'requested_power', 'applied_power', 'temperature', 'override',
+    'delta_power', 'req_prev_1', 'app_prev_1', 'temp_prev_1',
+    'dtemp', 'dreq', 'req_roll_mean_3', 'app_roll_mean_3',
+    'reqs_last_window', 'overrides_last_window', 'req_is_extreme',
+]
+
+_OVERRIDE = {'True': 1, 'False': 0, '1': 1, '0': 0}
+
+
+class _RollingMean:
+    """pandas' fixed-window rolling mean (min_periods=1), updated one value at a time."""
+    __slots__ = ('n', 'values', 'nobs', 'sum', 'neg', 'comp_add', 'comp_rm', 'same', 'prev')
+
+    def __init__(self, n):
+        self.n = n
+        self.values = deque()
+        self.nobs = 0
+        self.sum = 0.0
+        self.neg = 0
+        self.comp_add = 0.0
+        self.comp_rm = 0.0
+        self.same = 0
+        self.prev = None
+
+    def push(self, val):
+        if self.prev is None:
+            self.prev = val  # pandas seeds the "same value" run with the window's first value
+        if len(self.values) == self.n:
+            old = self.values.popleft()
+            if old == old:
+                self.nobs -= 1
+                y = -old - self.comp_rm
+                t = self.sum + y
+                self.comp_rm = t - self.sum - y
+                self.sum = t
+                if math.copysign(1.0, old) < 0:
+                    self.neg -= 1
+        self.values.append(val)
+        if val == val:
+            self.nobs += 1
+            y = val - self.comp_add
+            t = self.sum + y
+            self.comp_add = t - self.sum - y
+            self.sum = t
+            if math.copysign(1.0, val) < 0:
+                self.neg += 1
+            self.same = self.same + 1 if val == self.prev else 1
+            self.prev = val
+        if self.nobs == 0:
+            return math.nan
+        result = self.sum / self.nobs
+        if self.same >= self.nobs:
+            result = self.prev
+        elif self.neg == 0 and result < 0:
+            result = 0.0
+        elif self.neg == self.nobs and result > 0:
+            result = 0.0
+        return result
+
+
+class _Stream:
+    __slots__ = ('prev', 'req_mean', 'app_mean', 'window', 'override_sum')
+
+    def __init__(self):
+        self.prev = None  # (requested, applied, temperature) of the previous event
+        self.req_mean = _RollingMean(3)
+        self.app_mean = _RollingMean(3)
+        self.window = deque()  # (second, override)
+        self.override_sum = 0
+
+
+class StreamingFeatures:
+    def __init__(self, window_seconds=10, by=None, max_clients=100000):
+        self.window_seconds = window_seconds
+        self.by = by
+        self.max_clients = max(1, int(max_clients))
+        self.feature_cols = list(FEATURE_COLS)
+        self._streams = OrderedDict()
+
+    def _stream(self, event):
+        key = event.get(self.by) if self.by is not None else None
+        s = self._streams.get(key)
+        if s is None:
+            s = self._streams[key] = _Stream()
+            if len(self._streams) > self.max_clients:
+                self._streams.popitem(last=False)
+        else:
+            self._streams.move_to_end(key)
+        return s
+
+    def update(self, event):
+        """Fold one event (dict with ts in unix seconds and the events.csv fields) in; returns its feature list."""
+        s = self._stream(event)
+        req = _float(event.get('requested_power'))
+        app = _float(event.get('applied_power'))
+        temp = _float(event.get('temperature'))
+        override = _OVERRIDE.get(str(event.get('override')), 0)
+        sec = math.floor(float(event['ts']))
+
+        # lag-1, falling back to the current value like shift(1).fillna(...)
+        if s.prev is None:
+            req_prev, app_prev, temp_prev = req, app, temp
+        else:
+            req_prev, app_prev, temp_prev = (p if p == p else c for p, c in zip(s.prev, (req, app, temp)))
+        s.prev = (req, app, temp)
+        req_mean = s.req_mean.push(req)
+        app_mean = s.app_mean.push(app)
+
+        s.window.append((sec, override))
+        s.override_sum += override
+        start = sec - self.window_seconds
+        while s.window[0][0] < start:
+            s.override_sum -= s.window.popleft()[1]
+        count = len(s.window)
+
+        row = [req, app, temp, override,
+               req - app, req_prev, app_prev, temp_prev,
+               temp - temp_prev, req - req_prev, req_mean, app_mean,
+               count, s.override_sum / max(1, count), int(req <= 0.0 or req >= 0.95)]
+        # same as the final fillna(0.0) in add_features
+        return [0.0 if v != v else v for v in row]
+
+    def features(self, event):
+        """update() as a dict keyed by feature column."""
+        return dict(zip(self.feature_cols, self.update(event)))
+
+
+def _float(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return math.nan
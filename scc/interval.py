@@ -0,0 +1,234 @@
+"""Admissible-power-interval mode for the SCC.
+
+The one-step prediction is linear in power:
+
+    T_next = a(T) + b * P,   a(T) = T - k * (T - T_out)/R,  b = k * eta,  k = (dt/60)/C
+
+so the powers that keep T_next inside [T_min, T_max] form the interval
+[(T_min - a)/b, (T_max - a)/b]. IntervalFilter intersects it with the
+heater range [0, 1] and answers a command with a clamp. No prediction call
+is made per request. Because a(T) is linear in T, both interval ends are
+linear in T as well. With `lut_step` set, they are tabulated over quantised
+temperatures. Each cell then stores the narrowest interval over its
+temperature span, so a table answer is never less safe than the exact one.
+
+Unlike the smoothed preview-and-correct filter, this mode also clamps
+requests outside [0, 1] that would have been safe. Run
+`python -m scc.interval` for a report of how the two modes differ.
+
+`load_filter(path, model)` returns a filter that re-reads scc/config.yaml
+when its mtime changes (checked at most once per `check_interval` seconds)
+and switches between `mode: smoothed` and `mode: interval`.
+"""
+import argparse
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+from scc.safety_filter import SafetyFilter, load_config
+
+
+class IntervalFilter:
+    def __init__(self, config, model, lut_step=None, lut_range=(-20.0, 60.0)):
+        # model: RoomSimulator (or anything with T_out, R, C, eta, dt)
+        self.T_min = float(config.get('T_min', 18.0))
+        self.T_max = float(config.get('T_max', 26.0))
+        k = (float(model.dt) / 60.0) / float(model.C)
+        self.b = k * float(model.eta)
+        # a(T) = a0 + a1*T
+        self.a1 = 1.0 - k / float(model.R)
+        self.a0 = k * float(model.T_out) / float(model.R)
+        # interval ends before clamping: lo(T) = lo0 + c*T, hi(T) = hi0 + c*T
+        self._c = -self.a1 / self.b
+        self._lo0 = (self.T_min - self.a0) / self.b
+        self._hi0 = (self.T_max - self.a0) / self.b
+        step = config.get('lut_step', lut_step)
+        self.lut_step = float(step) if step else None
+        self.lut_lo = None
+        self.lut_hi = None
+        if self.lut_step:
+            self._build_lut(*config.get('lut_range', lut_range))
+
+    def interval(self, T):
+        """(lo, hi) admissible applied power for temperature(s) T, already within [0, 1]."""
+        cT = self._c * np.asarray(T, dtype=np.float64)
+        return np.clip(self._lo0 + cT, 0.0, 1.0), np.clip(self._hi0 + cT, 0.0, 1.0)
+
+    def _build_lut(self, t_lo, t_hi):
+        self.lut_t0 = float(t_lo)
+        n = int(math.ceil((float(t_hi) - self.lut_t0) / self.lut_step))
+        edges = self.lut_t0 + self.lut_step * np.arange(n + 1)
+        lo, hi = self.interval(edges)
+        # both ends are monotone in T, so a cell's worst case is at one of its edges
+        self.lut_lo = np.maximum(lo[:-1], lo[1:])
+        self.lut_hi = np.minimum(hi[:-1], hi[1:])
+        # if the cell straddles a point where the interval collapses, fall back to its midpoint value
+        bad = self.lut_lo > self.lut_hi
+        if bad.any():
+            mlo, mhi = self.interval((edges[:-1] + edges[1:])[bad] / 2.0)
+            self.lut_lo[bad] = mlo
+            self.lut_hi[bad] = mhi
+        self._lut_pairs = list(zip(self.lut_lo.tolist(), self.lut_hi.tolist()))
+
+    def _bounds(self, T):
+        if self.lut_lo is not None:
+            i = np.floor((np.asarray(T, dtype=np.float64) - self.lut_t0) / self.lut_step)
+            inside = (i >= 0) & (i < len(self.lut_lo))
+            if np.all(inside):
+                i = i.astype(np.intp)
+                return self.lut_lo[i], self.lut_hi[i]
+        return self.interval(T)
+
+    def filter(self, T_current, P_requested, simulate_step_fn=None):
+        """
+        Same contract as SafetyFilter.filter; simulate_step_fn is accepted but not called.
+        Returns (applied_power, override_flag).
+        """
+        # plain floats and comparisons: this runs once per actuator request
+        T = float(T_current)
+        P = float(P_requested)
+        if self.lut_lo is not None and math.isfinite(T) and 0 <= (i := int((T - self.lut_t0) // self.lut_step)) < len(self._lut_pairs):
+            lo, hi = self._lut_pairs[i]
+        else:
+            cT = self._c * T
+            lo = self._lo0 + cT
+            hi = self._hi0 + cT
+            lo = 0.0 if lo < 0.0 else (1.0 if lo > 1.0 else lo)
+            hi = 0.0 if hi < 0.0 else (1.0 if hi > 1.0 else hi)
+        if P < lo:
+            return lo, True
+        if P > hi:
+            return hi, True
+        return P, False
+
+    def filter_batch(self, T, P_requested, model_params=None):
+        """Returns (applied_power, override_mask, predicted_temp) arrays, like SafetyFilter.filter_batch."""
+        T = np.asarray(T, dtype=np.float64)
+        P = np.asarray(P_requested, dtype=np.float64)
+        lo, hi = self._bounds(T)
+        applied = np.minimum(np.maximum(P, lo), hi)
+        return applied, applied != P, self.a0 + self.a1 * T + self.b * P
+
+
+def make_filter(config, model):
+    """SafetyFilter or IntervalFilter according to config['mode'] ('smoothed' by default)."""
+    mode = config.get('mode', 'smoothed')
+    if mode == 'interval':
+        return IntervalFilter(config, model)
+    if mode == 'smoothed':
+        return SafetyFilter(config)
+    raise ValueError(f"unknown SCC mode: {mode!r}")
+
+
+class ReloadingFilter:
+    """Delegates to make_filter(config, model), rebuilt when the config file changes."""
+
+    def __init__(self, path, model, check_interval=1.0):
+        self.path = path
+        self.model = model
+        self.check_interval = float(check_interval)
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._next_check = 0.0
+        self.current = None
+        self.config = None
+        self._reload()
+
+    def _reload(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime != self._mtime:
+            config = load_config(self.path)
+            self.current = make_filter(config, self.model)
+            self.config = config
+            self._mtime = mtime
+
+    def _check(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        with self._lock:
+            if now < self._next_check:
+                return
+            self._next_check = now + self.check_interval
+            try:
+                self._reload()
+            except Exception:
+                pass  # keep the last good filter if the file is missing or being rewritten
+
+    @property
+    def mode(self):
+        return self.config.get('mode', 'smoothed')
+
+    def filter(self, T_current, P_requested, simulate_step_fn):
+        self._check()
+        return self.current.filter(T_current, P_requested, simulate_step_fn)
+
+    def filter_batch(self, T, P_requested, model_params):
+        self._check()
+        return self.current.filter_batch(T, P_requested, model_params)
+
+
+def load_filter(path, model, check_interval=1.0):
+    return ReloadingFilter(path, model, check_interval)
+
+
+def compare_modes(config, model, T, P):
+    """How interval-mode decisions differ from the smoothed filter for the (T, P) pairs given."""
+    T = np.asarray(T, dtype=np.float64)
+    P = np.asarray(P, dtype=np.float64)
+    smooth = SafetyFilter(config)
+    interval = IntervalFilter(config, model)
+    sa, so, _ = smooth.filter_batch(T, P, model)
+    ia, io, _ = interval.filter_batch(T, P, model)
+    diff = np.abs(ia - sa)
+    # next-step temperature after the filtered command (tolerance for float rounding at the bound)
+    unsafe = [((t < smooth.T_min - 1e-9) | (t > smooth.T_max + 1e-9)).mean()
+              for t in (_after(sa, T, model), _after(ia, T, model))]
+    return {
+        'n': int(T.size),
+        'override_rate_smoothed': float(so.mean()),
+        'override_rate_interval': float(io.mean()),
+        'override_disagreement': float((so != io).mean()),
+        'applied_diff_mean': float(diff.mean()),
+        'applied_diff_p95': float(np.percentile(diff, 95)),
+        'applied_diff_max': float(diff.max()),
+        'unsafe_rate_smoothed': float(unsafe[0]),
+        'unsafe_rate_interval': float(unsafe[1]),
+    }
+
+
+def _after(applied, T, model):
+    k = (float(model.dt) / 60.0) / float(model.C)
+    return T + k * (-(T - float(model.T_out)) / float(model.R) + float(model.eta) * applied)
+
+
+def main():
+    import sys
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from simulator.room import RoomSimulator
+    parser = argparse.ArgumentParser(description='Compare interval-mode SCC decisions with the smoothed filter')
+    parser.add_argument('--config', default=os.path.join(os.path.dirname(__file__), 'config.yaml'))
+    parser.add_argument('--events', default=None,
+                        help='Replay recorded (temperature, requested_power) pairs from an event log instead of a grid')
+    args = parser.parse_args()
+    config = load_config(args.config)
+    model = RoomSimulator()
+    if args.events:
+        from eventlog.reader import load_events
+        df = load_events(args.events, columns=['temperature', 'requested_power', 'event_type'])
+        df = df[df['event_type'] == 'event'] if 'event_type' in df.columns else df
+        # the command was filtered against the temperature left by the previous command
+        T = df['temperature'].astype(float).shift(1).fillna(model.T).to_numpy()
+        P = df['requested_power'].astype(float).fillna(0.0).to_numpy()
+    else:
+        T, P = np.meshgrid(np.linspace(0.0, 40.0, 801), np.linspace(-0.5, 1.5, 201))
+        T, P = T.ravel(), P.ravel()
+    for k, v in compare_modes(config, model, T, P).items():
+        print(f"{k:>28}: {v:.6g}" if isinstance(v, float) else f"{k:>28}: {v}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,4 @@
+import numpy as np
 import yaml
 
 class SafetyFilter:
@@ -26,6 +27,38 @@ class SafetyFilter:
             applied = max(0.0, applied - self.alpha * (predicted - self.T_max)/10.0)
         return applied, override
 
+    def filter_batch(self, T, P_requested, model_params):
+        """
+        Vectorized filter() for arrays of temperatures and requested powers.
+        model_params: RoomSimulator/RoomArraySimulator or a dict with T_out, R, C, eta, dt
+        and optional disturbance (scalars or arrays broadcasting against T).
+        Returns (applied_power, override_mask, predicted_temp) arrays; element i equals
+        filter(T[i], P_requested[i], <one RoomSimulator step>) exactly.
+        """
+        get = model_params.get if isinstance(model_params, dict) else (lambda k, d=None: getattr(model_params, k, d))
+        T = np.asarray(T, dtype=np.float64)
+        P = np.asarray(P_requested, dtype=np.float64)
+        # same expression and evaluation order as RoomSimulator.predict
+        dT_dt = (1.0/np.asarray(get('C', 1.0), dtype=np.float64)) * (
+            -(T - np.asarray(get('T_out', 10.0), dtype=np.float64))/np.asarray(get('R', 1.0), dtype=np.float64)
+            + np.asarray(get('eta', 0.9), dtype=np.float64) * P
+            + np.asarray(get('disturbance', 0.0), dtype=np.float64))
+        predicted = T + dT_dt * (np.asarray(get('dt', 60.0), dtype=np.float64) / 60.0)
+        applied, override = self.correct_batch(P, predicted)
+        return applied, override, predicted
+
+    def correct_batch(self, P_requested, predicted):
+        """
+        The smoothed correction of filter() for arrays of requested powers and their
+        predicted next temperatures. Returns (applied_power, override_mask).
+        """
+        P = np.asarray(P_requested, dtype=np.float64)
+        low = predicted < self.T_min
+        high = predicted > self.T_max
+        applied = np.where(low, np.minimum(1.0, P + self.alpha * (self.T_min - predicted)/10.0),
+                           np.where(high, np.maximum(0.0, P - self.alpha * (predicted - self.T_max)/10.0), P))
+        return applied, low | high
+
 def load_config(path):
     with open(path, 'r') as f:
         return yaml.safe_load(f)
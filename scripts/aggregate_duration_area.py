@@ -20,10 +20,12 @@ os.makedirs(PLOTS, exist_ok=True)
 
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from simulator.room import RoomSimulator
+from simulator.crossing import normal_crossing_times
+from eventlog.reader import load_events as read_event_log
 
 SESSIONS_CSV = os.path.join(ROOT, 'engagement_sessions.csv')
 LOG_PATH = os.path.join(os.path.dirname(ROOT), 'logs', 'events.csv')
+EVENT_COLUMNS_USED = ['ts', 'client_ip', 'role', 'event_type', 'temperature', 'requested_power']
 
 
 def load_sessions():
@@ -32,50 +34,15 @@ def load_sessions():
     return pd.read_csv(SESSIONS_CSV)
 
 
-def load_events():
-    if not os.path.exists(LOG_PATH):
-        raise FileNotFoundError(LOG_PATH)
-    df = pd.read_csv(LOG_PATH)
+def load_events(path=LOG_PATH, start_ts=None, end_ts=None):
+    # only the columns normal_crossing_times needs; for Parquet/SQLite
+    # stores the session time span also prunes what is read
+    df = read_event_log(path, columns=EVENT_COLUMNS_USED, start_ts=start_ts, end_ts=end_ts)
     if 'ts' in df.columns:
         df['ts'] = df['ts'].astype(int)
     return df
 
 
-def simulate_normal_time_for_session(df_events, client, start_ts, end_ts):
-    sel = df_events[(df_events.get('client_ip', df_events.get('role')) == client) & (df_events['ts'] >= start_ts) & (df_events['ts'] <= end_ts)]
-    if 'event_type' in sel.columns:
-        sel = sel[sel['event_type'] == 'event']
-    sel = sel.sort_values('ts').reset_index(drop=True)
-    if sel.empty:
-        return None
-    # initial temperature
-    if 'temperature' in sel.columns and not sel['temperature'].isnull().all():
-        T0 = float(sel['temperature'].iloc[0])
-    else:
-        T0 = 22.0
-    sim = RoomSimulator(T0=T0)
-    crossed = None
-    sim_time = 0.0
-    for i, row in sel.iterrows():
-        p = float(row.get('requested_power', 0) or 0)
-        if i < len(sel) - 1:
-            next_ts = int(sel.loc[i+1, 'ts'])
-            gap = max(1, next_ts - int(row['ts']))
-        else:
-            gap = int(sim.dt)
-        remaining = gap
-        while remaining > 0:
-            sim.step(P_heater=float(p))
-            sim_time += sim.dt
-            remaining -= sim.dt
-            if sim.T < 18.0 or sim.T > 26.0:
-                crossed = sim_time
-                break
-        if crossed is not None:
-            break
-    return crossed
-
-
 def smooth(y, window=5):
     if window <= 1:
         return y
@@ -125,16 +92,10 @@ def plot_area(adaptive, normal, bins=50, out_png=os.path.join(PLOTS, 'aggregate_
 
 def main():
     sessions = load_sessions()
-    events = load_events()
+    events = load_events(start_ts=int(sessions['start_ts'].min()), end_ts=int(sessions['end_ts'].max()))
     adaptive = sessions['duration_s'].dropna().astype(float).tolist()
-    normal = []
-    for _, row in sessions.iterrows():
-        client = row['client']
-        start_ts = int(row['start_ts'])
-        end_ts = int(row['end_ts'])
-        t = simulate_normal_time_for_session(events, client, start_ts, end_ts)
-        if t is not None:
-            normal.append(float(t))
+    # time-to-cross for every session in one vectorised pass (simulator/crossing.py)
+    normal = [float(t) for t in normal_crossing_times(events, sessions) if not np.isnan(t)]
 
     plot_area(adaptive, normal, bins=80)
 
@@ -1,8 +1,8 @@
 """Create a grouped bar chart comparing adaptive session durations vs simulated 'normal' durations.
 
 This script loads `scripts/engagement_sessions.csv` and `logs/events.csv`,
-recomputes the simulated normal 'time-to-cross' per session (same logic as
-`engagement_analysis.py`), bins both duration lists using shared bin edges,
+recomputes the simulated normal 'time-to-cross' per session (simulator/crossing.py,
+shared with `engagement_analysis.py`), bins both duration lists using shared bin edges,
 and draws a grouped bar chart (counts per bin) for clear comparison.
 
 Outputs:
@@ -20,13 +20,14 @@ ROOT = os.path.dirname(__file__)
 PLOTS = os.path.join(ROOT, 'plots')
 os.makedirs(PLOTS, exist_ok=True)
 
-# reuse simulator for normal honeypot simulation
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from simulator.room import RoomSimulator
+from simulator.crossing import normal_crossing_times
+from eventlog.reader import load_events as read_event_log
 
 SESSIONS_CSV = os.path.join(ROOT, 'engagement_sessions.csv')
 LOG_PATH = os.path.join(os.path.dirname(ROOT), 'logs', 'events.csv')
+EVENT_COLUMNS_USED = ['ts', 'client_ip', 'role', 'event_type', 'temperature', 'requested_power']
 
 
 def load_sessions(path=SESSIONS_CSV):
@@ -36,51 +37,15 @@ def load_sessions(path=SESSIONS_CSV):
     return df
 
 
-def load_events(path=LOG_PATH):
-    if not os.path.exists(path):
-        raise FileNotFoundError(path)
-    df = pd.read_csv(path)
+def load_events(path=LOG_PATH, start_ts=None, end_ts=None):
+    # only the columns normal_crossing_times needs; for Parquet/SQLite
+    # stores the session time span also prunes what is read
+    df = read_event_log(path, columns=EVENT_COLUMNS_USED, start_ts=start_ts, end_ts=end_ts)
     if 'ts' in df.columns:
         df['ts'] = df['ts'].astype(int)
     return df
 
 
-def simulate_normal_time_for_session(df_events, client, start_ts, end_ts):
-    sel = df_events[(df_events.get('client_ip', df_events.get('role')) == client) & (df_events['ts'] >= start_ts) & (df_events['ts'] <= end_ts)]
-    if 'event_type' in sel.columns:
-        sel = sel[sel['event_type'] == 'event']
-    sel = sel.sort_values('ts').reset_index(drop=True)
-    if sel.empty:
-        return None
-    # initial temperature
-    if 'temperature' in sel.columns and not sel['temperature'].isnull().all():
-        T0 = float(sel['temperature'].iloc[0])
-    else:
-        T0 = 22.0
-    sim = RoomSimulator(T0=T0)
-    crossed = None
-    sim_time = 0.0
-    for i, row in sel.iterrows():
-        p = float(row.get('requested_power', 0) or 0)
-        if i < len(sel) - 1:
-            next_ts = int(sel.loc[i+1, 'ts'])
-            gap = max(1, next_ts - int(row['ts']))
-        else:
-            gap = int(sim.dt)
-        remaining = gap
-        while remaining > 0:
-            sim.step(P_heater=float(p))
-            sim_time += sim.dt
-            remaining -= sim.dt
-            # boundaries from config were used elsewhere; use default comfortable bounds
-            if sim.T < 18.0 or sim.T > 26.0:
-                crossed = sim_time
-                break
-        if crossed is not None:
-            break
-    return crossed
-
-
 def make_barchart(adaptive, normal, bins=10, out_png=os.path.join(PLOTS, 'aggregate_durations_barchart.png')):
     # compute shared bin edges
     all_vals = [v for v in (adaptive + normal) if v is not None]
@@ -120,18 +85,12 @@ def make_barchart(adaptive, normal, bins=10, out_png=os.path.join(PLOTS, 'aggreg
 
 def main():
     sessions_df = load_sessions()
-    events_df = load_events()
+    events_df = load_events(start_ts=int(sessions_df['start_ts'].min()), end_ts=int(sessions_df['end_ts'].max()))
 
     adaptive = sessions_df['duration_s'].dropna().astype(float).tolist()
 
-    normal_times = []
-    for _, row in sessions_df.iterrows():
-        client = row['client']
-        start_ts = int(row['start_ts'])
-        end_ts = int(row['end_ts'])
-        t = simulate_normal_time_for_session(events_df, client, start_ts, end_ts)
-        if t is not None:
-            normal_times.append(float(t))
+    # time-to-cross for every session in one vectorised pass (simulator/crossing.py)
+    normal_times = [float(t) for t in normal_crossing_times(events_df, sessions_df) if not np.isnan(t)]
 
     # fallback: if no normal_times found, skip and create histogram of adaptive only
     if not normal_times:
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Tick-cost benchmark for simulator/building.BuildingSimulator.
+
+Builds an nx*ny*nz grid of coupled zones, attaches the smoothed SCC to half
+of them and the interval SCC to the other half, and times `--ticks` steps
+with random heater commands. It also checks that an uncoupled building
+tracks independent RoomSimulator instances.
+
+Usage:
+  python scripts/bench_building.py --nx 100 --ny 100 --ticks 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from simulator.room import RoomSimulator
+from simulator.building import BuildingSimulator, smoothed_hook, interval_hook
+from scc.safety_filter import SafetyFilter, load_config
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'scc', 'config.yaml')
+
+
+def check_uncoupled(steps=200, seed=0):
+    rng = np.random.default_rng(seed)
+    n = 50
+    params = dict(T0=rng.uniform(10, 30, n), R=rng.uniform(0.5, 3, n), C=rng.uniform(0.5, 3, n), eta=rng.uniform(0.5, 1, n))
+    b = BuildingSimulator(n, **params)
+    rooms = [RoomSimulator(**{k: v[i] for k, v in params.items()}) for i in range(n)]
+    for _ in range(steps):
+        P = rng.uniform(0, 1, n)
+        b.step(P)
+        for r, p in zip(rooms, P):
+            r.step(P_heater=p)
+    return float(np.max(np.abs(b.T - [r.T for r in rooms])))
+
+
+def main():
+    p = argparse.ArgumentParser(description='Tick-cost benchmark for the building RC network')
+    p.add_argument('--nx', type=int, default=100)
+    p.add_argument('--ny', type=int, default=100)
+    p.add_argument('--nz', type=int, default=1)
+    p.add_argument('--g', type=float, default=0.3, help='Inter-zone conductance')
+    p.add_argument('--ticks', type=int, default=1000)
+    p.add_argument('--seed', type=int, default=0)
+    args = p.parse_args()
+
+    print(f"uncoupled vs RoomSimulator: max |dT| = {check_uncoupled(seed=args.seed):.3g}")
+
+    config = load_config(CONFIG_PATH)
+    b = BuildingSimulator.grid(args.nx, args.ny, args.nz, g=args.g, R=4.0, C=5.0)
+    b.add_scc(np.arange(0, b.n, 2), smoothed_hook(SafetyFilter(config)))
+    b.add_scc(np.arange(1, b.n, 2), interval_hook(float(config['T_min']), float(config['T_max'])))
+    rng = np.random.default_rng(args.seed)
+    commands = rng.uniform(0, 1, (min(args.ticks, 100), b.n))
+    t0 = time.perf_counter()
+    for i in range(args.ticks):
+        b.step(commands[i % len(commands)])
+    elapsed = time.perf_counter() - t0
+    print(f"{b.n} zones, {b.A.nnz} non-zeros: {elapsed / args.ticks * 1e6:.0f} us/tick with SCC hooks")
+    print(f"T range {b.T.min():.2f}..{b.T.max():.2f}, overrides on last tick: {int(b.override.sum())}")
+
+
+if __name__ == '__main__':
+    main()
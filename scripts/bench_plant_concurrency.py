@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Concurrency benchmark for frontend/plant.PlantState.
+
+Runs `--clients` writer threads that each send `--requests` heater commands
+through one shared PlantState while `--readers` threads poll the published
+snapshot (the `/sensor/temperature` path). Afterwards it checks correctness:
+
+ - snapshot sequence numbers are exactly 1..N with no gaps or duplicates;
+ - replaying the requested powers in sequence order through a fresh
+   RoomSimulator + SafetyFilter reproduces every applied power, override flag
+   and temperature bit for bit;
+ - every reader saw non-decreasing sequence numbers.
+
+With `--url` the same writer/reader mix is sent over HTTP to a running
+honeypot instead, and only throughput and error counts are reported.
+
+Usage:
+  python scripts/bench_plant_concurrency.py --clients 64 --requests 500
+  python scripts/bench_plant_concurrency.py --clients 128 --url http://127.0.0.1:5000
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from simulator.room import RoomSimulator
+from scc.safety_filter import SafetyFilter, load_config
+from frontend.plant import PlantState
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'scc', 'config.yaml')
+POWERS = [0.0, 0.2, 0.5, 0.6, 1.0]
+
+
+def run_inprocess(clients, requests_per_client, readers, seed):
+    config = load_config(CONFIG_PATH)
+    plant = PlantState(RoomSimulator(), SafetyFilter(config))
+    results = [[] for _ in range(clients)]
+    reads = [0] * readers
+    read_errors = []
+    stop = threading.Event()
+    start_gate = threading.Barrier(clients + readers + 1)
+
+    def writer(idx):
+        rng = random.Random(seed + idx)
+        start_gate.wait()
+        out = results[idx]
+        for _ in range(requests_per_client):
+            out.append(plant.apply(rng.choice(POWERS)))
+
+    def reader(idx):
+        start_gate.wait()
+        last = -1
+        n = 0
+        while not stop.is_set():
+            snap = plant.snapshot
+            if snap.seq < last:
+                read_errors.append((idx, last, snap.seq))
+            last = snap.seq
+            n += 1
+        reads[idx] = n
+
+    wthreads = [threading.Thread(target=writer, args=(i,)) for i in range(clients)]
+    rthreads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    for t in wthreads + rthreads:
+        t.start()
+    start_gate.wait()
+    t0 = time.perf_counter()
+    for t in wthreads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    for t in rthreads:
+        t.join()
+
+    snaps = sorted((s for r in results for s in r), key=lambda s: s.seq)
+    total = clients * requests_per_client
+    ok = True
+    if [s.seq for s in snaps] != list(range(1, total + 1)):
+        print('FAIL: snapshot sequence numbers are not contiguous')
+        ok = False
+    # sequential replay must reproduce every concurrent result exactly
+    ref_sim = RoomSimulator()
+    ref_filter = SafetyFilter(config)
+    mismatches = 0
+    for s in snaps:
+        applied, override = ref_filter.filter(ref_sim.T, s.requested_power, ref_sim.predict)
+        T = ref_sim.step(P_heater=applied)
+        if (applied, override, T) != (s.applied_power, s.override, s.temperature):
+            mismatches += 1
+    if mismatches:
+        print(f'FAIL: {mismatches} result(s) differ from the sequential replay')
+        ok = False
+    if read_errors:
+        print(f'FAIL: {len(read_errors)} reader(s) observed a sequence number going backwards')
+        ok = False
+    if plant.snapshot.seq != total or plant.snapshot.temperature != ref_sim.T:
+        print('FAIL: final published snapshot does not match the replay')
+        ok = False
+
+    print(f'clients={clients} readers={readers} commands={total}')
+    print(f'apply throughput: {total / elapsed:,.0f} commands/s ({elapsed:.3f}s)')
+    print(f'snapshot reads: {sum(reads):,} ({sum(reads) / elapsed:,.0f} reads/s)')
+    print('correctness:', 'OK' if ok else 'FAILED')
+    return ok
+
+
+def run_http(url, clients, requests_per_client, readers, seed):
+    import requests
+    errors = [0]
+    lock = threading.Lock()
+    reads = [0] * readers
+    stop = threading.Event()
+
+    def writer(idx):
+        rng = random.Random(seed + idx)
+        s = requests.Session()
+        for _ in range(requests_per_client):
+            try:
+                r = s.post(url + '/actuator/heater', json={'power': rng.choice(POWERS), 'role': 'bench'},
+                           headers={'X-Forwarded-For': f'10.0.{idx // 256}.{idx % 256}'}, timeout=10)
+                r.raise_for_status()
+            except Exception:
+                with lock:
+                    errors[0] += 1
+
+    def reader(idx):
+        s = requests.Session()
+        while not stop.is_set():
+            try:
+                s.get(url + '/sensor/temperature', timeout=10)
+                reads[idx] += 1
+            except Exception:
+                with lock:
+                    errors[0] += 1
+
+    wthreads = [threading.Thread(target=writer, args=(i,)) for i in range(clients)]
+    rthreads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    t0 = time.perf_counter()
+    for t in wthreads + rthreads:
+        t.start()
+    for t in wthreads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    for t in rthreads:
+        t.join()
+    total = clients * requests_per_client
+    print(f'clients={clients} readers={readers} commands={total} url={url}')
+    print(f'POST throughput: {total / elapsed:,.0f} req/s ({elapsed:.3f}s)')
+    print(f'GET throughput: {sum(reads) / elapsed:,.0f} req/s')
+    print(f'errors: {errors[0]}')
+    return errors[0] == 0
+
+
+def main():
+    p = argparse.ArgumentParser(description='Concurrency benchmark for the honeypot plant state')
+    p.add_argument('--clients', type=int, default=64, help='Concurrent writer threads')
+    p.add_argument('--requests', type=int, default=500, help='Commands per writer')
+    p.add_argument('--readers', type=int, default=8, help='Concurrent snapshot readers')
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--url', default=None, help='Benchmark a running honeypot over HTTP instead')
+    args = p.parse_args()
+    if args.url:
+        ok = run_http(args.url.rstrip('/'), args.clients, args.requests, args.readers, args.seed)
+    else:
+        ok = run_inprocess(args.clients, args.requests, args.readers, args.seed)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
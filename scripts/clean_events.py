@@ -1,16 +1,21 @@
-import os, shutil, re
+import os, shutil, re, sys
 from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from eventlog.writer import EVENT_COLUMNS
 p = Path(__file__).resolve().parent.parent / 'logs' / 'events.csv'
 bak = p.with_suffix('.csv.cleaned.bak')
 shutil.copy2(p, bak)
 print('Backup written to', bak)
 new_lines = []
-header = 'ts,role,requested_power,applied_power,temperature,override,client_ip,user_agent,request_path,request_method,client_id,event_type'
-new_lines.append(header)
 with p.open('r', encoding='utf-8') as f:
     lines = f.readlines()
-# skip original header (first line) and process following
-for i, line in enumerate(lines[1:], start=2):
+# keep the file's own header (the column list grows over time, see eventlog/writer.py)
+has_header = bool(lines) and lines[0].startswith('ts,')
+header = lines[0].strip('\n\r') if has_header else ','.join(EVENT_COLUMNS)
+new_lines.append(header)
+# skip the original header, if any, and process the rest
+start = 1 if has_header else 0
+for i, line in enumerate(lines[start:], start=start + 1):
     s = line.strip('\n\r')
     if not s:
         # skip blank lines
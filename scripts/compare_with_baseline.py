@@ -7,8 +7,10 @@ Produces:
 Baseline defaults are inlined but can be edited in the script or replaced by a JSON file.
 """
 import os
+import sys
 import csv
 import json
+import argparse
 from collections import Counter
 import math
 import psutil
@@ -21,6 +23,9 @@ except Exception:
 
 ROOT = os.path.dirname(__file__)
 PLOTS = os.path.join(ROOT, 'plots')
+EVENTS_PATH = os.path.join(os.path.dirname(ROOT), 'logs', 'events.csv')
+sys.path.append(os.path.join(ROOT, '..'))
+from eventlog.reader import load_events, event_weights
 os.makedirs(PLOTS, exist_ok=True)
 
 # baseline defaults (placeholder values). Replace with web-derived numbers if available.
@@ -61,7 +66,7 @@ def metric_engagement_duration(sessions_df):
     # average duration_s
     return float(sessions_df['duration_s'].dropna().mean())
 
-def metric_detection_resistance(events_path=os.path.join(os.path.dirname(ROOT), 'logs', 'events.csv')):
+def metric_detection_resistance(events_path=EVENTS_PATH, start_ts=None, end_ts=None):
     # Improved heuristic:
     # For each session (group by client_ip or role) compute signals that indicate detection:
     # - session ends shortly after a server-side override (client likely detected behavior)
@@ -70,7 +75,9 @@ def metric_detection_resistance(events_path=os.path.join(os.path.dirname(ROOT),
     # or never saw an override and had >1 events. Returns fraction of sessions that appear resistant (0..1).
     if not os.path.exists(events_path):
         return None
-    df = pd.read_csv(events_path)
+    df = load_events(events_path, columns=['ts', 'role', 'client_ip', 'override', 'count'], start_ts=start_ts, end_ts=end_ts)
+    # aggregated 'throttled' rows stand for `count` requests
+    df['weight'] = event_weights(df)
     # group by client_ip or role
     id_field = 'client_ip' if 'client_ip' in df.columns else 'role'
     resist_count = 0
@@ -78,7 +85,7 @@ def metric_detection_resistance(events_path=os.path.join(os.path.dirname(ROOT),
     for client, g in df.groupby(id_field):
         g = g.sort_values('ts').reset_index(drop=True)
         total += 1
-        events = len(g)
+        events = int(g['weight'].sum())
         if events == 0:
             continue
         # find override indices
@@ -87,7 +94,7 @@ def metric_detection_resistance(events_path=os.path.join(os.path.dirname(ROOT),
             if not overrides.empty:
                 first_idx = overrides.index[0]
                 # number of events after override
-                after = len(g[g.index > first_idx])
+                after = int(g.loc[g.index > first_idx, 'weight'].sum())
                 # if client keeps interacting for >=3 events after override -> resistant
                 if after >= 3:
                     resist_count += 1
@@ -102,12 +109,12 @@ def metric_detection_resistance(events_path=os.path.join(os.path.dirname(ROOT),
                 resist_count += 1
     return resist_count / max(1, total)
 
-def metric_policy_adaptation_latency(events_path=os.path.join(os.path.dirname(ROOT), 'logs', 'events.csv')):
+def metric_policy_adaptation_latency(events_path=EVENTS_PATH, start_ts=None, end_ts=None):
     # Improved: compute both median and mean latency from first non-system event (session start) to the first override within that session.
     # Ignore sessions with no override. Return median; also write mean into CSV later if needed.
     if not os.path.exists(events_path):
         return None
-    df = pd.read_csv(events_path)
+    df = load_events(events_path, columns=['ts', 'role', 'client_ip', 'override', 'event_type'], start_ts=start_ts, end_ts=end_ts)
     id_field = 'client_ip' if 'client_ip' in df.columns else 'role'
     latencies = []
     for client, g in df.groupby(id_field):
@@ -163,12 +170,13 @@ def metric_resource_overhead():
     score = 0.6 * cpu_norm + 0.4 * mem_norm
     return float(score)
 
-def metric_threat_intel_yield(events_path=os.path.join(os.path.dirname(ROOT), 'logs', 'events.csv')):
+def metric_threat_intel_yield(events_path=EVENTS_PATH, start_ts=None, end_ts=None):
     # Improved threat-intel heuristic: combine diversity (entropy) over user_agent/request_path/client_id
     # with the number of distinct payload signatures (requested_power, applied_power sequences) and count of unique paths used by 'attacker' role.
     if not os.path.exists(events_path):
         return None
-    df = pd.read_csv(events_path)
+    df = load_events(events_path, columns=['requested_power', 'applied_power', 'user_agent', 'request_path', 'client_id'],
+                     start_ts=start_ts, end_ts=end_ts)
     # unique clients
     ua = df['user_agent'].dropna().astype(str)
     paths = df['request_path'].dropna().astype(str)
@@ -357,13 +365,20 @@ def write_results_csv(metrics, baseline=BASELINE, path=OUT_CSV):
             w.writerow([k, v, metrics.get(k)])
 
 def main():
+    parser = argparse.ArgumentParser(description='Compare experiment metrics with baseline values')
+    parser.add_argument('--events', default=EVENTS_PATH, help='Path to events.csv, a SQLite event store (.db) or a Parquet segment directory (logs/events)')
+    parser.add_argument('--since', type=int, default=None, help='Only events with ts >= SINCE (unix seconds)')
+    parser.add_argument('--until', type=int, default=None, help='Only events with ts <= UNTIL (unix seconds)')
+    args = parser.parse_args()
+    window = {'start_ts': args.since, 'end_ts': args.until}
+
     sessions = load_sessions()
     metrics = {}
     metrics['engagement_duration_s'] = metric_engagement_duration(sessions)
-    metrics['detection_resistance'] = metric_detection_resistance()
-    metrics['policy_adaptation_latency_s'] = metric_policy_adaptation_latency()
+    metrics['detection_resistance'] = metric_detection_resistance(args.events, **window)
+    metrics['policy_adaptation_latency_s'] = metric_policy_adaptation_latency(args.events, **window)
     metrics['resource_overhead_score'] = metric_resource_overhead()
-    metrics['threat_intel_yield'] = metric_threat_intel_yield()
+    metrics['threat_intel_yield'] = metric_threat_intel_yield(args.events, **window)
 
     write_results_csv(metrics)
     out_png = make_comparison(metrics)
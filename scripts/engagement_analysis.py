@@ -1,8 +1,10 @@
 """scripts/engagement_analysis.py
 
-Simple offline analyzer that computes engagement sessions from logs/events.csv.
+Simple offline analyzer that computes engagement sessions from logs/events.csv
+(or a SQLite / Parquet event store, see eventlog/sqlite_store.py and eventlog/parquet_store.py).
 It groups events by `client_ip` if present, otherwise by `role`, and splits sessions
 when the gap between consecutive events exceeds a threshold (default 120s).
+Aggregated `throttled` rows count as `count` events.
 
 Outputs: scripts/engagement_sessions.csv and prints a short summary.
 """
@@ -18,6 +20,8 @@ import matplotlib.pyplot as plt
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from simulator.room import RoomSimulator
+from simulator.crossing import normal_crossing_times
+from eventlog.reader import load_events, event_weights
 
 LOG_PATH = os.path.join(os.path.dirname(__file__), "..", "logs", "events.csv")
 OUT_PATH = os.path.join(os.path.dirname(__file__), "engagement_sessions.csv")
@@ -25,10 +29,9 @@ PLOTS_DIR = os.path.join(os.path.dirname(__file__), "plots")
 
 os.makedirs(PLOTS_DIR, exist_ok=True)
 
-def load_logs(path=LOG_PATH):
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Log file not found: {path}")
-    df = pd.read_csv(path)
+def load_logs(path=LOG_PATH, start_ts=None, end_ts=None, clients=None):
+    # time/client filters are pushed down into the query for SQLite and Parquet stores
+    df = load_events(path, start_ts=start_ts, end_ts=end_ts, clients=clients)
     # Ensure ts is integer
     if 'ts' in df.columns:
         df['ts'] = df['ts'].astype(int)
@@ -41,20 +44,10 @@ def annotate_with_ml(df):
     try:
         from ml import predictor
         predictor.load()
-        labels = []
-        scores = []
-        for _, row in df.iterrows():
-            ev = {
-                'requested_power': row.get('requested_power', 0),
-                'applied_power': row.get('applied_power', 0),
-                'temperature': row.get('temperature', 0),
-                'override': row.get('override', False)
-            }
-            r = predictor.predict_event(ev)
-            labels.append(r['label'])
-            scores.append(r['score'])
-        df['ml_label'] = labels
-        df['ml_score'] = scores
+        # one scaler/model call per chunk instead of one per row
+        r = predictor.predict_batch(df)
+        df['ml_label'] = r['label']
+        df['ml_score'] = r['score']
     except Exception as e:
         # silently continue if ML not available
         df['ml_label'] = None
@@ -63,6 +56,7 @@ def annotate_with_ml(df):
 
 def sessionize_events(df, id_field, gap_threshold=120):
     sessions = []
+    df = df.assign(_weight=event_weights(df))
     for client, group in df.groupby(id_field):
         g = group.sort_values('ts')
         start = None
@@ -77,7 +71,7 @@ def sessionize_events(df, id_field, gap_threshold=120):
                 # start new session
                 start = ts
                 end = ts
-                ev_count = 1
+                ev_count = r['_weight']
                 overrides = 1 if bool(r.get('override', False)) else 0
                 if r.get('ml_score') is not None:
                     scores = [r.get('ml_score')]
@@ -90,21 +84,21 @@ def sessionize_events(df, id_field, gap_threshold=120):
                         'start_ts': start,
                         'end_ts': end,
                         'duration_s': end - start,
-                        'event_count': ev_count,
+                        'event_count': int(ev_count),
                         'override_count': overrides,
                         'avg_ml_score': (sum(scores)/len(scores)) if scores else None
                     })
                     # start new
                     start = ts
                     end = ts
-                    ev_count = 1
+                    ev_count = r['_weight']
                     overrides = 1 if bool(r.get('override', False)) else 0
                     scores = [r.get('ml_score')] if r.get('ml_score') is not None else []
                     prev_ts = ts
                 else:
                     # continue session
                     end = ts
-                    ev_count += 1
+                    ev_count += r['_weight']
                     if bool(r.get('override', False)):
                         overrides += 1
                     if r.get('ml_score') is not None:
@@ -117,7 +111,7 @@ def sessionize_events(df, id_field, gap_threshold=120):
                 'start_ts': start,
                 'end_ts': end,
                 'duration_s': end - start,
-                'event_count': ev_count,
+                'event_count': int(ev_count),
                 'override_count': overrides,
                 'avg_ml_score': (sum(scores)/len(scores)) if scores else None
             })
@@ -171,14 +165,17 @@ def plot_session(df, client, start_ts, end_ts, simulate_normal=False, outdir=PLO
 
 def main():
     parser = argparse.ArgumentParser(description='Engagement analysis and visualization')
-    parser.add_argument('--log', default=LOG_PATH, help='Path to events.csv')
+    parser.add_argument('--log', default=LOG_PATH, help='Path to events.csv, a SQLite event store (.db) or a Parquet segment directory (logs/events)')
+    parser.add_argument('--since', type=int, default=None, help='Only events with ts >= SINCE (unix seconds)')
+    parser.add_argument('--until', type=int, default=None, help='Only events with ts <= UNTIL (unix seconds)')
+    parser.add_argument('--client', action='append', default=None, help='Only events from this client_ip (repeatable)')
     parser.add_argument('--out', default=OUT_PATH, help='Output sessions CSV')
     parser.add_argument('--gap', default=120, type=int, help='Session gap threshold (s)')
     parser.add_argument('--plots', action='store_true', help='Generate per-session plots')
     parser.add_argument('--simulate-normal', action='store_true', help='Also simulate normal honeypot (no SCC) for comparison')
     args = parser.parse_args()
 
-    df = load_logs(args.log)
+    df = load_logs(args.log, start_ts=args.since, end_ts=args.until, clients=args.client)
     df = annotate_with_ml(df)
     # decide identity field
     if 'client_ip' in df.columns:
@@ -202,7 +199,7 @@ def main():
     counts = [s['event_count'] for s in sessions]
     overrides = [s['override_count'] for s in sessions]
     print(f"Found {len(sessions)} session(s) grouped by '{id_field}'")
-    print(f"Total events: {len(df)}")
+    print(f"Total events: {int(event_weights(df).sum())}")
     print(f"Session durations (s): min={min(durations)}, max={max(durations)}, mean={sum(durations)/len(durations):.1f}")
     print(f"Events per session: min={min(counts)}, max={max(counts)}, mean={sum(counts)/len(counts):.1f}")
     print(f"Overrides per session (sum/mean): {sum(overrides)}/{(sum(overrides)/len(overrides)):.1f}")
@@ -220,7 +217,6 @@ def main():
                 print('Failed to plot session', s['client'], s['start_ts'], e)
 
         # --- compute normal-honeypot time-to-cross-safety per session ---
-        normal_times = []
         # load scc config for bounds
         try:
             cfg_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'scc', 'config.yaml')
@@ -232,40 +228,9 @@ def main():
         except Exception:
             T_min, T_max = 18.0, 26.0
 
-        for s in sessions:
-            sel = df[(df.get('client_ip', df.get('role')) == s['client']) & (df['ts'] >= s['start_ts']) & (df['ts'] <= s['end_ts'])]
-            if 'event_type' in sel.columns:
-                sel = sel[sel['event_type'] == 'event']
-            sel = sel.sort_values('ts').reset_index(drop=True)
-            if sel.empty:
-                normal_times.append(None)
-                continue
-            # initial temperature
-            if 'temperature' in sel.columns and not sel['temperature'].isnull().all():
-                T0 = float(sel['temperature'].iloc[0])
-            else:
-                T0 = 22.0
-            sim = RoomSimulator(T0=T0)
-            crossed = None
-            sim_time = 0
-            for i, row in sel.iterrows():
-                p = float(row.get('requested_power', 0) or 0)
-                if i < len(sel) - 1:
-                    next_ts = int(sel.loc[i+1, 'ts'])
-                    gap = max(1, next_ts - int(row['ts']))
-                else:
-                    gap = int(sim.dt)
-                remaining = gap
-                while remaining > 0:
-                    sim.step(P_heater=p)
-                    sim_time += sim.dt
-                    remaining -= sim.dt
-                    if sim.T < T_min or sim.T > T_max:
-                        crossed = sim_time
-                        break
-                if crossed is not None:
-                    break
-            normal_times.append(crossed)
+        # replay every session on an uncontrolled room in one vectorised pass
+        crossing = normal_crossing_times(df, pd.DataFrame(sessions), id_field, T_min=T_min, T_max=T_max)
+        normal_times = [None if pd.isna(t) else float(t) for t in crossing]
 
         # aggregate comparison plots
         adaptive = [s['duration_s'] for s in sessions]
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""Offline replay of an event log through RoomSimulator + SCC.
+
+Every heater 'event' row is re-run through the current SCC configuration and
+the room model, and the recomputed applied_power / override / temperature
+are compared with the recorded ones. The log is streamed in chunks
+(`eventlog.reader.iter_events`), so CSV, SQLite and Parquet stores of any
+size work. engagement_start/end and 'throttled' rows did not reach the plant
+and are only counted.
+
+Rows for /zone/<id>/... paths replay against their own zone; the rest against
+the main room. A row reaches the log when its request finishes (after the
+engagement bookkeeping and the ML score wait), so concurrent clients' rows
+can be out of plant order. Each chunk is therefore put back in the order the
+plant applied the commands, by (ts, plant_seq), both taken under the plant
+lock. Logs written before plant_seq existed keep their file order, and may
+show spurious mismatches where concurrent requests were logged out of order.
+A reordered pair that straddles a chunk boundary is not repaired either.
+Two modes:
+
+  anchored    (default) each command is filtered against the temperature
+              recorded for the previous command on the same plant. Every row
+              is independent, so a chunk is one `filter_batch` call plus one
+              vectorised step.
+  sequential  a free-running simulator per plant, stepped row by row like
+              PlantState.apply. Slower, but shows how far the recorded log
+              drifts from a single uninterrupted run (server restarts, edits
+              to the SCC config between runs, ...).
+
+Usage:
+  python scripts/replay_events.py --events logs/events.csv
+  python scripts/replay_events.py --events logs/events.db --mode sequential --out replay_diff.csv
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from eventlog.reader import iter_events
+from simulator.room import RoomSimulator
+from simulator.room_array import RoomArraySimulator
+from scc.safety_filter import load_config
+from scc.interval import make_filter
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+DEFAULT_EVENTS = os.path.join(ROOT, 'logs', 'events.csv')
+DEFAULT_CONFIG = os.path.join(ROOT, 'scc', 'config.yaml')
+COLUMNS = ['ts', 'requested_power', 'applied_power', 'temperature', 'override',
+           'client_ip', 'request_path', 'event_type', 'count', 'plant_seq']
+
+
+def plant_ids(paths):
+    """Zone number for /zone/<id>/ request paths, -1 (main room) otherwise."""
+    # a log has a handful of distinct paths: parse those, not every row
+    codes, uniques = pd.factorize(paths, use_na_sentinel=False)
+    zone = pd.Series(uniques, dtype=object).astype(str).str.extract(r'^/zone/(\d+)/', expand=False)
+    return pd.to_numeric(zone).fillna(-1).astype(np.int64).to_numpy()[codes]
+
+
+def plant_order(events):
+    """events sorted into plant order: by ts, then plant_seq; file order where plant_seq is missing."""
+    if 'plant_seq' not in events.columns:
+        return events
+    seq = pd.to_numeric(events['plant_seq'], errors='coerce').fillna(-1).to_numpy()
+    ts = events['ts'].to_numpy()
+    # plant_seq counts per plant, so it only orders rows of the same plant; that is all the replay needs
+    order = np.lexsort((np.arange(len(events)), seq, ts))
+    return events.iloc[order]
+
+
+def replay_anchored(events, plants, sfilter, model, last_T):
+    """Vectorised replay of one chunk; last_T maps plant id -> recorded temperature carried across chunks."""
+    recorded = events['temperature'].to_numpy(dtype=np.float64)
+    s = pd.Series(recorded)
+    T = s.groupby(plants).shift(1).to_numpy(copy=True)
+    # the first row of each plant in this chunk continues from the previous chunk (or a fresh room)
+    first = ~pd.Series(plants).duplicated().to_numpy()
+    T[first] = [last_T.get(p, model.T) for p in plants[first]]
+    P = events['requested_power'].to_numpy(dtype=np.float64)
+    applied, override, _ = sfilter.filter_batch(T, P, model)
+    rooms = RoomArraySimulator(len(T), T0=T, T_out=model.T_out, R=model.R, C=model.C, eta=model.eta, dt=model.dt)
+    temperature = rooms.predict(applied)
+    last = ~pd.Series(plants).duplicated(keep='last').to_numpy()
+    last_T.update(zip(plants[last].tolist(), recorded[last].tolist()))
+    return applied, override, temperature
+
+
+def replay_sequential(events, plants, sfilter, model, rooms):
+    """Row-by-row replay; rooms maps plant id -> RoomSimulator and persists across chunks."""
+    n = len(events)
+    applied = np.empty(n)
+    override = np.empty(n, dtype=bool)
+    temperature = np.empty(n)
+    P = events['requested_power'].to_numpy(dtype=np.float64).tolist()
+    for i, (p, power) in enumerate(zip(plants.tolist(), P)):
+        sim = rooms.get(p)
+        if sim is None:
+            sim = rooms[p] = RoomSimulator(T0=model.T, T_out=model.T_out, R=model.R, C=model.C, eta=model.eta, dt=model.dt)
+        a, o = sfilter.filter(sim.T, power, sim.predict)
+        applied[i] = a
+        override[i] = o
+        temperature[i] = sim.step(P_heater=a)
+    return applied, override, temperature
+
+
+class DiffReport:
+    def __init__(self, tol=1e-9, keep=20):
+        self.tol = tol
+        self.keep = keep
+        self.rows = {'event': 0}
+        self.requests_throttled = 0
+        self.mismatch = {'applied_power': 0, 'override': 0, 'temperature': 0, 'any': 0}
+        self.max_abs = {'applied_power': 0.0, 'temperature': 0.0}
+        self.sum_abs = {'applied_power': 0.0, 'temperature': 0.0}
+        self.examples = []
+
+    def count_other(self, chunk):
+        for kind, n in chunk['event_type'].fillna('event').value_counts().items():
+            if kind != 'event':
+                self.rows[kind] = self.rows.get(kind, 0) + int(n)
+        if 'count' in chunk.columns:
+            self.requests_throttled += int(chunk.loc[chunk['event_type'] == 'throttled', 'count'].fillna(1).sum())
+
+    def add(self, events, applied, override, temperature):
+        """Compare one chunk; returns the mismatching rows with recorded and replayed values."""
+        self.rows['event'] += len(events)
+        rec_applied = events['applied_power'].to_numpy(dtype=np.float64)
+        rec_temp = events['temperature'].to_numpy(dtype=np.float64)
+        rec_override = events['override'].eq(True).to_numpy()
+        d_applied = np.abs(applied - rec_applied)
+        d_temp = np.abs(temperature - rec_temp)
+        # NaN in the recording (or the replay) counts as a mismatch
+        bad_applied = ~(d_applied <= self.tol)
+        bad_temp = ~(d_temp <= self.tol)
+        bad_override = override != rec_override
+        bad = bad_applied | bad_temp | bad_override
+        for name, mask in (('applied_power', bad_applied), ('temperature', bad_temp), ('override', bad_override), ('any', bad)):
+            self.mismatch[name] += int(mask.sum())
+        for name, d in (('applied_power', d_applied), ('temperature', d_temp)):
+            d = d[~np.isnan(d)]
+            if d.size:
+                self.max_abs[name] = max(self.max_abs[name], float(d.max()))
+                self.sum_abs[name] += float(d.sum())
+        diff = events.loc[bad, ['ts', 'client_ip', 'request_path', 'requested_power', 'applied_power', 'override', 'temperature']]
+        diff = diff.assign(replay_applied_power=applied[bad], replay_override=override[bad], replay_temperature=temperature[bad])
+        if len(self.examples) < self.keep:
+            self.examples.extend(diff.head(self.keep - len(self.examples)).to_dict('records'))
+        return diff
+
+    def print(self, elapsed, replay_time):
+        n = self.rows['event']
+        print('rows:', ', '.join(f"{k}={v}" for k, v in self.rows.items()))
+        if self.requests_throttled:
+            print(f"requests rejected by admission control (not replayed): {self.requests_throttled}")
+        for name, m in self.mismatch.items():
+            print(f"  {name:>14} mismatches: {m} ({m / n:.4%})" if n else f"  {name:>14} mismatches: 0")
+        for name in ('applied_power', 'temperature'):
+            mean = self.sum_abs[name] / n if n else 0.0
+            print(f"  {name:>14} |diff|: mean={mean:.6g} max={self.max_abs[name]:.6g}")
+        if n:
+            print(f"{n / elapsed:,.0f} events/s end to end, {n / max(replay_time, 1e-12):,.0f} events/s replay only")
+        for row in self.examples:
+            print('  ', row)
+
+
+def main():
+    p = argparse.ArgumentParser(description='Replay an event log through the simulator and SCC and diff it against the recording')
+    p.add_argument('--events', default=DEFAULT_EVENTS, help='CSV/SQLite/Parquet event store')
+    p.add_argument('--config', default=DEFAULT_CONFIG, help='SCC config to replay with')
+    p.add_argument('--mode', choices=['anchored', 'sequential'], default='anchored')
+    p.add_argument('--chunk-size', type=int, default=500000)
+    p.add_argument('--tol', type=float, default=1e-9, help='Absolute tolerance for applied_power/temperature')
+    p.add_argument('--show', type=int, default=10, help='Mismatching rows to print')
+    p.add_argument('--out', default=None, help='Write all mismatching rows to this CSV')
+    args = p.parse_args()
+
+    model = RoomSimulator()
+    sfilter = make_filter(load_config(args.config), model)
+    report = DiffReport(tol=args.tol, keep=args.show)
+    state = {}
+    header = True
+    replay_time = 0.0
+    t_start = time.perf_counter()
+    for chunk in iter_events(args.events, columns=COLUMNS, chunksize=args.chunk_size):
+        if 'event_type' not in chunk.columns:
+            chunk = chunk.assign(event_type='event')
+        report.count_other(chunk)
+        events = plant_order(chunk[chunk['event_type'].fillna('event') == 'event'])
+        if events.empty:
+            continue
+        t0 = time.perf_counter()
+        plants = plant_ids(events['request_path']) if 'request_path' in events.columns else np.full(len(events), -1)
+        if args.mode == 'anchored':
+            out = replay_anchored(events, plants, sfilter, model, state)
+        else:
+            out = replay_sequential(events, plants, sfilter, model, state)
+        replay_time += time.perf_counter() - t0
+        diff = report.add(events, *out)
+        if args.out and len(diff):
+            diff.to_csv(args.out, mode='w' if header else 'a', header=header, index=False)
+            header = False
+    report.print(time.perf_counter() - t_start, replay_time)
+    if args.out:
+        print('mismatches written to', args.out if not header else f"{args.out} (none)")
+
+
+if __name__ == '__main__':
+    main()
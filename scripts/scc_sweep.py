@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""What-if sweep of SCC settings over recorded attacker sessions.
+
+Sessions are cut from the events log with the engagement_analysis rule:
+per client, a new session starts when the gap exceeds --gap. Each session's
+requested powers are decoded once into a padded array. The session starts
+from the temperature recorded just before its first command on the same
+plant (the main room or one /zone/<id>, in plant order as in
+replay_events.py). It is then
+replayed under every configuration of the grid (T_min x T_max x
+smoothing_alpha x mode), one SCC call and one room step per command
+(simulator/batch.py). Configurations run in parallel on a process pool.
+
+Results are cached per (session hash, config), where the session hash
+covers the start temperature and the power schedule. Identical sessions are
+simulated once, and re-running after the log grew only simulates the new
+sessions.
+
+Per config it reports:
+  override_rate     overrides / commands
+  max_excursion     largest distance (deg C) outside the config's own bounds
+  violation_rate    commands leaving the room outside the bounds
+  engagement_ratio  estimated mean session length relative to the current
+                    scc/config.yaml. Per-command leave probabilities after an
+                    override and after a normal answer are estimated from the
+                    log; the same schedules are assumed (an estimate, not a
+                    counterfactual)
+
+Usage:
+  python scripts/scc_sweep.py --events logs/events.csv
+  python scripts/scc_sweep.py --T-min 17 18 19 --T-max 25 26 27 --alpha 0.5 1 2 --mode smoothed interval
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from eventlog.reader import load_events
+from simulator.room import RoomSimulator
+from simulator.batch import pad_schedules, run_schedules
+from scc.safety_filter import load_config
+from scc.interval import make_filter
+from scripts.replay_events import plant_order
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+LOG_PATH = os.path.join(ROOT, 'logs', 'events.csv')
+CONFIG_PATH = os.path.join(ROOT, 'scc', 'config.yaml')
+CACHE_PATH = os.path.join(ROOT, 'logs', 'scc_sweep_cache.pkl')
+OUT_PATH = os.path.join(ROOT, 'logs', 'scc_sweep_results.csv')
+
+
+def load_sessions(path, role='attacker', gap=120, T_default=22.0):
+    """Decode attacker sessions: list of (hash, T0, powers) plus the recorded override flags."""
+    df = load_events(path, columns=['ts', 'role', 'client_ip', 'requested_power', 'temperature', 'override',
+                                    'event_type', 'request_path', 'plant_seq'])
+    if 'event_type' in df.columns:
+        df = df[df['event_type'] == 'event']
+    df = plant_order(df)
+    # temperature the command's own plant (main room or /zone/<id>, one request_path each) was at when it arrived
+    plant = df['request_path'].fillna('') if 'request_path' in df.columns else pd.Series('', index=df.index)
+    df = df.assign(T_before=df['temperature'].astype(float).groupby(plant).shift(1).fillna(T_default))
+    if role and 'role' in df.columns:
+        df = df[df['role'] == role]
+    id_field = 'client_ip' if 'client_ip' in df.columns else 'role'
+    df = df.sort_values([id_field, 'ts'], kind='stable')
+    new = (df[id_field] != df[id_field].shift(1)) | (df['ts'].diff() > gap)
+    sid = new.cumsum().to_numpy()
+    powers = df['requested_power'].astype(float).fillna(0.0).to_numpy()
+    T_before = df['T_before'].to_numpy(dtype=np.float64)
+    recorded_override = df['override'].eq(True).to_numpy()
+    starts = np.flatnonzero(np.r_[True, sid[1:] != sid[:-1]]) if len(sid) else np.zeros(0, dtype=np.int64)
+    bounds = np.r_[starts, len(sid)]
+    sessions = []
+    recorded = []
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        p = powers[a:b]
+        T0 = float(T_before[a])
+        h = hashlib.blake2b(np.float64(T0).tobytes() + p.tobytes(), digest_size=16).hexdigest()
+        sessions.append((h, T0, p))
+        recorded.append(recorded_override[a:b])
+    return sessions, recorded
+
+
+def leave_hazards(recorded):
+    """P(session ends after a command) for overridden and normal commands, from the recorded sessions."""
+    counts = np.zeros((2, 2))  # [override][last]
+    for flags in recorded:
+        if len(flags):
+            last = np.zeros(len(flags), dtype=bool)
+            last[-1] = True
+            np.add.at(counts, (flags.astype(int), last.astype(int)), 1)
+    total = counts.sum(axis=1)
+    h = np.where(total > 0, counts[:, 1] / np.maximum(total, 1), 0.0)
+    return float(h[0]), float(h[1])
+
+
+def expected_length(override_steps, lengths, hazards):
+    """Expected commands per session if each command ends it with the hazard of its answer."""
+    h_normal, h_override = hazards
+    m = override_steps.shape[1]
+    live = np.arange(m)[None, :] < lengths[:, None]
+    stay = np.where(override_steps, 1.0 - h_override, 1.0 - h_normal)
+    # survival before each command: product of the stays of the earlier ones
+    surv = np.cumprod(np.where(live, stay, 1.0), axis=1)
+    surv = np.concatenate([np.ones((len(lengths), 1)), surv[:, :-1]], axis=1)
+    return (surv * live).sum(axis=1)
+
+
+def config_key(config, model):
+    return json.dumps({'scc': config, 'model': [model.T_out, model.R, model.C, model.eta, model.dt]},
+                      sort_keys=True)
+
+
+_shared = {}
+
+
+def _init_worker(T0, powers, lengths):
+    _shared['T0'] = T0
+    _shared['powers'] = powers
+    _shared['lengths'] = lengths
+
+
+def evaluate(task):
+    """Replay the sessions `rows` under one config (runs in a worker). Returns per-session results."""
+    config, model_params, rows = task
+    model = RoomSimulator(**model_params)
+    sfilter = make_filter(config, model)
+    powers = _shared['powers'][rows]
+    T_min, T_max = float(config.get('T_min', 18.0)), float(config.get('T_max', 26.0))
+    res = run_schedules(powers, _shared['T0'][rows], sfilter, model, T_min, T_max, record_overrides=True)
+    out = []
+    for i, r in enumerate(rows):
+        n = int(_shared['lengths'][r])
+        out.append((int(res['steps'][i]), int(res['overrides'][i]), int(res['violations'][i]),
+                    float(res['max_excursion'][i]), np.packbits(res['override_steps'][i, :n])))
+    return out
+
+
+def main():
+    p = argparse.ArgumentParser(description='Sweep SCC settings over recorded attacker sessions')
+    p.add_argument('--events', default=LOG_PATH)
+    p.add_argument('--config', default=CONFIG_PATH, help='Baseline config (the other keys of every grid point)')
+    p.add_argument('--role', default='attacker', help="Role whose sessions are replayed ('' for all)")
+    p.add_argument('--gap', type=int, default=120, help='Session gap threshold (s)')
+    p.add_argument('--T-min', type=float, nargs='*', default=[17.0, 18.0, 19.0])
+    p.add_argument('--T-max', type=float, nargs='*', default=[25.0, 26.0, 27.0])
+    p.add_argument('--alpha', type=float, nargs='*', default=[0.5, 1.0, 2.0], help='smoothing_alpha values')
+    p.add_argument('--mode', nargs='*', default=['smoothed', 'interval'], choices=['smoothed', 'interval'])
+    p.add_argument('--workers', type=int, default=os.cpu_count())
+    p.add_argument('--cache', default=CACHE_PATH, help="Result cache file ('' disables)")
+    p.add_argument('--out', default=OUT_PATH)
+    args = p.parse_args()
+
+    t_start = time.perf_counter()
+    for path in (args.out, args.cache):
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    base = load_config(args.config)
+    model = RoomSimulator()
+    model_params = dict(T_out=model.T_out, R=model.R, C=model.C, eta=model.eta, dt=model.dt)
+    sessions, recorded = load_sessions(args.events, role=args.role, gap=args.gap, T_default=model.T)
+    if not sessions:
+        print('no sessions to replay')
+        return
+    hazards = leave_hazards(recorded)
+
+    # each distinct session is decoded and simulated once
+    unique = {}
+    for h, T0, powers in sessions:
+        unique.setdefault(h, (T0, powers))
+    hashes = list(unique)
+    T0 = np.array([unique[h][0] for h in hashes])
+    powers, lengths = pad_schedules([unique[h][1] for h in hashes])
+    index = {h: i for i, h in enumerate(hashes)}
+    session_rows = np.array([index[h] for h, _, _ in sessions])
+
+    configs = []
+    for mode, lo, hi in itertools.product(args.mode, args.T_min, args.T_max):
+        # interval mode has no smoothing: one grid point per (T_min, T_max)
+        alphas = args.alpha if mode == 'smoothed' else [base.get('smoothing_alpha', 1.0)]
+        configs.extend(dict(base, mode=mode, T_min=lo, T_max=hi, smoothing_alpha=a) for a in alphas if lo < hi)
+    baseline = dict(base, mode=base.get('mode', 'smoothed'))
+    if config_key(baseline, model) not in {config_key(c, model) for c in configs}:
+        configs.append(baseline)
+
+    cache = {}
+    if args.cache and os.path.exists(args.cache):
+        with open(args.cache, 'rb') as f:
+            cache = pickle.load(f)
+    keys = [config_key(c, model) for c in configs]
+    tasks = []
+    for c, k in zip(configs, keys):
+        rows = [i for i, h in enumerate(hashes) if (h, k) not in cache]
+        if rows:
+            tasks.append((c, model_params, np.array(rows)))
+    simulated = sum(len(t[2]) for t in tasks)
+    if tasks:
+        if args.workers and args.workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                     initargs=(T0, powers, lengths)) as pool:
+                parts = list(pool.map(evaluate, tasks))
+        else:
+            _init_worker(T0, powers, lengths)
+            parts = [evaluate(t) for t in tasks]
+        for (c, _, rows), part in zip(tasks, parts):
+            k = config_key(c, model)
+            for r, res in zip(rows, part):
+                cache[(hashes[r], k)] = res
+        if args.cache:
+            with open(args.cache + '.tmp', 'wb') as f:
+                pickle.dump(cache, f)
+            os.replace(args.cache + '.tmp', args.cache)
+
+    results = []
+    n_sessions = len(sessions)
+    for c, k in zip(configs, keys):
+        per = [cache[(h, k)] for h in hashes]
+        steps = np.array([r[0] for r in per])[session_rows]
+        overrides = np.array([r[1] for r in per])[session_rows]
+        violations = np.array([r[2] for r in per])[session_rows]
+        excursion = np.array([r[3] for r in per])[session_rows]
+        override_steps = np.zeros(powers.shape, dtype=bool)
+        for i, r in enumerate(per):
+            override_steps[i, :lengths[i]] = np.unpackbits(r[4], count=int(lengths[i])).astype(bool)
+        exp_len = expected_length(override_steps, lengths, hazards)[session_rows]
+        results.append({'mode': c['mode'], 'T_min': c['T_min'], 'T_max': c['T_max'],
+                        'smoothing_alpha': c.get('smoothing_alpha', 1.0),
+                        'override_rate': overrides.sum() / max(1, steps.sum()),
+                        'violation_rate': violations.sum() / max(1, steps.sum()),
+                        'max_excursion': float(excursion.max()),
+                        'mean_expected_length': float(exp_len.mean()),
+                        'baseline': k == config_key(baseline, model)})
+    df = pd.DataFrame(results)
+    df['engagement_ratio'] = df['mean_expected_length'] / float(df.loc[df['baseline'], 'mean_expected_length'].iloc[0])
+    df = df.sort_values(['max_excursion', 'engagement_ratio'], ascending=[True, False])
+    df.to_csv(args.out, index=False)
+
+    print(f"{n_sessions} sessions ({len(hashes)} distinct, {int(lengths.sum())} commands), {len(configs)} configs; "
+          f"simulated {simulated} session-configs, {len(configs) * len(hashes) - simulated} from cache "
+          f"in {time.perf_counter() - t_start:.2f}s")
+    print(f"leave probability per command: {hazards[0]:.3f} after a normal answer, {hazards[1]:.3f} after an override")
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(df.drop(columns=['mean_expected_length']).round(4).to_string(index=False))
+    print('results written to', args.out)
+
+
+if __name__ == '__main__':
+    main()
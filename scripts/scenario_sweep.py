@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Monte Carlo sweep of attack scenarios against the simulator and SCC, in process.
+
+Every scenario in attacker/scenarios.py is sampled `--variants` times with
+seeded random parameters. Each variant's schedule is replayed the way the
+frontend serves it: one SCC filter call and one simulator step per request.
+The same schedule is also replayed on an unprotected room for comparison.
+Variants of a scenario are padded into (variants, requests) arrays and
+stepped together (simulator/batch.py). Chunks of variants run on a process
+pool. Seeds are derived per chunk from --seed, so the results do not depend
+on --workers.
+
+Per variant it records requests, overrides, safety violations (steps ending
+outside [T_min, T_max]) and time-to-bound (seconds from the attack start to
+the first violation) with and without the SCC. It then prints the
+distribution per scenario.
+
+Usage:
+  python scripts/scenario_sweep.py --variants 2000 --workers 8
+  python scripts/scenario_sweep.py --scenarios flood burst --R 4 --C 5 --admission 5 20 --out sweep.csv
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from attacker.scenarios import SCENARIOS, sample
+from simulator.room import RoomSimulator
+from simulator.batch import pad_schedules, run_schedules
+from scc.safety_filter import load_config
+from scc.interval import make_filter
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'scc', 'config.yaml')
+
+
+def admitted(times, rate, burst):
+    """Token-bucket admission (as frontend/admission.py) for each variant's single client."""
+    ok = np.zeros(times.shape, dtype=bool)
+    tokens = np.full(times.shape[0], float(burst))
+    last = np.full(times.shape[0], np.nan)
+    for j in range(times.shape[1]):
+        t = times[:, j]
+        live = ~np.isnan(t)
+        refill = np.where(np.isnan(last), 0.0, (t - last) * rate)
+        tokens = np.where(live, np.minimum(float(burst), tokens + refill), tokens)
+        last = np.where(live, t, last)
+        ok[:, j] = live & (tokens >= 1.0)
+        tokens = np.where(ok[:, j], tokens - 1.0, tokens)
+    return ok
+
+
+def run_chunk(task):
+    """Sample and simulate one chunk of variants of one scenario (runs in a worker process)."""
+    name, first, count, seed, config, model_params, T0, admission = task
+    rng = np.random.default_rng(seed)
+    schedules = []
+    params = []
+    for _ in range(count):
+        t, p, kw = sample(name, rng)
+        schedules.append((t, p))
+        params.append(kw)
+    times, lengths = pad_schedules([t for t, _ in schedules])
+    powers, _ = pad_schedules([p for _, p in schedules])
+    model = RoomSimulator(T0=T0, **model_params)
+    sfilter = make_filter(config, model)
+    T_min, T_max = float(config.get('T_min', 18.0)), float(config.get('T_max', 26.0))
+    reaches = admitted(times, *admission) if admission else None
+    scc = run_schedules(powers, T0, sfilter, model, T_min, T_max, live=reaches)
+    raw = run_schedules(powers, T0, None, model, T_min, T_max, live=reaches)
+    df = pd.DataFrame({'scenario': name, 'variant': np.arange(first, first + count), 'requests': lengths,
+                       'duration': np.nanmax(times, axis=1, initial=0.0)})
+    for k in ('steps', 'overrides', 'violations'):
+        df[k] = scc[k]
+    df['time_to_bound'] = _time_at(times, scc['first_violation'])
+    df['T_min_seen'] = scc['T_lo']
+    df['T_max_seen'] = scc['T_hi']
+    df['violations_no_scc'] = raw['violations']
+    df['time_to_bound_no_scc'] = _time_at(times, raw['first_violation'])
+    df['params'] = [repr(kw) for kw in params]
+    return df
+
+
+def _time_at(times, col):
+    # request time of column `col` per row (NaN where col is -1)
+    t = times[np.arange(len(col)), np.maximum(col, 0)] if times.size else np.full(len(col), np.nan)
+    return np.where(col >= 0, t, np.nan)
+
+
+def summarize(df):
+    g = df.groupby('scenario', sort=False)
+    out = pd.DataFrame({
+        'variants': g.size(),
+        'requests_mean': g['requests'].mean(),
+        'steps_mean': g['steps'].mean(),
+        'override_rate': g['overrides'].sum() / g['steps'].sum().clip(lower=1),
+        'p_violation': g['violations'].apply(lambda v: (v > 0).mean()),
+        'violations_mean': g['violations'].mean(),
+        'violations_p95': g['violations'].quantile(0.95),
+        'p_violation_no_scc': g['violations_no_scc'].apply(lambda v: (v > 0).mean()),
+        'ttb_p50': g['time_to_bound'].median(),
+        'ttb_p05': g['time_to_bound'].quantile(0.05),
+        'ttb_p50_no_scc': g['time_to_bound_no_scc'].median(),
+        'T_min_seen': g['T_min_seen'].min(),
+        'T_max_seen': g['T_max_seen'].max(),
+    })
+    return out
+
+
+def main():
+    p = argparse.ArgumentParser(description='Parallel Monte Carlo sweep of attack scenarios against the simulator and SCC')
+    p.add_argument('--scenarios', nargs='*', default=list(SCENARIOS), choices=list(SCENARIOS))
+    p.add_argument('--variants', type=int, default=1000, help='Variants per scenario')
+    p.add_argument('--chunk', type=int, default=250, help='Variants per worker task')
+    p.add_argument('--workers', type=int, default=os.cpu_count())
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--config', default=CONFIG_PATH)
+    p.add_argument('--T0', type=float, default=22.0)
+    p.add_argument('--T-out', type=float, default=10.0)
+    p.add_argument('--R', type=float, default=1.0)
+    p.add_argument('--C', type=float, default=1.0)
+    p.add_argument('--eta', type=float, default=0.9)
+    p.add_argument('--dt', type=float, default=60.0)
+    p.add_argument('--admission', type=float, nargs=2, metavar=('RATE', 'BURST'), default=None,
+                   help='Apply the frontend token bucket before the plant (e.g. 5 20)')
+    p.add_argument('--out', default=None, help='Write per-variant results to this CSV')
+    args = p.parse_args()
+
+    config = load_config(args.config)
+    model_params = dict(T_out=args.T_out, R=args.R, C=args.C, eta=args.eta, dt=args.dt)
+    tasks = []
+    seeds = np.random.SeedSequence(args.seed).spawn(len(args.scenarios))
+    for name, ss in zip(args.scenarios, seeds):
+        starts = range(0, args.variants, args.chunk)
+        for first, child in zip(starts, ss.spawn(len(starts))):
+            tasks.append((name, first, min(args.chunk, args.variants - first), child, config, model_params,
+                          args.T0, tuple(args.admission) if args.admission else None))
+
+    t0 = time.perf_counter()
+    if args.workers and args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            parts = list(pool.map(run_chunk, tasks))
+    else:
+        parts = [run_chunk(t) for t in tasks]
+    df = pd.concat(parts, ignore_index=True)
+    elapsed = time.perf_counter() - t0
+
+    print(f"{len(df)} variants, {int(df['steps'].sum())} plant steps in {elapsed:.2f}s "
+          f"(SCC mode: {config.get('mode', 'smoothed')}, T bounds {config.get('T_min')}..{config.get('T_max')})")
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(summarize(df).round(4).to_string())
+    if args.out:
+        df.to_csv(args.out, index=False)
+        print('per-variant results written to', args.out)
+
+
+if __name__ == '__main__':
+    main()
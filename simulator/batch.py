@@ -0,0 +1,75 @@
+"""Step many heater-command schedules through the SCC and room model in lockstep.
+
+A schedule is the sequence of requested powers one client sent; the live
+frontend answers each with one SCC filter call and one RoomSimulator step.
+`run_schedules` does the same for a padded (n_schedules, max_len) array,
+column by column, so each step is a `filter_batch` call across every
+schedule. NaN entries (padding, malformed requests, requests refused before
+the plant) leave that schedule's room untouched.
+"""
+import numpy as np
+
+
+def pad_schedules(schedules, fill=np.nan):
+    """(values, lengths) from a list of 1-d arrays, padded with `fill` to the longest."""
+    lengths = np.array([len(s) for s in schedules], dtype=np.int64)
+    m = int(lengths.max()) if len(lengths) else 0
+    values = np.full((len(schedules), m), fill, dtype=np.float64)
+    if len(lengths):
+        row = np.repeat(np.arange(len(schedules)), lengths)
+        col = np.arange(int(lengths.sum())) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        values[row, col] = np.concatenate([np.asarray(s, dtype=np.float64) for s in schedules])
+    return values, lengths
+
+
+def run_schedules(powers, T0, sfilter, model, T_min=18.0, T_max=26.0, live=None, record_overrides=False):
+    """Replay every row of `powers` on its own room starting at T0 (scalar or per row).
+
+    sfilter: SafetyFilter/IntervalFilter (anything with filter_batch), or None
+    for an unprotected room. model: RoomSimulator whose parameters are used.
+    live: optional bool mask of requests that reach the plant.
+    Returns a dict of per-row arrays: steps, overrides, violations (steps
+    ending outside [T_min, T_max]), first_violation (column index, -1 if none),
+    T_lo / T_hi (temperature range) and max_excursion (largest distance
+    outside the bounds, 0 if none). With record_overrides the (n, m) override
+    mask is included as 'override_steps'.
+    """
+    powers = np.asarray(powers, dtype=np.float64)
+    n, m = powers.shape
+    T = np.broadcast_to(np.asarray(T0, dtype=np.float64), (n,)).copy()
+    overrides = np.zeros(n, dtype=np.int64)
+    violations = np.zeros(n, dtype=np.int64)
+    steps = np.zeros(n, dtype=np.int64)
+    first = np.full(n, -1, dtype=np.int64)
+    T_lo = T.copy()
+    T_hi = T.copy()
+    override_steps = np.zeros((n, m), dtype=bool) if record_overrides else None
+    C, T_out, R, eta, dt = (float(model.C), float(model.T_out), float(model.R), float(model.eta), float(model.dt))
+    for j in range(m):
+        P = powers[:, j]
+        ok = ~np.isnan(P) if live is None else live[:, j] & ~np.isnan(P)
+        if not ok.any():
+            continue
+        if sfilter is None:
+            applied, override = P, np.zeros(n, dtype=bool)
+        else:
+            applied, override, _ = sfilter.filter_batch(T, P, model)
+        # RoomSimulator.step with the applied power
+        newT = T + (1.0/C) * (-(T - T_out)/R + eta * applied) * (dt / 60.0)
+        T = np.where(ok, newT, T)
+        out = ok & ((T < T_min) | (T > T_max))
+        first = np.where(out & (first < 0), j, first)
+        override = ok & override
+        if record_overrides:
+            override_steps[:, j] = override
+        overrides += override
+        violations += out
+        steps += ok
+        T_lo = np.minimum(T_lo, np.where(ok, T, np.inf))
+        T_hi = np.maximum(T_hi, np.where(ok, T, -np.inf))
+    result = {'steps': steps, 'overrides': overrides, 'violations': violations, 'first_violation': first,
+              'T_lo': T_lo, 'T_hi': T_hi,
+              'max_excursion': np.maximum(np.maximum(T_min - T_lo, T_hi - T_max), 0.0)}
+    if record_overrides:
+        result['override_steps'] = override_steps
+    return result
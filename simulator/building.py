@@ -0,0 +1,116 @@
+"""Building-scale RC network: many zones exchanging heat with the outside and with each other.
+
+Each zone follows the RoomSimulator model plus conduction to its neighbours:
+
+    dT_i/dt = (1/C_i) * ( -(T_i - T_out_i)/R_i + sum_j G_ij (T_j - T_i) + eta_i*P_i + d_i )
+
+where G is a sparse, symmetric conductance matrix (1/R between zones i and j).
+With the same explicit Euler step as RoomSimulator, k_i = (dt/60)/C_i, one tick is
+
+    T <- A @ T + k*(T_out/R + d) + k*eta*P,     A = I + diag(k) @ (G - diag(G.sum(1)) - diag(1/R))
+
+A is assembled once as CSR, so a tick is a single sparse mat-vec plus a few
+vector operations. Without coupling every zone reduces to RoomSimulator (to
+float rounding).
+
+The next temperature is affine in each zone's own power, base + gain*P, so
+SCC hooks see the exact coupled prediction. `add_scc(zones, hook)` attaches
+`hook(P, base, gain) -> (applied, override)` to a subset of zones.
+`smoothed_hook(SafetyFilter)` and `interval_hook(T_min, T_max)` mirror the
+two SCC modes.
+"""
+import numpy as np
+import scipy.sparse as sp
+
+
+class BuildingSimulator:
+    def __init__(self, n, conductance=None, T0=22.0, T_out=10.0, R=1.0, C=1.0, eta=0.9, dt=60):
+        # conductance: (n, n) sparse/dense symmetric matrix of inter-zone conductances (diagonal ignored)
+        self.n = int(n)
+        vec = lambda v: np.broadcast_to(np.asarray(v, dtype=np.float64), (self.n,)).copy()
+        self.T = vec(T0)
+        self.T_out = vec(T_out)
+        self.R = vec(R)
+        self.C = vec(C)
+        self.eta = vec(eta)
+        self.dt = float(dt)
+        G = sp.csr_matrix((self.n, self.n)) if conductance is None else sp.csr_matrix(conductance, dtype=np.float64)
+        G = G - sp.diags(G.diagonal())
+        self.G = G.tocsr()
+        self._hooks = []  # (zone index array, hook)
+        self.override = np.zeros(self.n, dtype=bool)
+        self.applied = np.zeros(self.n)
+        self._assemble()
+
+    @classmethod
+    def grid(cls, nx, ny=1, nz=1, g=0.2, **params):
+        """Zones on an nx*ny*nz grid, each coupled to its face neighbours with conductance g."""
+        idx = np.arange(nx * ny * nz).reshape(nz, ny, nx)
+        pairs = [np.stack([a.ravel(), b.ravel()]) for a, b in (
+            (idx[:, :, :-1], idx[:, :, 1:]), (idx[:, :-1, :], idx[:, 1:, :]), (idx[:-1], idx[1:]))]
+        i, j = np.concatenate(pairs, axis=1)
+        n = idx.size
+        G = sp.coo_matrix((np.full(i.size, float(g)), (i, j)), shape=(n, n))
+        return cls(n, G + G.T, **params)
+
+    def _assemble(self):
+        self.k = (self.dt / 60.0) / self.C
+        L = self.G - sp.diags(np.asarray(self.G.sum(axis=1)).ravel() + 1.0 / self.R)
+        self.A = (sp.identity(self.n, format='csr') + sp.diags(self.k) @ L).tocsr()
+        self.gain = self.k * self.eta
+        self._drive = self.k * (self.T_out / self.R)
+
+    def set_params(self, **params):
+        """Change T_out/R/C/eta/dt (scalars or per-zone arrays) and rebuild the step matrix."""
+        for name, value in params.items():
+            if name == 'dt':
+                self.dt = float(value)
+            else:
+                getattr(self, name)[:] = value
+        self._assemble()
+
+    def add_scc(self, zones, hook):
+        """Filter the power of `zones` (indices or boolean mask) through `hook` on every step."""
+        zones = np.asarray(zones)
+        if zones.dtype == bool:
+            zones = np.flatnonzero(zones)
+        self._hooks.append((zones.astype(np.intp), hook))
+
+    def base(self, disturbance=0.0):
+        """Next-step temperatures with zero heater power (the coupled part of the prediction)."""
+        return self.A @ self.T + self._drive + self.k * np.asarray(disturbance, dtype=np.float64)
+
+    def predict(self, P_heater=0.0, disturbance=0.0):
+        return self.base(disturbance) + self.gain * np.asarray(P_heater, dtype=np.float64)
+
+    def step(self, P_heater=0.0, disturbance=0.0):
+        """Advance the whole building one dt; returns T. SCC hooks adjust their zones' power first."""
+        P = np.broadcast_to(np.asarray(P_heater, dtype=np.float64), (self.n,))
+        base = self.base(disturbance)
+        if self._hooks:
+            P = P.copy()
+            self.override[:] = False
+            for zones, hook in self._hooks:
+                applied, override = hook(P[zones], base[zones], self.gain[zones])
+                P[zones] = applied
+                self.override[zones] = override
+        self.applied = P
+        self.T = base + self.gain * P
+        return self.T
+
+
+def smoothed_hook(sfilter):
+    """SCC hook with SafetyFilter's preview-and-correct semantics, using the coupled prediction."""
+    def hook(P, base, gain):
+        return sfilter.correct_batch(P, base + gain * P)
+    return hook
+
+
+def interval_hook(T_min, T_max):
+    """SCC hook clamping each zone's power to the interval keeping its next temperature in bounds."""
+    def hook(P, base, gain):
+        lo = np.clip((T_min - base) / gain, 0.0, 1.0)
+        hi = np.clip((T_max - base) / gain, 0.0, 1.0)
+        applied = np.minimum(np.maximum(P, lo), hi)
+        return applied, applied != P
+    return hook
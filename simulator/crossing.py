@@ -0,0 +1,172 @@
+"""Vectorised time-to-safety-bound solver for replaying sessions on an uncontrolled room.
+
+The "normal honeypot" comparison replays each session's requested powers on a
+RoomSimulator with no SCC. It reports how long it takes until the room leaves
+[T_min, T_max]. The reference loop holds the power of event i until event
+i+1, or for one dt after the last event, and steps one dt at a time. It
+checks the bounds after every step, and the crossing time is dt times the
+number of steps taken.
+
+Under constant power, n Euler steps have the closed form
+T_n = T_inf + (T - T_inf) * f**n with f = 1 - (dt/60)/(R*C). For 0 <= f < 1
+the trajectory moves monotonically towards T_inf, so the first step that
+leaves the bounds can be solved with one logarithm per segment. Sessions are
+padded into (n_sessions, max_segments) arrays, and `crossing_times` loops
+over the segment axis only, so each iteration is a NumPy operation across
+all sessions still in play. Parameters with f outside [0, 1) fall back to
+stepping, still vectorised across sessions.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def _first_exit_step(T, T_inf, f, T_min, T_max):
+    """Smallest k >= 1 with T_k outside [T_min, T_max] (inf if none), for 0 <= f < 1."""
+    d = T - T_inf
+    T1 = T_inf + d * f
+    k = np.full(T.shape, np.inf)
+    k[(T1 < T_min) | (T1 > T_max)] = 1.0
+    if f == 0.0:
+        return k  # T_k == T_inf for every k >= 1
+    logf = math.log(f)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for bound, towards in ((T_max, T_inf > T_max), (T_min, T_inf < T_min)):
+            # still inside after step 1 but heading past `bound`: solve f**k < (bound - T_inf) / d
+            m = np.isinf(k) & towards
+            r = (bound - T_inf[m]) / d[m]
+            kk = np.maximum(np.floor(np.log(r) / logf) + 1.0, 1.0)
+            # guard against rounding in the log: step back while k-1 already exits, forward while k does not
+            for _ in range(2):
+                prev = T_inf[m] + d[m] * f ** (kk - 1.0)
+                back = (kk > 1.0) & ((prev < T_min) | (prev > T_max))
+                kk = np.where(back, kk - 1.0, kk)
+                cur = T_inf[m] + d[m] * f ** kk
+                fwd = (cur >= T_min) & (cur <= T_max)
+                kk = np.where(fwd, kk + 1.0, kk)
+            k[m] = kk
+    return k
+
+
+def crossing_times(T0, powers, gaps, lengths, T_min=18.0, T_max=26.0,
+                   T_out=10.0, R=1.0, C=1.0, eta=0.9, dt=60.0):
+    """Seconds until each session's uncontrolled room leaves [T_min, T_max] (NaN if it never does).
+
+    T0: (n,) starting temperatures. powers, gaps: (n, m) per-segment power and
+    duration in seconds, padded past lengths[i]. The model parameters are the
+    RoomSimulator ones.
+    """
+    T = np.array(T0, dtype=np.float64)
+    powers = np.asarray(powers, dtype=np.float64)
+    gaps = np.asarray(gaps, dtype=np.float64)
+    lengths = np.asarray(lengths)
+    n = T.shape[0]
+    out = np.full(n, np.nan)
+    if n == 0:
+        return out
+    # longest sessions first, so the sessions still having segment j are a prefix
+    order = np.argsort(-lengths, kind='stable')
+    T = T[order]
+    powers = powers[order]
+    gaps = gaps[order]
+    lengths = lengths[order]
+    steps_done = np.zeros(n)
+    crossed = np.full(n, np.nan)
+    f = 1.0 - (dt / 60.0) / (R * C)
+    for j in range(int(lengths[0])):
+        live = int(np.count_nonzero(lengths > j))
+        Tj = T[:live]
+        steps = np.ceil(gaps[:live, j] / dt)
+        T_inf = T_out + R * (eta * powers[:live, j])
+        if 0.0 <= f < 1.0:
+            k = _first_exit_step(Tj, T_inf, f, T_min, T_max)
+            T_end = T_inf + (Tj - T_inf) * f ** steps
+        else:
+            k, T_end = _step_segment(Tj, T_inf, f, steps, T_min, T_max)
+        hit = np.isnan(crossed[:live]) & (k <= steps)
+        crossed[:live][hit] = (steps_done[:live][hit] + k[hit]) * dt
+        steps_done[:live] += steps
+        T[:live] = T_end
+    out[order] = crossed
+    return out
+
+
+def _step_segment(T, T_inf, f, steps, T_min, T_max):
+    # oscillating or unstable discretisation: step explicitly, vectorised across sessions
+    k = np.full(T.shape, np.inf)
+    cur = T.copy()
+    for i in range(1, int(steps.max()) + 1 if steps.size else 1):
+        active = steps >= i
+        cur = np.where(active, T_inf + (cur - T_inf) * f, cur)
+        out = active & np.isinf(k) & ((cur < T_min) | (cur > T_max))
+        k[out] = i
+    return k, cur
+
+
+def session_segments(events, sessions, id_field='client_ip', dt=60.0, T_default=22.0):
+    """Padded (T0, powers, gaps, lengths) arrays for `crossing_times`.
+
+    events: DataFrame of 'event' rows with ts, id_field, requested_power and
+    (optionally) temperature. sessions: DataFrame with client, start_ts and
+    end_ts. A session replays its client's events with start_ts <= ts <=
+    end_ts. Each power is held until the next event (at least 1 s), and the
+    last one is held for one dt. T0 is the first event's recorded temperature,
+    or T_default if the session has none.
+    """
+    n = len(sessions)
+    ts = events['ts'].to_numpy(dtype=np.int64)
+    ids = events[id_field].to_numpy(dtype=object)
+    codes, uniques = pd.factorize(ids)  # missing ids get code -1 and match no session
+    order = np.lexsort((ts, codes))
+    ts, codes = ts[order], codes[order]
+    power = events['requested_power'].to_numpy(dtype=np.float64)[order] if 'requested_power' in events else np.zeros(len(ts))
+    temp = events['temperature'].to_numpy(dtype=np.float64)[order] if 'temperature' in events else np.full(len(ts), np.nan)
+
+    # one int64 sort key per event: client code in the high bits, ts offset in the low 32
+    base = int(ts.min()) if len(ts) else 0
+    keys = (codes.astype(np.int64) << 32) | (ts - base)
+    lookup = {u: i for i, u in enumerate(uniques)}
+    s_codes = np.array([lookup.get(c, -1) for c in sessions['client']], dtype=np.int64)
+    start = np.clip(sessions['start_ts'].to_numpy(dtype=np.int64) - base, 0, 2 ** 32 - 1)
+    end = sessions['end_ts'].to_numpy(dtype=np.int64) - base
+    lo = np.searchsorted(keys, (s_codes << 32) | start, side='left')
+    hi = np.searchsorted(keys, (s_codes << 32) | np.clip(end, 0, 2 ** 32 - 1), side='right')
+    lengths = np.where((s_codes >= 0) & (end >= 0), np.maximum(hi - lo, 0), 0)
+
+    m = int(lengths.max()) if n else 0
+    powers = np.zeros((n, m))
+    gaps = np.zeros((n, m))
+    T0 = np.full(n, float(T_default))
+    total = int(lengths.sum())
+    if total:
+        row = np.repeat(np.arange(n), lengths)
+        col = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        pos = np.repeat(lo, lengths) + col
+        powers[row, col] = power[pos]
+        last = col == np.repeat(lengths, lengths) - 1
+        nxt = np.minimum(pos + 1, len(ts) - 1)
+        gaps[row, col] = np.where(last, float(int(dt)), np.maximum(1, ts[nxt] - ts[pos]))
+        has = lengths > 0
+        any_temp = np.add.reduceat(~np.isnan(temp[pos]), (np.cumsum(lengths) - lengths)[has])
+        T0[has] = np.where(any_temp > 0, temp[lo[has]], float(T_default))
+    return T0, powers, gaps, lengths
+
+
+def normal_crossing_times(events, sessions, id_field='client_ip', T_min=18.0, T_max=26.0, sim=None):
+    """Per-session crossing times (seconds, NaN if never) for a sessions DataFrame.
+
+    `events` is filtered to event rows here. `sim` is a RoomSimulator whose
+    parameters are used (defaults if None); its T is ignored.
+    """
+    if 'event_type' in events.columns:
+        events = events[events['event_type'] == 'event']
+    if id_field not in events.columns:
+        id_field = 'role'
+    params = dict(T_out=10.0, R=1.0, C=1.0, eta=0.9, dt=60.0)
+    if sim is not None:
+        params = dict(T_out=sim.T_out, R=sim.R, C=sim.C, eta=sim.eta, dt=sim.dt)
+    T0, powers, gaps, lengths = session_segments(events, sessions, id_field, dt=params['dt'])
+    t = crossing_times(T0, powers, gaps, lengths, T_min=T_min, T_max=T_max, **params)
+    t[lengths == 0] = np.nan
+    return t
@@ -1,3 +1,6 @@
+import math
+
+
 class RoomSimulator:
     def __init__(self, T0=22.0, T_out=10.0, R=1.0, C=1.0, eta=0.9, dt=60):
         self.T = float(T0)
@@ -7,6 +10,12 @@ class RoomSimulator:
         self.eta = float(eta)
         self.dt = float(dt)
 
+    def predict(self, P_heater=0.0, disturbance=0.0):
+        # Temperature after one step with P_heater, without mutating the state
+        # (used by the SCC to preview a command before it is applied).
+        dT_dt = (1.0/self.C) * (-(self.T - self.T_out)/self.R + self.eta * float(P_heater) + float(disturbance))
+        return self.T + dT_dt * (self.dt / 60.0)
+
     def step(self, P_heater=0.0, disturbance=0.0):
         # Simple first-order thermal model.
         # dT/dt = (1/C) * ( -(T - T_out)/R + eta*P + disturbance )
@@ -15,3 +24,29 @@ class RoomSimulator:
         # dt is in seconds; we scale by 1.0 for seconds
         self.T += dT_dt * (self.dt / 60.0)  # scale to minutes if desired
         return self.T
+
+    def equilibrium(self, P_heater=0.0, disturbance=0.0):
+        # Steady-state temperature for constant P_heater/disturbance
+        return self.T_out + self.R * (self.eta * float(P_heater) + float(disturbance))
+
+    def advance(self, seconds, P_heater=0.0, disturbance=0.0, method='exact'):
+        """Advance `seconds` with constant P_heater/disturbance in O(1); returns the new T.
+
+        method='exact' uses the closed-form solution of the RC model,
+            T(t) = T_inf + (T - T_inf) * exp(-t / (R*C)),   t in minutes.
+        method='euler' jumps to the state that ceil(seconds/dt) calls to step()
+        would reach, T_inf + (T - T_inf) * (1 - (dt/60)/(R*C))**n, so results
+        stay comparable with the step-by-step loops (up to float rounding).
+        """
+        T_inf = self.equilibrium(P_heater, disturbance)
+        if method == 'exact':
+            if seconds > 0:
+                self.T = T_inf + (self.T - T_inf) * math.exp(-(seconds / 60.0) / (self.R * self.C))
+        elif method == 'euler':
+            n = math.ceil(seconds / self.dt) if seconds > 0 else 0
+            if n:
+                f = 1.0 - (self.dt / 60.0) / (self.R * self.C)
+                self.T = T_inf + (self.T - T_inf) * f ** n
+        else:
+            raise ValueError(f"unknown method: {method!r}")
+        return self.T
@@ -0,0 +1,73 @@
+"""Array-backed multi-zone version of RoomSimulator.
+
+`RoomArraySimulator` keeps T, T_out, R, C, eta and dt for every zone in
+float64 NumPy arrays (48 bytes per zone) and advances all zones in one
+vectorised `step`. The arithmetic is the same expression, in the same order,
+as `RoomSimulator.step`, so a zone follows a standalone RoomSimulator with the
+same parameters bit for bit.
+"""
+import numpy as np
+
+
+class RoomArraySimulator:
+    def __init__(self, n, T0=22.0, T_out=10.0, R=1.0, C=1.0, eta=0.9, dt=60):
+        # every parameter is a scalar (same for all zones) or a length-n sequence
+        self.n = int(n)
+        self.T = self._param(T0)
+        self.T_out = self._param(T_out)
+        self.R = self._param(R)
+        self.C = self._param(C)
+        self.eta = self._param(eta)
+        self.dt = self._param(dt)
+
+    def _param(self, value):
+        return np.broadcast_to(np.asarray(value, dtype=np.float64), (self.n,)).copy()
+
+    @classmethod
+    def from_rooms(cls, rooms):
+        """Build from a list of RoomSimulator instances (their current state and parameters)."""
+        return cls(len(rooms), T0=[r.T for r in rooms], T_out=[r.T_out for r in rooms],
+                   R=[r.R for r in rooms], C=[r.C for r in rooms], eta=[r.eta for r in rooms],
+                   dt=[r.dt for r in rooms])
+
+    def __len__(self):
+        return self.n
+
+    def predict(self, P_heater=0.0, disturbance=0.0):
+        """Temperatures of all zones after one step, without mutating the state."""
+        dT_dt = (1.0/self.C) * (-(self.T - self.T_out)/self.R + self.eta * np.asarray(P_heater, dtype=np.float64)
+                                + np.asarray(disturbance, dtype=np.float64))
+        return self.T + dT_dt * (self.dt / 60.0)
+
+    def step(self, P_heater=0.0, disturbance=0.0):
+        """Advance every zone by one dt. P_heater/disturbance are scalars or length-n arrays."""
+        self.T[:] = self.predict(P_heater, disturbance)
+        return self.T
+
+    def advance(self, seconds, P_heater=0.0, disturbance=0.0, method='exact'):
+        """Vectorised RoomSimulator.advance: every zone advances `seconds` (scalar or per zone)."""
+        seconds = np.broadcast_to(np.asarray(seconds, dtype=np.float64), (self.n,))
+        T_inf = self.T_out + self.R * (self.eta * np.asarray(P_heater, dtype=np.float64)
+                                       + np.asarray(disturbance, dtype=np.float64))
+        if method == 'exact':
+            decay = np.exp(-(np.maximum(seconds, 0.0) / 60.0) / (self.R * self.C))
+        elif method == 'euler':
+            n = np.ceil(np.maximum(seconds, 0.0) / self.dt)
+            decay = (1.0 - (self.dt / 60.0) / (self.R * self.C)) ** n
+        else:
+            raise ValueError(f"unknown method: {method!r}")
+        self.T[:] = T_inf + (self.T - T_inf) * decay
+        return self.T
+
+    # single-zone access, used by the frontend to serve one zone per request
+
+    def predict_zone(self, zone, P_heater=0.0, disturbance=0.0):
+        T = float(self.T[zone])
+        dT_dt = (1.0/float(self.C[zone])) * (-(T - float(self.T_out[zone]))/float(self.R[zone])
+                                             + float(self.eta[zone]) * float(P_heater) + float(disturbance))
+        return T + dT_dt * (float(self.dt[zone]) / 60.0)
+
+    def step_zone(self, zone, P_heater=0.0, disturbance=0.0):
+        T = self.predict_zone(zone, P_heater, disturbance)
+        self.T[zone] = T
+        return T